@@ -1,13 +1,19 @@
 """
 Módulo de análisis estadístico.
 Funciones para calcular correlaciones, pruebas estadísticas y métricas.
+
+scipy.stats se importa dentro de cada función que lo usa: es la dependencia más
+costosa de importar y no se necesita hasta el primer cálculo estadístico.
+Los tests llaman antes a checkpoint() (ver cancellation.py) para abortar los
+cálculos de una generación de filtros ya superada.
 """
 
 import pandas as pd
 import numpy as np
-from scipy import stats
 from typing import Tuple, Dict
 
+from cancellation import checkpoint
+
 
 def calculate_spearman_correlation(df: pd.DataFrame, var1: str, var2: str) -> Tuple[float, float]:
     """
@@ -21,6 +27,9 @@ def calculate_spearman_correlation(df: pd.DataFrame, var1: str, var2: str) -> Tu
     Returns:
         Tupla (correlación, p-value)
     """
+    from scipy import stats
+    checkpoint()
+    
     data = df[[var1, var2]].dropna()
     
     if len(data) < 10:
@@ -66,6 +75,9 @@ def test_normality(df: pd.DataFrame, variable: str) -> Dict[str, any]:
     Returns:
         Diccionario con resultados del test
     """
+    from scipy import stats
+    checkpoint()
+    
     data = df[variable].dropna()
     
     if len(data) < 10:
@@ -152,6 +164,8 @@ def calculate_confidence_interval(data: pd.Series, confidence: float = 0.95) ->
     Returns:
         Tupla (límite inferior, límite superior)
     """
+    from scipy import stats
+    
     data = data.dropna()
     
     if len(data) < 10:
@@ -175,6 +189,9 @@ def perform_gender_comparison(df: pd.DataFrame, variable: str) -> Dict[str, any]
     Returns:
         Diccionario con resultados del análisis
     """
+    from scipy import stats
+    checkpoint()
+    
     male_data = df[df['gndr'] == 1][variable].dropna()
     female_data = df[df['gndr'] == 2][variable].dropna()
     
@@ -207,6 +224,9 @@ def perform_age_correlation(df: pd.DataFrame, variable: str) -> Dict[str, any]:
     Returns:
         Diccionario con resultados del análisis
     """
+    from scipy import stats
+    checkpoint()
+    
     data = df[['agea', variable]].dropna()
     
     if len(data) < 10:
@@ -234,6 +254,9 @@ def perform_education_correlation(df: pd.DataFrame, variable: str) -> Dict[str,
     Returns:
         Diccionario con resultados del análisis
     """
+    from scipy import stats
+    checkpoint()
+    
     data = df[['education_level', variable]].dropna()
     
     if len(data) < 10:
@@ -272,6 +295,31 @@ def calculate_ideology_gradient(df: pd.DataFrame, variable: str) -> float:
     return left_mean - right_mean
 
 
+def calculate_nationalism_gradient(df: pd.DataFrame, variable: str) -> float:
+    """
+    Calcula el gradiente nacionalista (nacionalismo alto vs bajo).
+    
+    Args:
+        df: DataFrame con los datos (solo España)
+        variable: Variable dependiente
+        
+    Returns:
+        Gradiente nacionalista (media con nationalism >= p75 - media con
+        nationalism <= p25); 0 si hay menos de 20 observaciones válidas
+    """
+    df_nat_valid = df[['nationalism', variable]].dropna()
+    
+    if len(df_nat_valid) < 20:
+        return 0
+    
+    q1 = df_nat_valid['nationalism'].quantile(0.25)
+    q4 = df_nat_valid['nationalism'].quantile(0.75)
+    mean_low_nat = df_nat_valid[df_nat_valid['nationalism'] <= q1][variable].mean()
+    mean_high_nat = df_nat_valid[df_nat_valid['nationalism'] >= q4][variable].mean()
+    
+    return mean_high_nat - mean_low_nat
+
+
 def generate_summary_statistics(df: pd.DataFrame, variable: str) -> pd.DataFrame:
     """
     Genera un resumen completo de estadísticas para una variable.
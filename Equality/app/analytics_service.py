@@ -0,0 +1,467 @@
+"""
+Servicio de análisis compartido por los procesos de Streamlit.
+Un proceso independiente ('python run.py serve') mantiene el dataset, sus
+índices y las cachés, y responde peticiones de KPIs, agregados y datos de
+pestañas por un socket Unix. Si el servicio no está disponible, la aplicación
+usa un motor equivalente dentro de su propio proceso.
+
+Protocolo: cada mensaje es un entero de 4 bytes (big-endian) con la longitud
+seguido del cuerpo serializado con pickle. Las peticiones son diccionarios
+{'op': operación, ...parámetros} y las respuestas {'ok': bool, 'result'|'error'}.
+El socket se crea con permisos 0600: solo lo usan procesos del mismo usuario.
+"""
+
+import asyncio
+import functools
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from analytics import calculate_group_statistics
+from backends import cube_query, current_backend
+from cache import result_cache
+from config import ANALYTICS_SERVICE, ANALYTICS_SOCKET
+from data_loader import DataLoader, filter_signature, spain_filter_signature
+from memory import MEMORY_BUDGET, estimate_size, shares_memory
+from profiling import record_cache
+from sections import LazyTabCache, EDA_TABS, SPAIN_TABS, QUERY_TABS, CUBE_TABS
+
+
+_HEADER = struct.Struct('>I')
+
+# Grupos de pestañas disponibles en el servicio
+TAB_GROUPS = {'eda': EDA_TABS, 'spain': SPAIN_TABS}
+
+
+# ============================================================================
+# MOTOR DE ANÁLISIS
+# ============================================================================
+
+class AnalyticsEngine:
+    """
+    Motor de análisis con el dataset y las cachés en memoria. Se usa dentro
+    del servicio o, como alternativa, dentro del propio proceso de Streamlit.
+    """
+    
+    def __init__(self, loader: DataLoader = None, max_frames: int = 32,
+                 max_results: int = 512):
+        """
+        Inicializa el motor cargando el dataset.
+        
+        Args:
+            loader: DataLoader a utilizar (por defecto el del archivo de datos de config)
+            max_frames: Número máximo de DataFrames filtrados en caché (LRU)
+            max_results: Número máximo de resultados de KPIs y rankings en caché (LRU)
+        """
+        self.loader = loader or DataLoader()
+        self.loader.get_data()
+        self.max_frames = max_frames
+        self.max_results = max_results
+        # Resultados y pestañas se guardan también en la caché persistente (si está activa)
+        self.persistent = result_cache()
+        self.tab_cache = LazyTabCache(persistent=self.persistent)
+        self._frames = OrderedDict()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._frames_ledger = MEMORY_BUDGET.register('engine_frames', self._evict_frame)
+        self._results_ledger = MEMORY_BUDGET.register('engine_results', self._evict_result)
+    
+    def request(self, op: str, **params):
+        """
+        Ejecuta una operación (misma interfaz que ServiceClient.request).
+        
+        Args:
+            op: Nombre de la operación (ver métodos op_*)
+            **params: Parámetros de la operación
+            
+        Returns:
+            Resultado de la operación
+        """
+        handler = getattr(self, f"op_{op}", None)
+        if handler is None:
+            raise ValueError(f"Operación desconocida: {op}")
+        
+        return handler(**params)
+    
+    def get_frame(self, filters: dict) -> tuple:
+        """
+        Devuelve el DataFrame filtrado y su firma, usando la caché de filtrados.
+        
+        Args:
+            filters: Diccionario de filtros (formato de render_sidebar)
+            
+        Returns:
+            Tupla (DataFrame filtrado, firma de filtros)
+        """
+        df = self.loader.get_data()
+        version = self.loader.get_filter_catalog()['version']
+        signature = filter_signature(filters, version)
+        
+        with self._lock:
+            if signature in self._frames:
+                self._frames.move_to_end(signature)
+                self._frames_ledger.touch(signature)
+                record_cache('engine_frames', True)
+                return self._frames[signature], signature
+        
+        record_cache('engine_frames', False)
+        start = time.perf_counter()
+        df_filtered = self.loader.get_filtered_data(df, filters)
+        cost = time.perf_counter() - start
+        nbytes = 0 if shares_memory(df_filtered, df) else estimate_size(df_filtered)
+        
+        with self._lock:
+            self._frames[signature] = df_filtered
+            self._frames_ledger.add(signature, nbytes, cost)
+            while len(self._frames) > self.max_frames:
+                evicted, _ = self._frames.popitem(last=False)
+                self._frames_ledger.discard(evicted)
+        
+        MEMORY_BUDGET.enforce()
+        return df_filtered, signature
+    
+    def _cached(self, key: tuple, compute):
+        """Devuelve un resultado de la caché de resultados o lo calcula."""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self._results_ledger.touch(key)
+                record_cache('engine_results', True)
+                return self._results[key]
+        
+        record_cache('engine_results', False)
+        start = time.perf_counter()
+        if self.persistent is not None:
+            result = self.persistent.get_or_compute(('engine',) + key, compute)
+        else:
+            result = compute()
+        cost = time.perf_counter() - start
+        nbytes = estimate_size(result)
+        
+        with self._lock:
+            self._results[key] = result
+            self._results_ledger.add(key, nbytes, cost)
+            while len(self._results) > self.max_results:
+                evicted, _ = self._results.popitem(last=False)
+                self._results_ledger.discard(evicted)
+        
+        MEMORY_BUDGET.enforce()
+        return result
+    
+    def _evict_frame(self, signature: str):
+        """Retira un DataFrame filtrado de la caché (presupuesto de memoria)."""
+        with self._lock:
+            self._frames.pop(signature, None)
+    
+    def _evict_result(self, key: tuple):
+        """Retira un resultado de la caché (presupuesto de memoria)."""
+        with self._lock:
+            self._results.pop(key, None)
+    
+    def op_ping(self) -> str:
+        """Comprueba que el motor responde."""
+        return 'pong'
+    
+    def op_catalog(self) -> dict:
+        """Devuelve el catálogo de filtros."""
+        return self.loader.get_filter_catalog()
+    
+    def op_kpis(self, filters: dict, variable: str) -> dict:
+        """
+        Calcula los KPIs principales de una variable.
+        
+        Args:
+            filters: Diccionario de filtros
+            variable: Variable dependiente
+            
+        Returns:
+            Diccionario con estadísticas descriptivas, brecha de género y gradientes
+        """
+        df, signature = self.get_frame(filters)
+        
+        return self._cached(('kpis', signature, variable), lambda: {
+            'stats': self.loader.get_variable_stats(df, variable),
+            'gender_gap': self.loader.calculate_gender_gap(df, variable),
+            'age_gradient': self.loader.calculate_age_gradient(df, variable),
+            'education_gradient': self.loader.calculate_education_gradient(df, variable),
+            'n_rows': len(df)
+        })
+    
+    def op_country_ranking(self, filters: dict, variable: str, top_n: int = 5) -> tuple:
+        """
+        Calcula el ranking de países de una variable.
+        
+        Args:
+            filters: Diccionario de filtros
+            variable: Variable dependiente
+            top_n: Número de países en cada extremo
+            
+        Returns:
+            Tupla (top países, bottom países)
+        """
+        df, signature = self.get_frame(filters)
+        
+        return self._cached(
+            ('country_ranking', signature, variable, top_n),
+            lambda: self.loader.get_country_ranking(df, variable, top_n=top_n)
+        )
+    
+    def op_spain_parties(self, filters: dict, variable: str):
+        """
+        Calcula las estadísticas de una variable por partido político en España.
+        
+        Args:
+            filters: Diccionario de filtros
+            variable: Variable dependiente
+            
+        Returns:
+            DataFrame con estadísticas por partido (ver calculate_group_statistics)
+        """
+        df, _ = self.get_frame(filters)
+        signature = spain_filter_signature(filters, self.loader.get_filter_catalog()['version'])
+        
+        def compute():
+            df_spain = df[(df['cntry'] == 'ES') & df['party_name'].notna()]
+            return calculate_group_statistics(df_spain, variable, 'party_name')
+        
+        return self._cached(('spain_parties', signature, variable), compute)
+    
+    def op_tab(self, group: str, tab: str, filters: dict, variable: str) -> dict:
+        """
+        Calcula los datos de una pestaña del panel (estadísticas y figuras).
+        
+        Args:
+            group: Grupo de pestañas ('eda' o 'spain')
+            tab: Nombre de la pestaña dentro del grupo
+            filters: Diccionario de filtros
+            variable: Variable dependiente
+            
+        Returns:
+            Diccionario con los datos de la pestaña (ver sections.py)
+        """
+        df, signature = self.get_frame(filters)
+        
+        if group == 'spain':
+            signature = spain_filter_signature(filters, self.loader.get_filter_catalog()['version'])
+            df = df[df['cntry'] == 'ES']
+        
+        return self.tab_cache.get(group, tab, TAB_GROUPS[group], signature, variable, df)
+
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+
+async def _read_message(reader: asyncio.StreamReader):
+    """Lee un mensaje completo del flujo."""
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    return pickle.loads(await reader.readexactly(length))
+
+
+def _encode_message(message) -> bytes:
+    """Serializa un mensaje con su cabecera de longitud."""
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    return _HEADER.pack(len(body)) + body
+
+
+def _execute(engine: AnalyticsEngine, message: dict) -> dict:
+    """Ejecuta una petición y construye la respuesta."""
+    try:
+        params = dict(message)
+        return {'ok': True, 'result': engine.request(params.pop('op'), **params)}
+    except Exception as e:
+        return {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+
+
+async def serve(socket_path: Path = ANALYTICS_SOCKET, engine: AnalyticsEngine = None,
+                workers: int = 4):
+    """
+    Ejecuta el servicio de análisis hasta que se cancele.
+    
+    Args:
+        socket_path: Ruta del socket Unix
+        engine: Motor de análisis (por defecto uno nuevo)
+        workers: Hilos que ejecutan las peticiones
+    """
+    engine = engine or AnalyticsEngine()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analytics")
+    loop = asyncio.get_running_loop()
+    
+    async def handle_connection(reader, writer):
+        try:
+            while True:
+                message = await _read_message(reader)
+                response = await loop.run_in_executor(executor, _execute, engine, message)
+                writer.write(_encode_message(response))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+    
+    socket_path = Path(socket_path)
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    socket_path.unlink(missing_ok=True)
+    
+    server = await asyncio.start_unix_server(handle_connection, path=str(socket_path))
+    os.chmod(socket_path, 0o600)
+    
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
+        socket_path.unlink(missing_ok=True)
+
+
+# ============================================================================
+# CLIENTE Y SELECCIÓN DEL MOTOR
+# ============================================================================
+
+class ServiceClient:
+    """
+    Cliente del servicio de análisis. Mantiene una conexión por hilo, ya que
+    Streamlit atiende cada sesión (y la precarga de pestañas) en hilos distintos.
+    """
+    
+    def __init__(self, socket_path: Path = ANALYTICS_SOCKET, timeout: float = 30.0):
+        """
+        Inicializa el cliente.
+        
+        Args:
+            socket_path: Ruta del socket Unix del servicio
+            timeout: Tiempo máximo de espera por respuesta (segundos)
+        """
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _connection(self) -> socket.socket:
+        """Devuelve la conexión del hilo actual, abriéndola si es necesario."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.socket_path)
+            self._local.conn = conn
+        return conn
+    
+    def _recv_exactly(self, conn: socket.socket, size: int) -> bytes:
+        """Lee exactamente size bytes de la conexión."""
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        received = 0
+        while received < size:
+            n = conn.recv_into(view[received:])
+            if n == 0:
+                raise ConnectionError("El servicio de análisis cerró la conexión")
+            received += n
+        return bytes(buffer)
+    
+    def request(self, op: str, **params):
+        """
+        Envía una petición al servicio y espera su respuesta.
+        
+        Args:
+            op: Nombre de la operación (ver AnalyticsEngine)
+            **params: Parámetros de la operación
+            
+        Returns:
+            Resultado de la operación
+        """
+        conn = self._connection()
+        try:
+            conn.sendall(_encode_message({'op': op, **params}))
+            (length,) = _HEADER.unpack(self._recv_exactly(conn, _HEADER.size))
+            response = pickle.loads(self._recv_exactly(conn, length))
+        except OSError:
+            conn.close()
+            self._local.conn = None
+            raise
+        
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        
+        return response['result']
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Devuelve el motor de análisis del proceso: el cliente del servicio si
+    ANALYTICS_SERVICE está activo y el servicio responde, o un motor local.
+    
+    Returns:
+        ServiceClient o AnalyticsEngine (ambos con el método request)
+    """
+    global _engine
+    
+    with _engine_lock:
+        if _engine is None:
+            if ANALYTICS_SERVICE:
+                client = ServiceClient()
+                try:
+                    client.request('ping')
+                    _engine = client
+                except OSError:
+                    pass
+            if _engine is None:
+                _engine = AnalyticsEngine()
+    
+    return _engine
+
+
+def _local_builders(group: str, filters: dict) -> dict:
+    """
+    Funciones de cálculo en el proceso. Con un backend de consultas activo, las
+    pestañas de QUERY_TABS reciben la consulta con los filtros aplicados; sin
+    backend, las de CUBE_TABS reciben las consultas del cubo de agregados de
+    los artefactos si los filtros son dimensiones del cubo.
+    """
+    builders = TAB_GROUPS[group]
+    backend = current_backend()
+    if backend is not None:
+        query, tabs = backend.bind(filters), QUERY_TABS
+    else:
+        query, tabs = cube_query(filters), CUBE_TABS
+        if query is None:
+            return builders
+    
+    return {
+        tab: functools.partial(builder, query=query) if tab in tabs else builder
+        for tab, builder in builders.items()
+    }
+
+
+def get_tab_builders(group: str, filters: dict) -> dict:
+    """
+    Devuelve las funciones de cálculo de un grupo de pestañas. Con el servicio
+    activo, cada pestaña se pide al servicio; si no, se calcula en el proceso.
+    
+    Args:
+        group: Grupo de pestañas ('eda' o 'spain')
+        filters: Filtros aplicados (los usa el servicio para reconstruir el DataFrame)
+        
+    Returns:
+        Diccionario {pestaña: función(df, variable)}
+    """
+    engine = get_engine() if ANALYTICS_SERVICE else None
+    if not isinstance(engine, ServiceClient):
+        return _local_builders(group, filters)
+    
+    def remote_builder(tab):
+        return lambda df, variable: engine.request(
+            'tab', group=group, tab=tab, filters=filters, variable=variable
+        )
+    
+    return {tab: remote_builder(tab) for tab in TAB_GROUPS[group]}
@@ -0,0 +1,297 @@
+"""
+API HTTP de solo lectura con los agregados del panel en JSON.
+Permite a otros equipos consultar medias por país, brechas y estadísticas
+sin renderizar la aplicación de Streamlit ('python run.py api').
+
+Los filtros se pasan como parámetros de consulta con los mismos nombres que
+el diccionario de render_sidebar, repitiendo el parámetro para varios valores:
+
+    GET /api/country-ranking?variable=ipeqopta&gender_label=Mujer&top_n=5
+    GET /api/kpis?variable=eqpaybg&country_name=España&country_name=Francia
+
+Cada respuesta lleva un ETag derivado de la versión del dataset y de la firma
+de filtros; las peticiones con If-None-Match coincidente reciben 304 sin
+recalcular ni serializar nada.
+"""
+
+import hashlib
+import json
+import math
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+import pandas as pd
+
+from config import DEPENDENT_VARS, FILTER_DIMENSIONS
+from data_loader import filter_signature, spain_filter_signature
+
+
+# Máximo de cuerpos JSON ya serializados en memoria (LRU por ETag)
+_MAX_BODIES = 256
+
+
+# ============================================================================
+# CONVERSIÓN A JSON
+# ============================================================================
+
+def to_jsonable(value):
+    """
+    Convierte resultados de pandas/numpy en estructuras serializables en JSON.
+    Los DataFrames se devuelven como listas de registros y NaN como null.
+    
+    Args:
+        value: Resultado de una operación del motor de análisis
+        
+    Returns:
+        Valor equivalente con tipos nativos de Python
+    """
+    if isinstance(value, pd.DataFrame):
+        return [to_jsonable(record) for record in value.to_dict(orient='records')]
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+def _kpis(engine, filters, variable, params):
+    """Brecha de género, gradientes de edad y educación y tamaño de muestra."""
+    result = engine.request('kpis', filters=filters, variable=variable)
+    return {k: v for k, v in result.items() if k != 'stats'}
+
+
+def _stats(engine, filters, variable, params):
+    """Estadísticas descriptivas de la variable (get_variable_stats)."""
+    return engine.request('kpis', filters=filters, variable=variable)['stats']
+
+
+def _country_ranking(engine, filters, variable, params):
+    """Ranking de países (get_country_ranking)."""
+    top, bottom = engine.request(
+        'country_ranking', filters=filters, variable=variable, top_n=params['top_n']
+    )
+    return {'top': top, 'bottom': bottom}
+
+
+def _spain_parties(engine, filters, variable, params):
+    """Estadísticas por partido político en España."""
+    return engine.request('spain_parties', filters=filters, variable=variable)
+
+
+# Endpoints: ruta -> (función, usa la firma de España)
+ENDPOINTS = {
+    '/api/kpis': (_kpis, False),
+    '/api/stats': (_stats, False),
+    '/api/country-ranking': (_country_ranking, False),
+    '/api/spain/parties': (_spain_parties, True),
+}
+
+
+class BadRequest(ValueError):
+    """Parámetros de consulta no válidos."""
+
+
+def parse_query(query: str) -> tuple:
+    """
+    Interpreta los parámetros de consulta de un endpoint de agregados.
+    
+    Args:
+        query: Cadena de consulta de la URL
+        
+    Returns:
+        Tupla (filtros, variable, parámetros adicionales)
+    """
+    params = parse_qs(query, keep_blank_values=False)
+    
+    unknown = set(params) - set(FILTER_DIMENSIONS) - {'variable', 'top_n'}
+    if unknown:
+        raise BadRequest(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    
+    variable = params.get('variable', ['ipeqopta'])[-1]
+    if variable not in DEPENDENT_VARS:
+        raise BadRequest(f"Variable no válida: {variable}")
+    
+    try:
+        top_n = int(params.get('top_n', ['5'])[-1])
+    except ValueError:
+        raise BadRequest("top_n debe ser un entero") from None
+    if not 1 <= top_n <= 50:
+        raise BadRequest("top_n debe estar entre 1 y 50")
+    
+    filters = {column: params[column] for column in FILTER_DIMENSIONS if column in params}
+    
+    return filters, variable, {'top_n': top_n}
+
+
+# ============================================================================
+# SERVIDOR HTTP
+# ============================================================================
+
+class AggregatesAPI:
+    """
+    Resuelve las peticiones de la API sobre un motor de análisis y mantiene
+    los cuerpos JSON ya serializados por ETag.
+    """
+    
+    def __init__(self, engine):
+        """
+        Inicializa la API.
+        
+        Args:
+            engine: AnalyticsEngine o ServiceClient (ver analytics_service.get_engine)
+        """
+        self.engine = engine
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def etag(self, path: str, filters: dict, variable: str, params: dict, spain: bool) -> str:
+        """Calcula el ETag de una petición sin ejecutarla."""
+        version = self.engine.request('catalog')['version']
+        signature = (spain_filter_signature if spain else filter_signature)(filters, version)
+        payload = json.dumps([path, signature, variable, params], sort_keys=True)
+        return '"' + hashlib.sha1(payload.encode('utf-8')).hexdigest()[:20] + '"'
+    
+    def body(self, etag: str, compute) -> bytes:
+        """Devuelve el cuerpo JSON de un ETag, serializándolo solo la primera vez."""
+        with self._lock:
+            if etag in self._bodies:
+                self._bodies.move_to_end(etag)
+                return self._bodies[etag]
+        
+        body = json.dumps(to_jsonable(compute()), ensure_ascii=False).encode('utf-8')
+        
+        with self._lock:
+            self._bodies[etag] = body
+            while len(self._bodies) > _MAX_BODIES:
+                self._bodies.popitem(last=False)
+        
+        return body
+    
+    def handle(self, path: str, query: str, if_none_match: str = None) -> tuple:
+        """
+        Resuelve una petición GET.
+        
+        Args:
+            path: Ruta de la URL
+            query: Cadena de consulta
+            if_none_match: Cabecera If-None-Match del cliente
+            
+        Returns:
+            Tupla (estado HTTP, ETag o None, cuerpo)
+        """
+        if path == '/api/catalog':
+            catalog = self.engine.request('catalog')
+            etag = '"catalog-' + catalog['version'] + '"'
+            if _etag_matches(if_none_match, etag):
+                return HTTPStatus.NOT_MODIFIED, etag, b''
+            return HTTPStatus.OK, etag, self.body(etag, lambda: catalog)
+        
+        if path not in ENDPOINTS:
+            return HTTPStatus.NOT_FOUND, None, _error_body(f"Ruta desconocida: {path}")
+        
+        try:
+            filters, variable, params = parse_query(query)
+        except BadRequest as e:
+            return HTTPStatus.BAD_REQUEST, None, _error_body(str(e))
+        
+        endpoint, spain = ENDPOINTS[path]
+        etag = self.etag(path, filters, variable, params, spain)
+        if _etag_matches(if_none_match, etag):
+            return HTTPStatus.NOT_MODIFIED, etag, b''
+        
+        return HTTPStatus.OK, etag, self.body(
+            etag, lambda: endpoint(self.engine, filters, variable, params)
+        )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Comprueba si la cabecera If-None-Match incluye el ETag."""
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == '*' or etag in [t.strip() for t in if_none_match.split(',')]
+
+
+def _error_body(message: str) -> bytes:
+    """Cuerpo JSON de un error."""
+    return json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP de la API (solo GET y HEAD)."""
+    
+    protocol_version = 'HTTP/1.1'
+    # Cabeceras y cuerpo se escriben por separado: sin TCP_NODELAY, el algoritmo
+    # de Nagle y el ACK retardado añaden ~40 ms a cada respuesta keep-alive
+    disable_nagle_algorithm = True
+    api = None
+    verbose = False
+    
+    def _respond(self, send_body: bool):
+        """Resuelve la petición y escribe la respuesta."""
+        url = urlsplit(self.path)
+        try:
+            status, etag, body = self.api.handle(url.path, url.query, self.headers.get('If-None-Match'))
+        except Exception as e:
+            status, etag, body = HTTPStatus.INTERNAL_SERVER_ERROR, None, _error_body(f"{type(e).__name__}: {e}")
+        
+        self.send_response(status)
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if status != HTTPStatus.NOT_MODIFIED:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body and body:
+            self.wfile.write(body)
+    
+    def do_GET(self):
+        self._respond(send_body=True)
+    
+    def do_HEAD(self):
+        self._respond(send_body=False)
+    
+    def log_message(self, format, *args):
+        if self.verbose:
+            super().log_message(format, *args)
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8600, engine=None,
+                  verbose: bool = False) -> ThreadingHTTPServer:
+    """
+    Crea el servidor HTTP de la API (sin arrancarlo).
+    
+    Args:
+        host: Dirección de escucha (por defecto solo local)
+        port: Puerto de escucha (0 para uno libre)
+        engine: Motor de análisis (por defecto el de analytics_service.get_engine)
+        verbose: Si True, registra cada petición en stderr
+        
+    Returns:
+        Servidor listo para serve_forever()
+    """
+    if engine is None:
+        from analytics_service import get_engine
+        engine = get_engine()
+    
+    handler = type('RequestHandler', (_RequestHandler,), {
+        'api': AggregatesAPI(engine), 'verbose': verbose
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    
+    return server
@@ -14,29 +14,24 @@ from pathlib import Path
 # Importar módulos personalizados
 from config import (
     PAGE_CONFIG, APP_TITLE, APP_SUBTITLE, DEPENDENT_VARS,
-    VAR_DESCRIPTIONS, COLOR_PALETTE
+    VAR_DESCRIPTIONS, COLOR_PALETTE, PARALLEL_SECTIONS, METRICS_ENABLED,
+    EDA_TAB_LABELS, SPAIN_TAB_LABELS
+)
+from data_loader import (
+    get_data_loader, DataLoader, DataLoadError, filter_signature, spain_filter_signature, FRAME_CACHE
 )
-from data_loader import get_data_loader, DataLoader
 from components import (
-    render_sidebar, apply_education_filter, render_kpi_cards,
+    render_sidebar, render_kpi_cards,
     render_variable_selector, render_section_header, render_info_box,
     render_stats_table, render_data_quality_warning, create_download_button,
-    render_methodology_expander, render_footer
-)
-from visualizations import (
-    create_distribution_histogram, create_gender_comparison,
-    create_age_trend, create_education_trend, create_country_map,
-    create_party_bar_chart, create_ideology_scatter,
-    create_correlation_heatmap, create_top_bottom_chart,
-    create_violin_plot, create_gender_frequency_histogram
-)
-from analytics import (
-    calculate_spearman_correlation, test_normality,
-    calculate_group_statistics, perform_gender_comparison,
-    perform_age_correlation, perform_education_correlation,
-    calculate_ideology_gradient, generate_summary_statistics,
-    interpret_correlation_strength
+    render_methodology_expander, render_footer, activate_filter_generation,
+    cancellable_section, start_perf_overlay, render_perf_overlay, start_metrics,
+    account_session_memory, get_open_tab
 )
+from analytics import interpret_correlation_strength
+from sections import TAB_CACHE, VARIABLE_SECTIONS, CORRELATION_SECTIONS, schedule_sections
+from profiling import perf_section, record_cache, record_figure
+from analytics_service import get_tab_builders
 
 
 # ============================================================================
@@ -45,6 +40,13 @@ from analytics import (
 
 st.set_page_config(**PAGE_CONFIG)
 
+# Panel de rendimiento opcional (ESS11_PERF_OVERLAY=1 o ?perf=1); sin él no se registra nada
+perf_recorder = start_perf_overlay()
+
+# Métricas Prometheus del proceso (ESS11_METRICS=1); se activan una sola vez
+if METRICS_ENABLED:
+    start_metrics()
+
 
 # ============================================================================
 # CSS PERSONALIZADO
@@ -195,9 +197,14 @@ def initialize_app():
 
 
 # Cargar datos
-with st.spinner("⏳ Cargando datos del ESS11..."):
+with st.spinner("⏳ Cargando datos del ESS11..."), perf_section("Carga de datos"):
     data_loader = initialize_app()
-    df = data_loader.get_data()
+    try:
+        df = data_loader.get_data()
+    except DataLoadError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    catalog = data_loader.get_filter_catalog()
 
 
 # ============================================================================
@@ -210,14 +217,41 @@ st.markdown(f"*{APP_SUBTITLE}*")
 st.markdown("---")
 
 # Renderizar sidebar con filtros
-filters = render_sidebar(df)
-
-# Aplicar filtros
-df_filtered = data_loader.get_filtered_data(df, filters)
-
-# Aplicar filtro educativo especial
-if 'education_filter' in filters and filters['education_filter']:
-    df_filtered = apply_education_filter(df_filtered, filters['education_filter'])
+filters = render_sidebar(catalog)
+signature = filter_signature(filters, catalog['version'])
+
+# Con filtros nuevos se cancelan los cálculos pendientes de la generación anterior
+activate_filter_generation(signature)
+
+# Los datos filtrados se comparten entre sesiones por firma de filtros: la
+# sesión solo guarda la firma, no una copia propia de los datos
+with perf_section("Filtrado"):
+    df_filtered, frame_hit = FRAME_CACHE.get(signature, data_loader, df, filters)
+    record_cache('filtered_data', frame_hit)
+    st.session_state['applied_signature'] = signature
+
+# El análisis de España solo depende de los filtros que afectan a sus filas
+spain_signature = spain_filter_signature(filters, catalog['version'])
+eda_builders = get_tab_builders('eda', filters)
+spain_builders = get_tab_builders('spain', filters)
+
+# Programar en paralelo el cálculo de las secciones y de las pestañas abiertas;
+# cada sección recoge su resultado (en orden) al renderizarse
+if PARALLEL_SECTIONS:
+    default_var = next(iter(DEPENDENT_VARS))
+    with perf_section("Programación de secciones"):
+        schedule_sections(
+            df_filtered, signature, spain_signature,
+            selections={
+                'variables': st.session_state.get('var_desc_select', default_var),
+                'eda': st.session_state.get('eda_var_select', default_var),
+                'spain': st.session_state.get('spain_var_select', default_var),
+                'eda_tab': get_open_tab(EDA_TAB_LABELS, 'eda_tabs'),
+                'spain_tab': get_open_tab(SPAIN_TAB_LABELS, 'spain_tabs')
+            },
+            eda_builders=eda_builders,
+            spain_builders=spain_builders
+        )
 
 # Advertencia de calidad de datos
 render_data_quality_warning(df_filtered, min_obs=30)
@@ -225,7 +259,7 @@ render_data_quality_warning(df_filtered, min_obs=30)
 # Estadísticas generales en el sidebar
 st.sidebar.markdown("---")
 st.sidebar.metric("Observaciones filtradas", f"{len(df_filtered):,}")
-st.sidebar.metric("% del total", f"{(len(df_filtered)/len(df)*100):.1f}%")
+st.sidebar.metric("% del total", f"{(len(df_filtered)/catalog['n_rows']*100):.1f}%")
 
 # Menú de navegación
 st.sidebar.markdown("---")
@@ -241,817 +275,773 @@ st.sidebar.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Cada sección se define como un fragmento (st.fragment): al cambiar uno de sus
+# selectores solo se re-ejecuta esa sección, reutilizando df_filtered de la
+# última ejecución completa. Los filtros del sidebar re-ejecutan toda la app.
+
 # ============================================================================
 # SECCIÓN: ORIGEN Y DATOS
 # ============================================================================
 
-st.markdown('<a id="origen-de-los-datos"></a>', unsafe_allow_html=True)
-render_section_header(
-    "Origen de los Datos",
-    "Información sobre la fuente de datos y el contexto del estudio",
-    "📚"
-)
-
-col1, col2 = st.columns([2, 1])
-
-with col1:
-    st.markdown("""
-    ### European Social Survey Round 11 (ESS11)
-    
-    La **European Social Survey (ESS)** es un estudio comparativo europeo de opinión pública 
-    que se realiza cada dos años desde 2002. La Ronda 11 (2023) incluye respuestas de más de 
-    40,000 personas en más de 30 países europeos.
-    
-    **Objetivos del ESS11:**
-    - Monitorear actitudes, creencias y patrones de comportamiento en Europa
-    - Proporcionar datos de alta calidad para investigación académica y políticas públicas
-    - Facilitar comparaciones entre países y a lo largo del tiempo
-    
-    **Variables clave en este panel:**
-    - **Igualdad de oportunidades** (ipeqopta): Apoyo a que todas las personas sean tratadas igual
-    - **Igualdad salarial** (eqpaybg): Apoyo a la equidad salarial entre géneros
-    - **Interés político** (polintr): Nivel de interés en asuntos políticos
-    - **Percepción sobre inmigración** (imwbcnt): Actitudes hacia la inmigración
-    - **Relaciones de género** (wsekpwr): Percepciones sobre dinámicas de poder entre géneros
-    """)
-
-with col2:
-    st.info(f"""
-    **📊 Datos Cargados:**
-    - **Total observaciones:** {len(df):,}
-    - **Países incluidos:** {df['cntry'].nunique()}
-    - **Variables analizadas:** {len(DEPENDENT_VARS)}
-    - **Período:** 2023
-    """)
-    
-    # Botón de descarga
-    create_download_button(
-        df_filtered,
-        "ess11_filtered_data.csv",
-        "📥 Descargar datos filtrados"
+@st.fragment
+@perf_section("Origen de los datos")
+def render_origin_section(catalog: dict, df_filtered: pd.DataFrame, signature: str):
+    """Renderiza la sección de origen de los datos."""
+    st.markdown('<a id="origen-de-los-datos"></a>', unsafe_allow_html=True)
+    render_section_header(
+        "Origen de los Datos",
+        "Información sobre la fuente de datos y el contexto del estudio",
+        "📚"
     )
-
-# Mostrar muestra de datos
-with st.expander("👁️ Ver muestra de datos (primeras 100 filas)"):
-    st.dataframe(df_filtered.head(100), use_container_width=True)
-
-
-# ============================================================================
-# SECCIÓN: EXPLICACIÓN DE LOS DATOS
-# ============================================================================
-
-render_section_header(
-    "Explicación de las Variables",
-    "Descripción detallada de las variables analizadas",
-    "📖"
-)
-
-# Selector de variable para ver descripción
-selected_var_desc = st.selectbox(
-    "Seleccionar variable para ver descripción:",
-    options=list(DEPENDENT_VARS.keys()),
-    format_func=lambda x: DEPENDENT_VARS[x],
-    key="var_desc_select"
-)
-
-st.markdown(VAR_DESCRIPTIONS[selected_var_desc])
-
-# Explicación de limpieza de datos
-st.markdown("---")
-st.markdown('<a id="limpieza-de-datos"></a>', unsafe_allow_html=True)
-st.markdown("#### 🧹 Limpieza de Datos Aplicada")
-
-# Diccionario con explicaciones de limpieza por variable (simplificado)
-cleaning_explanations = {
-    'ipeqopta': """
-    **Valores eliminados:** 66, 77, 88, 99 (No aplicable, Rechazo, No sabe, Sin respuesta)
-    
-    **Transformación:** Inversión de escala (7 - valor original) para que valores más altos indiquen mayor apoyo.
-    """,
-    'eqpaybg': """
-    **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
     
-    **Transformación:** Ninguna.
-    """,
-    'polintr': """
-    **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
+    col1, col2 = st.columns([2, 1])
     
-    **Transformación:** Inversión de escala (5 - valor original) para que valores más altos indiquen mayor interés.
-    """,
-    'imwbcnt': """
-    **Valores eliminados:** 77, 88, 99 (Rechazo, No sabe, Sin respuesta)
+    with col1:
+        st.markdown("""
+        ### European Social Survey Round 11 (ESS11)
+        
+        La **European Social Survey (ESS)** es un estudio comparativo europeo de opinión pública 
+        que se realiza cada dos años desde 2002. La Ronda 11 (2023) incluye respuestas de más de 
+        40,000 personas en más de 30 países europeos.
+        
+        **Objetivos del ESS11:**
+        - Monitorear actitudes, creencias y patrones de comportamiento en Europa
+        - Proporcionar datos de alta calidad para investigación académica y políticas públicas
+        - Facilitar comparaciones entre países y a lo largo del tiempo
+        
+        **Variables clave en este panel:**
+        - **Igualdad de oportunidades** (ipeqopta): Apoyo a que todas las personas sean tratadas igual
+        - **Igualdad salarial** (eqpaybg): Apoyo a la equidad salarial entre géneros
+        - **Interés político** (polintr): Nivel de interés en asuntos políticos
+        - **Percepción sobre inmigración** (imwbcnt): Actitudes hacia la inmigración
+        - **Relaciones de género** (wsekpwr): Percepciones sobre dinámicas de poder entre géneros
+        """)
     
-    **Transformación:** Ninguna.
-    """,
-    'wsekpwr': """
-    **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
+    with col2:
+        st.info(f"""
+        **📊 Datos Cargados:**
+        - **Total observaciones:** {catalog['n_rows']:,}
+        - **Países incluidos:** {catalog['n_countries']}
+        - **Variables analizadas:** {len(DEPENDENT_VARS)}
+        - **Período:** 2023
+        """)
+        
+        # Botón de descarga
+        create_download_button(
+            df_filtered,
+            "ess11_filtered_data",
+            "📥 Descargar datos filtrados",
+            signature=signature
+        )
     
-    **Transformación:** Ninguna.
-    """
-}
+    # Mostrar muestra de datos
+    with st.expander("👁️ Ver muestra de datos (primeras 100 filas)"):
+        st.dataframe(df_filtered.head(100), use_container_width=True)
 
-st.info(cleaning_explanations[selected_var_desc])
 
-st.markdown("**Nota:** También se eliminan observaciones con valores inválidos en variables explicativas "
-            "(género: 9, edad: 999, educación: 5555/7777/8888/9999, partido: 66/77/88/99).")
-
-st.markdown("---")
-
-# Estadísticas descriptivas de la variable seleccionada
-stats = data_loader.get_variable_stats(df_filtered, selected_var_desc)
-
-col1, col2, col3, col4 = st.columns(4)
-with col1:
-    st.metric("Media", f"{stats.get('mean', 0):.3f}")
-with col2:
-    st.metric("Mediana", f"{stats.get('median', 0):.3f}")
-with col3:
-    st.metric("Desv. Est.", f"{stats.get('std', 0):.3f}")
-with col4:
-    st.metric("Observaciones", f"{stats.get('count', 0):,}")
-
-# Test de normalidad
-normality = test_normality(df_filtered, selected_var_desc)
-render_info_box(
-    "Test de Normalidad (Shapiro-Wilk)",
-    normality['message'],
-    "info" if normality['is_normal'] else "warning"
-)
+render_origin_section(catalog, df_filtered, signature)
 
 
 # ============================================================================
-# SECCIÓN: ANÁLISIS EXPLORATORIO (EDA)
+# SECCIÓN: EXPLICACIÓN DE LOS DATOS
 # ============================================================================
-st.markdown('<a id="exploraci-n-de-datos"></a>', unsafe_allow_html=True)
-render_section_header(
-    "Análisis Exploratorio de Datos (EDA)",
-    "Análisis bivariante de variables dependientes con factores sociodemográficos",
-    "🔍"
-)
 
-# Selector de variable para EDA
-selected_var = render_variable_selector(DEPENDENT_VARS, key="eda_var_select")
-
-# Tabs para diferentes análisis
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📊 Distribución General",
-    "👥 Análisis por Género",
-    "📅 Análisis por Edad",
-    "🎓 Análisis por Educación",
-    "🌍 Análisis por País"
-])
-
-# --- TAB 1: DISTRIBUCIÓN GENERAL ---
-with tab1:
-    st.subheader(f"Distribución de {DEPENDENT_VARS[selected_var]}")
-    
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        # Histograma
-        fig_hist = create_distribution_histogram(
-            df_filtered,
-            selected_var,
-            f"Distribución de {DEPENDENT_VARS[selected_var]}"
-        )
-        st.plotly_chart(fig_hist, use_container_width=True, config={'displayModeBar': True})
+@st.fragment
+@cancellable_section
+@perf_section("Variables")
+def render_variables_section(df_filtered: pd.DataFrame, signature: str):
+    """Renderiza la explicación de variables, su limpieza y estadísticas básicas."""
+    render_section_header(
+        "Explicación de las Variables",
+        "Descripción detallada de las variables analizadas",
+        "📖"
+    )
     
-    with col2:
-        # Estadísticas completas
-        summary_stats = generate_summary_statistics(df_filtered, selected_var)
-        st.dataframe(summary_stats, use_container_width=True)
+    # Selector de variable para ver descripción
+    selected_var_desc = st.selectbox(
+        "Seleccionar variable para ver descripción:",
+        options=list(DEPENDENT_VARS.keys()),
+        format_func=lambda x: DEPENDENT_VARS[x],
+        key="var_desc_select"
+    )
     
-    # Test de normalidad
-    normality = test_normality(df_filtered, selected_var)
-    if normality['is_normal']:
-        st.success(f"✅ La variable sigue una distribución normal (p = {normality['pvalue']:.4f})")
-    else:
-        st.warning(f"⚠️ La variable NO sigue una distribución normal (p = {normality['pvalue']:.4f}). "
-                  "Se recomienda usar estadística no paramétrica (Spearman, Mann-Whitney).")
-
-# --- TAB 2: ANÁLISIS POR GÉNERO ---
-with tab2:
-    st.subheader(f"{DEPENDENT_VARS[selected_var]} por Género")
+    st.markdown(VAR_DESCRIPTIONS[selected_var_desc])
     
-    # Realizar análisis de género
-    gender_analysis = perform_gender_comparison(df_filtered, selected_var)
+    # Explicación de limpieza de datos
+    st.markdown("---")
+    st.markdown('<a id="limpieza-de-datos"></a>', unsafe_allow_html=True)
+    st.markdown("#### 🧹 Limpieza de Datos Aplicada")
     
-    if 'error' not in gender_analysis:
-        # Calcular correlación de Spearman para género
-        data_gender = df_filtered[['gndr', selected_var]].dropna()
-        
-        if len(data_gender) >= 10:
-            corr, pval = calculate_spearman_correlation(df_filtered, 'gndr', selected_var)
-            
-            gender_corr = {
-                'correlation': corr,
-                'p_value': pval,
-                'strength': interpret_correlation_strength(corr),
-                'significant': pval < 0.05,
-                'direction': 'positiva' if corr > 0 else 'negativa'
-            }
-        else:
-            gender_corr = None
-        
-        # Primera fila de KPIs: Medias y Brecha
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.metric("Media Hombres", f"{gender_analysis['male_mean']:.3f}")
-        with col2:
-            st.metric("Media Mujeres", f"{gender_analysis['female_mean']:.3f}")
-        with col3:
-            st.metric("Brecha de Género", f"{gender_analysis['gap']:.3f}")
-        
-        # Segunda fila de KPIs: Correlación, Fuerza y Significación
-        if gender_corr:
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Correlación con Género", f"{gender_corr['correlation']:.3f}")
-            with col2:
-                st.metric("Fuerza", gender_corr['strength'])
-            with col3:
-                significacion = "Sí (p < 0.05)" if gender_corr['significant'] else "No (p ≥ 0.05)"
-                st.metric("Significación", significacion)
-            
-            # Nota interpretativa personalizada por variable (en verde si positiva, rojo si negativa)
-            gender_notes = {
-                'ipeqopta': {
-                    'positive': "**Nota:** Una correlación positiva indica que las mujeres creen **MÁS** en la igualdad de las personas y apoyan **MÁS** la igualdad de oportunidades que los hombres.",
-                    'negative': "**Nota:** Una correlación negativa indica que los hombres creen **MÁS** en la igualdad de las personas y apoyan **MÁS** la igualdad de oportunidades que las mujeres."
-                },
-                'eqpaybg': {
-                    'positive': "**Nota:** Una correlación positiva indica que las mujeres apoyan **MÁS** la igualdad salarial entre géneros que los hombres.",
-                    'negative': "**Nota:** Una correlación negativa indica que los hombres apoyan **MÁS** la igualdad salarial entre géneros que las mujeres."
-                },
-                'polintr': {
-                    'positive': "**Nota:** Una correlación positiva indica que las mujeres tienen **MÁS** interés en política que los hombres.",
-                    'negative': "**Nota:** Una correlación negativa indica que los hombres tienen **MÁS** interés en política que las mujeres."
-                },
-                'imwbcnt': {
-                    'positive': "**Nota:** Una correlación positiva indica que las mujeres tienen una percepción **MÁS POSITIVA** sobre la inmigración que los hombres.",
-                    'negative': "**Nota:** Una correlación negativa indica que los hombres tienen una percepción **MÁS POSITIVA** sobre la inmigración que las mujeres."
-                },
-                'wsekpwr': {
-                    'positive': "**Nota:** Una correlación positiva indica que las mujeres están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder que los hombres.",
-                    'negative': "**Nota:** Una correlación negativa indica que los hombres están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder que los hombres."
-                }
-            }
-            
-            # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
-            if abs(corr) >= 0.3:
-                note_text = gender_notes[selected_var]['positive'] if corr > 0 else gender_notes[selected_var]['negative']
-                
-                # Verde para correlación positiva, rojo para negativa
-                if corr > 0:
-                    st.success(note_text)  # Verde
-                else:
-                    st.error(note_text)  # Rojo
+    # Diccionario con explicaciones de limpieza por variable (simplificado)
+    cleaning_explanations = {
+        'ipeqopta': """
+        **Valores eliminados:** 66, 77, 88, 99 (No aplicable, Rechazo, No sabe, Sin respuesta)
         
-        # Gráfico de frecuencias por género
-        fig_gender = create_gender_frequency_histogram(
-            df_filtered,
-            selected_var,
-            f"Distribución por Género - {DEPENDENT_VARS[selected_var]}"
-        )
-        st.plotly_chart(fig_gender, use_container_width=True)
-    
-    else:
-        st.warning("⚠️ Datos insuficientes para análisis por género.")
-
-# --- TAB 3: ANÁLISIS POR EDAD ---
-with tab3:
-    st.subheader(f"{DEPENDENT_VARS[selected_var]} por Edad")
-    
-    # Realizar análisis de edad
-    age_analysis = perform_age_correlation(df_filtered, selected_var)
-    
-    if 'error' not in age_analysis:
-        # KPIs en una sola fila
-        age_gradient = data_loader.calculate_age_gradient(df_filtered, selected_var)
+        **Transformación:** Inversión de escala (7 - valor original) para que valores más altos indiquen mayor apoyo.
+        """,
+        'eqpaybg': """
+        **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
         
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Correlación con Edad", f"{age_analysis['correlation']:.3f}")
-        with col2:
-            st.metric("Fuerza", age_analysis['strength'])
-        with col3:
-            st.metric("Gradiente (Jóvenes-Mayores)", f"{age_gradient:.3f}")
-        with col4:
-            significacion = "Sí (p < 0.05)" if age_analysis['significant'] else "No (p ≥ 0.05)"
-            st.metric("Significación", significacion)
+        **Transformación:** Ninguna.
+        """,
+        'polintr': """
+        **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
         
-        # Nota interpretativa personalizada por variable (en verde si negativa, rojo si positiva para edad)
-        age_notes = {
-            'ipeqopta': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** apoyan **MÁS** la igualdad de oportunidades.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** apoyan **MÁS** la igualdad de oportunidades."
-            },
-            'eqpaybg': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** apoyan **MÁS** la igualdad salarial.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** apoyan **MÁS** la igualdad salarial."
-            },
-            'polintr': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** tienen **MÁS** interés en política.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** tienen **MÁS** interés en política."
-            },
-            'imwbcnt': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
-            },
-            'wsekpwr': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder."
-            }
-        }
+        **Transformación:** Inversión de escala (5 - valor original) para que valores más altos indiquen mayor interés.
+        """,
+        'imwbcnt': """
+        **Valores eliminados:** 77, 88, 99 (Rechazo, No sabe, Sin respuesta)
         
-        # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
-        if abs(age_analysis['correlation']) >= 0.3:
-            note_text = age_notes[selected_var]['positive'] if age_analysis['correlation'] > 0 else age_notes[selected_var]['negative']
-            
-            # Verde para correlación positiva, rojo para negativa
-            if age_analysis['correlation'] > 0:
-                st.success(note_text)  # Verde
-            else:
-                st.error(note_text)  # Rojo
+        **Transformación:** Ninguna.
+        """,
+        'wsekpwr': """
+        **Valores eliminados:** 7, 8, 9 (Rechazo, No sabe, Sin respuesta)
         
-        # Visualización
-        fig_age = create_age_trend(
-            df_filtered,
-            selected_var,
-            f"{DEPENDENT_VARS[selected_var]} por Tramo de Edad"
-        )
-        st.plotly_chart(fig_age, use_container_width=True)
-    
-    else:
-        st.warning("⚠️ Datos insuficientes para análisis por edad.")
-
-# --- TAB 4: ANÁLISIS POR EDUCACIÓN ---
-with tab4:
-    st.subheader(f"{DEPENDENT_VARS[selected_var]} por Nivel Educativo")
+        **Transformación:** Ninguna.
+        """
+    }
     
-    # Realizar análisis educativo
-    edu_analysis = perform_education_correlation(df_filtered, selected_var)
+    st.info(cleaning_explanations[selected_var_desc])
     
-    if 'error' not in edu_analysis:
-        # KPIs en una sola fila
-        edu_gradient = data_loader.calculate_education_gradient(df_filtered, selected_var)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.metric("Correlación con Educación", f"{edu_analysis['correlation']:.3f}")
-        with col2:
-            st.metric("Fuerza", edu_analysis['strength'])
-        with col3:
-            st.metric("Gradiente (Q4-Q1)", f"{edu_gradient:.3f}")
-        with col4:
-            significacion = "Sí (p < 0.05)" if edu_analysis['significant'] else "No (p ≥ 0.05)"
-            st.metric("Significación", significacion)
-        
-        # Nota interpretativa personalizada por variable (en verde si positiva, rojo si negativa)
-        edu_notes = {
-            'ipeqopta': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad de oportunidades.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad de oportunidades."
-            },
-            'eqpaybg': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad salarial.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad salarial."
-            },
-            'polintr': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** tienen **MÁS** interés en política.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** tienen **MÁS** interés en política."
-            },
-            'imwbcnt': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
-            },
-            'wsekpwr': {
-                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder.",
-                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder."
-            }
-        }
-        
-        # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
-        if abs(edu_analysis['correlation']) >= 0.3:
-            note_text = edu_notes[selected_var]['positive'] if edu_analysis['correlation'] > 0 else edu_notes[selected_var]['negative']
-            
-            if edu_analysis['correlation'] > 0:
-                st.success(note_text)  # Verde si correlación positiva (mayor educación = más apoyo)
-            else:
-                st.error(note_text)  # Rojo si correlación negativa
-        
-        # Visualización
-        fig_edu = create_education_trend(
-            df_filtered,
-            selected_var,
-            f"{DEPENDENT_VARS[selected_var]} por Nivel Educativo"
-        )
-        st.plotly_chart(fig_edu, use_container_width=True)
+    st.markdown("**Nota:** También se eliminan observaciones con valores inválidos en variables explicativas "
+                "(género: 9, edad: 999, educación: 5555/7777/8888/9999, partido: 66/77/88/99).")
     
-    else:
-        st.warning("⚠️ Datos insuficientes para análisis educativo.")
-
-# --- TAB 5: ANÁLISIS POR PAÍS ---
-with tab5:
-    st.subheader(f"{DEPENDENT_VARS[selected_var]} por País")
+    st.markdown("---")
     
-    # Mapa coroplético - ampliado a ancho completo sin columnas laterales
-    st.markdown("### 🗺️ Mapa de Europa")
-    fig_map = create_country_map(
-        df_filtered,
-        selected_var,
-        f"{DEPENDENT_VARS[selected_var]} por País"
-    )
-    # Usar contenedor completo sin restricciones para maximizar el ancho del mapa
-    st.plotly_chart(fig_map, use_container_width=True, config={
-        'displayModeBar': True,
-        'displaylogo': False,
-        'modeBarButtonsToRemove': ['select2d', 'lasso2d']
-    })
+    # Estadísticas descriptivas y test de normalidad de la variable seleccionada
+    summary = TAB_CACHE.get('variables', 'summary', VARIABLE_SECTIONS, signature,
+                            selected_var_desc, df_filtered)
+    stats = summary['stats']
     
-    # Ranking de países
-    st.markdown("### 🏆 Ranking de Países")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Media", f"{stats.get('mean', 0):.3f}")
+    with col2:
+        st.metric("Mediana", f"{stats.get('median', 0):.3f}")
+    with col3:
+        st.metric("Desv. Est.", f"{stats.get('std', 0):.3f}")
+    with col4:
+        st.metric("Observaciones", f"{stats.get('count', 0):,}")
     
-    top_countries, bottom_countries = data_loader.get_country_ranking(
-        df_filtered,
-        selected_var,
-        top_n=5
+    # Test de normalidad
+    normality = summary['normality']
+    render_info_box(
+        "Test de Normalidad (Shapiro-Wilk)",
+        normality['message'],
+        "info" if normality['is_normal'] else "warning"
     )
-    
-    if not top_countries.empty and not bottom_countries.empty:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("**Top 5 Países**")
-            st.dataframe(
-                top_countries[['country_name', 'mean', 'count']].rename(columns={
-                    'country_name': 'País',
-                    'mean': 'Media',
-                    'count': 'N'
-                }),
-                hide_index=True,
-                use_container_width=True
-            )
-        
-        with col2:
-            st.markdown("**Bottom 5 Países**")
-            st.dataframe(
-                bottom_countries[['country_name', 'mean', 'count']].rename(columns={
-                    'country_name': 'País',
-                    'mean': 'Media',
-                    'count': 'N'
-                }),
-                hide_index=True,
-                use_container_width=True
-            )
-        
-        # Gráfico comparativo
-        fig_top_bottom = create_top_bottom_chart(
-            top_countries,
-            bottom_countries,
-            selected_var,
-            f"Top 5 y Bottom 5 Países - {DEPENDENT_VARS[selected_var]}"
-        )
-        st.plotly_chart(fig_top_bottom, use_container_width=True)
-    
-    else:
-        st.warning("⚠️ Datos insuficientes para ranking de países.")
+
+
+render_variables_section(df_filtered, signature)
 
 
 # ============================================================================
-# SECCIÓN: ANÁLISIS ESPAÑA (IDEOLOGÍA Y PARTIDOS)
+# SECCIÓN: ANÁLISIS EXPLORATORIO (EDA)
 # ============================================================================
-
-if 'ES' in df_filtered['cntry'].values:
-    st.markdown('<a id="an-lisis-espec-fico-espa-a"></a>', unsafe_allow_html=True)
+@st.fragment
+@cancellable_section
+@perf_section("Exploración de datos")
+def render_eda_section(df_filtered: pd.DataFrame, signature: str, builders: dict):
+    """Renderiza el análisis exploratorio por distribución, género, edad, educación y país."""
+    st.markdown('<a id="exploraci-n-de-datos"></a>', unsafe_allow_html=True)
     render_section_header(
-        "Análisis Específico: España",
-        "Análisis de actitudes por partido político, ideología y nacionalismo",
-        "🟥🟨🟥"
+        "Análisis Exploratorio de Datos (EDA)",
+        "Análisis bivariante de variables dependientes con factores sociodemográficos",
+        "🔍"
     )
     
-    # Filtrar solo España
-    df_spain = df_filtered[df_filtered['cntry'] == 'ES'].copy()
+    # Selector de variable para EDA
+    selected_var = render_variable_selector(DEPENDENT_VARS, key="eda_var_select")
     
-    if len(df_spain) >= 30:
-        # Selector de variable
-        selected_var_spain = render_variable_selector(DEPENDENT_VARS, key="spain_var_select")
-        
-        # Tabs para análisis España
-        tab_spain1, tab_spain2, tab_spain3 = st.tabs([
-            "🗳️ Por Partido",
-            "⬅️➡️ Por Ideología",
-            "🏴 Por Nacionalismo"
-        ])
-        
-        # --- TAB: POR PARTIDO ---
-        with tab_spain1:
-            st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Partido Político")
+    # Tabs para diferentes análisis. Solo se calcula la pestaña abierta; el resto
+    # se precarga en segundo plano tras renderizarla (ver sections.LazyTabCache)
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        list(EDA_TAB_LABELS.values()), key="eda_tabs", on_change="rerun"
+    )
+    
+    # --- TAB 1: DISTRIBUCIÓN GENERAL ---
+    with tab1:
+        if tab1.open:
+            tab_data = TAB_CACHE.get('eda', 'distribution', builders, signature,
+                                     selected_var, df_filtered)
+            st.subheader(f"Distribución de {DEPENDENT_VARS[selected_var]}")
             
-            fig_party = create_party_bar_chart(
-                df_spain,
-                selected_var_spain,
-                f"{DEPENDENT_VARS[selected_var_spain]} por Partido"
-            )
-            st.plotly_chart(fig_party, use_container_width=True)
+            col1, col2 = st.columns([2, 1])
             
-            # Estadísticas por partido
-            party_stats = calculate_group_statistics(
-                df_spain[df_spain['party_name'].notna()],
-                selected_var_spain,
-                'party_name'
-            )
+            with col1:
+                # Histograma
+                record_figure(tab_data['figure'])
+                st.plotly_chart(tab_data['figure'], use_container_width=True, config={'displayModeBar': True})
             
-            st.markdown("### Estadísticas por Partido")
-            st.dataframe(
-                party_stats.rename(columns={
-                    'party_name': 'Partido',
-                    'count': 'N',
-                    'mean': 'Media',
-                    'median': 'Mediana',
-                    'std': 'Desv. Est.',
-                    'min': 'Mínimo',
-                    'max': 'Máximo'
-                }),
-                hide_index=True,
-                use_container_width=True
-            )
-        
-        # --- TAB: POR IDEOLOGÍA ---
-        with tab_spain2:
-            st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Ideología")
+            with col2:
+                # Estadísticas completas
+                summary_stats = tab_data['summary']
+                st.dataframe(summary_stats, use_container_width=True)
+            
+            # Test de normalidad
+            normality = tab_data['normality']
+            if normality['is_normal']:
+                st.success(f"✅ La variable sigue una distribución normal (p = {normality['pvalue']:.4f})")
+            else:
+                st.warning(f"⚠️ La variable NO sigue una distribución normal (p = {normality['pvalue']:.4f}). "
+                          "Se recomienda usar estadística no paramétrica (Spearman, Mann-Whitney).")
+    
+    # --- TAB 2: ANÁLISIS POR GÉNERO ---
+    with tab2:
+        if tab2.open:
+            tab_data = TAB_CACHE.get('eda', 'gender', builders, signature,
+                                     selected_var, df_filtered)
+            st.subheader(f"{DEPENDENT_VARS[selected_var]} por Género")
+            
+            # Realizar análisis de género
+            gender_analysis = tab_data['analysis']
+            
+            if 'error' not in gender_analysis:
+                # Correlación de Spearman para género
+                gender_corr = tab_data['correlation']
+                
+                # Primera fila de KPIs: Medias y Brecha
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Media Hombres", f"{gender_analysis['male_mean']:.3f}")
+                with col2:
+                    st.metric("Media Mujeres", f"{gender_analysis['female_mean']:.3f}")
+                with col3:
+                    st.metric("Brecha de Género", f"{gender_analysis['gap']:.3f}")
+                
+                # Segunda fila de KPIs: Correlación, Fuerza y Significación
+                if gender_corr:
+                    corr = gender_corr['correlation']
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric("Correlación con Género", f"{gender_corr['correlation']:.3f}")
+                    with col2:
+                        st.metric("Fuerza", gender_corr['strength'])
+                    with col3:
+                        significacion = "Sí (p < 0.05)" if gender_corr['significant'] else "No (p ≥ 0.05)"
+                        st.metric("Significación", significacion)
+                    
+                    # Nota interpretativa personalizada por variable (en verde si positiva, rojo si negativa)
+                    gender_notes = {
+                        'ipeqopta': {
+                            'positive': "**Nota:** Una correlación positiva indica que las mujeres creen **MÁS** en la igualdad de las personas y apoyan **MÁS** la igualdad de oportunidades que los hombres.",
+                            'negative': "**Nota:** Una correlación negativa indica que los hombres creen **MÁS** en la igualdad de las personas y apoyan **MÁS** la igualdad de oportunidades que las mujeres."
+                        },
+                        'eqpaybg': {
+                            'positive': "**Nota:** Una correlación positiva indica que las mujeres apoyan **MÁS** la igualdad salarial entre géneros que los hombres.",
+                            'negative': "**Nota:** Una correlación negativa indica que los hombres apoyan **MÁS** la igualdad salarial entre géneros que las mujeres."
+                        },
+                        'polintr': {
+                            'positive': "**Nota:** Una correlación positiva indica que las mujeres tienen **MÁS** interés en política que los hombres.",
+                            'negative': "**Nota:** Una correlación negativa indica que los hombres tienen **MÁS** interés en política que las mujeres."
+                        },
+                        'imwbcnt': {
+                            'positive': "**Nota:** Una correlación positiva indica que las mujeres tienen una percepción **MÁS POSITIVA** sobre la inmigración que los hombres.",
+                            'negative': "**Nota:** Una correlación negativa indica que los hombres tienen una percepción **MÁS POSITIVA** sobre la inmigración que las mujeres."
+                        },
+                        'wsekpwr': {
+                            'positive': "**Nota:** Una correlación positiva indica que las mujeres están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder que los hombres.",
+                            'negative': "**Nota:** Una correlación negativa indica que los hombres están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder que los hombres."
+                        }
+                    }
+                    
+                    # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
+                    if abs(corr) >= 0.3:
+                        note_text = gender_notes[selected_var]['positive'] if corr > 0 else gender_notes[selected_var]['negative']
+                        
+                        # Verde para correlación positiva, rojo para negativa
+                        if corr > 0:
+                            st.success(note_text)  # Verde
+                        else:
+                            st.error(note_text)  # Rojo
+                
+                # Gráfico de frecuencias por género
+                record_figure(tab_data['figure'])
+                st.plotly_chart(tab_data['figure'], use_container_width=True)
+            
+            else:
+                st.warning("⚠️ Datos insuficientes para análisis por género.")
+    
+    # --- TAB 3: ANÁLISIS POR EDAD ---
+    with tab3:
+        if tab3.open:
+            tab_data = TAB_CACHE.get('eda', 'age', builders, signature,
+                                     selected_var, df_filtered)
+            st.subheader(f"{DEPENDENT_VARS[selected_var]} por Edad")
+            
+            # Realizar análisis de edad
+            age_analysis = tab_data['analysis']
             
-            # Verificar datos suficientes
-            if df_spain['ideology'].notna().sum() >= 10:
-                # Calcular correlación y gradiente ideológico
-                corr, pval = calculate_spearman_correlation(df_spain, 'ideology', selected_var_spain)
-                ideo_gradient = calculate_ideology_gradient(df_spain, selected_var_spain)
+            if 'error' not in age_analysis:
+                # KPIs en una sola fila
+                age_gradient = tab_data['gradient']
                 
-                # Métricas en una fila
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Gradiente Ideológico", f"{ideo_gradient:.3f}")
+                    st.metric("Correlación con Edad", f"{age_analysis['correlation']:.3f}")
                 with col2:
-                    st.metric("Correlación con Ideología", f"{corr:.3f}")
+                    st.metric("Fuerza", age_analysis['strength'])
                 with col3:
-                    st.metric("Fuerza", interpret_correlation_strength(corr))
+                    st.metric("Gradiente (Jóvenes-Mayores)", f"{age_gradient:.3f}")
                 with col4:
-                    significacion = "Sí (p < 0.05)" if pval < 0.05 else "No (p ≥ 0.05)"
+                    significacion = "Sí (p < 0.05)" if age_analysis['significant'] else "No (p ≥ 0.05)"
                     st.metric("Significación", significacion)
                 
-                # Nota interpretativa personalizada por variable
-                ideology_notes = {
+                # Nota interpretativa personalizada por variable (en verde si negativa, rojo si positiva para edad)
+                age_notes = {
                     'ipeqopta': {
-                        'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** apoyan **MÁS** la igualdad de oportunidades.",
-                        'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** apoyan **MÁS** la igualdad de oportunidades."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** apoyan **MÁS** la igualdad de oportunidades.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** apoyan **MÁS** la igualdad de oportunidades."
                     },
                     'eqpaybg': {
-                        'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** apoyan **MÁS** la igualdad salarial.",
-                        'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** apoyan **MÁS** la igualdad salarial."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** apoyan **MÁS** la igualdad salarial.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** apoyan **MÁS** la igualdad salarial."
                     },
                     'polintr': {
-                        'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** tienen **MÁS** interés en política.",
-                        'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** tienen **MÁS** interés en política."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** tienen **MÁS** interés en política.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** tienen **MÁS** interés en política."
                     },
                     'imwbcnt': {
-                        'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
-                        'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
                     },
                     'wsekpwr': {
-                        'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** perciben **MÁS** control de las mujeres sobre los hombres.",
-                        'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** perciben **MÁS** control de las mujeres sobre los hombres."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas **MÁS MAYORES** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas **MÁS JÓVENES** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder."
                     }
                 }
                 
                 # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
-                if abs(corr) >= 0.3:
-                    note_text = ideology_notes[selected_var_spain]['positive'] if corr > 0 else ideology_notes[selected_var_spain]['negative']
+                if abs(age_analysis['correlation']) >= 0.3:
+                    note_text = age_notes[selected_var]['positive'] if age_analysis['correlation'] > 0 else age_notes[selected_var]['negative']
                     
                     # Verde para correlación positiva, rojo para negativa
-                    if corr > 0:
+                    if age_analysis['correlation'] > 0:
                         st.success(note_text)  # Verde
                     else:
                         st.error(note_text)  # Rojo
                 
-                # Tabla de clasificación de partidos por ideología
-                with st.expander("📋 Ver clasificación de partidos por ideología"):
-                    st.markdown("**Escala ideológica asignada a cada partido (1=Izquierda, 5=Derecha):**")
-                    
-                    ideology_data = {
-                        'Partido': ['SUMAR', 'ERC', 'EH-Bildu', 'BNG', 'PSOE', 'PACMA', 
-                                   'EAJ-PNV', 'Coalición Canaria', 'PP', 'JuntsxCat', 'UPN', 'VOX'],
-                        'Ideología': [1, 1, 1, 1, 2, 2, 3, 3, 4, 4, 4, 5],
-                        'Clasificación': ['Izquierda', 'Izquierda nacionalista', 'Izquierda nacionalista', 
-                                         'Izquierda nacionalista', 'Centroizquierda', 'Centroizquierda ecologista',
-                                         'Centroderecha nacionalista', 'Centroderecha regionalista', 
-                                         'Derecha', 'Derecha nacionalista', 'Derecha regionalista', 'Derecha radical']
-                    }
-                    st.table(pd.DataFrame(ideology_data))
-                
-                # Dispersograma
-                fig_ideo = create_ideology_scatter(
-                    df_spain,
-                    selected_var_spain,
-                    f"{DEPENDENT_VARS[selected_var_spain]} vs Ideología"
-                )
-                st.plotly_chart(fig_ideo, use_container_width=True)
+                # Visualización
+                record_figure(tab_data['figure'])
+                st.plotly_chart(tab_data['figure'], use_container_width=True)
+            
             else:
-                st.warning("⚠️ Datos insuficientes para análisis de ideología.")
-        
-        # --- TAB: POR NACIONALISMO ---
-        with tab_spain3:
-            st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Nacionalismo")
+                st.warning("⚠️ Datos insuficientes para análisis por edad.")
+    
+    # --- TAB 4: ANÁLISIS POR EDUCACIÓN ---
+    with tab4:
+        if tab4.open:
+            tab_data = TAB_CACHE.get('eda', 'education', builders, signature,
+                                     selected_var, df_filtered)
+            st.subheader(f"{DEPENDENT_VARS[selected_var]} por Nivel Educativo")
             
-            # Verificar datos suficientes
-            if df_spain['nationalism'].notna().sum() >= 10:
-                # Calcular correlación
-                corr, pval = calculate_spearman_correlation(df_spain, 'nationalism', selected_var_spain)
-                
-                # Calcular gradiente nacionalista (similar a ideológico)
-                # Gradiente = diferencia entre Q4 (alto nacionalismo) y Q1 (bajo nacionalismo)
-                df_nat_valid = df_spain[['nationalism', selected_var_spain]].dropna()
-                if len(df_nat_valid) >= 20:
-                    q1 = df_nat_valid['nationalism'].quantile(0.25)
-                    q4 = df_nat_valid['nationalism'].quantile(0.75)
-                    mean_low_nat = df_nat_valid[df_nat_valid['nationalism'] <= q1][selected_var_spain].mean()
-                    mean_high_nat = df_nat_valid[df_nat_valid['nationalism'] >= q4][selected_var_spain].mean()
-                    nat_gradient = mean_high_nat - mean_low_nat
-                else:
-                    nat_gradient = 0
+            # Realizar análisis educativo
+            edu_analysis = tab_data['analysis']
+            
+            if 'error' not in edu_analysis:
+                # KPIs en una sola fila
+                edu_gradient = tab_data['gradient']
                 
-                # Métricas en una fila
                 col1, col2, col3, col4 = st.columns(4)
                 with col1:
-                    st.metric("Gradiente Nacionalista", f"{nat_gradient:.3f}")
+                    st.metric("Correlación con Educación", f"{edu_analysis['correlation']:.3f}")
                 with col2:
-                    st.metric("Correlación con Nacionalismo", f"{corr:.3f}")
+                    st.metric("Fuerza", edu_analysis['strength'])
                 with col3:
-                    st.metric("Fuerza", interpret_correlation_strength(corr))
+                    st.metric("Gradiente (Q4-Q1)", f"{edu_gradient:.3f}")
                 with col4:
-                    significacion = "Sí (p < 0.05)" if pval < 0.05 else "No (p ≥ 0.05)"
+                    significacion = "Sí (p < 0.05)" if edu_analysis['significant'] else "No (p ≥ 0.05)"
                     st.metric("Significación", significacion)
                 
-                # Nota interpretativa personalizada por variable
-                nationalism_notes = {
+                # Nota interpretativa personalizada por variable (en verde si positiva, rojo si negativa)
+                edu_notes = {
                     'ipeqopta': {
-                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** apoyan **MÁS** la igualdad de oportunidades.",
-                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** apoyan **MÁS** la igualdad de oportunidades."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad de oportunidades.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad de oportunidades."
                     },
                     'eqpaybg': {
-                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** apoyan **MÁS** la igualdad salarial.",
-                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** apoyan **MÁS** la igualdad salarial."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad salarial.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** apoyan **MÁS** la igualdad salarial."
                     },
                     'polintr': {
-                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** tienen **MÁS** interés en política.",
-                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** tienen **MÁS** interés en política."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** tienen **MÁS** interés en política.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** tienen **MÁS** interés en política."
                     },
                     'imwbcnt': {
-                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
-                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
                     },
                     'wsekpwr': {
-                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** perciben **MÁS** control de las mujeres sobre los hombres.",
-                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** perciben **MÁS** control de las mujeres sobre los hombres."
+                        'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NIVEL EDUCATIVO** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder.",
+                        'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NIVEL EDUCATIVO** están **MÁS DE ACUERDO** con que las mujeres buscan tener más poder."
                     }
                 }
                 
                 # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
-                if abs(corr) >= 0.3:
-                    note_text = nationalism_notes[selected_var_spain]['positive'] if corr > 0 else nationalism_notes[selected_var_spain]['negative']
+                if abs(edu_analysis['correlation']) >= 0.3:
+                    note_text = edu_notes[selected_var]['positive'] if edu_analysis['correlation'] > 0 else edu_notes[selected_var]['negative']
                     
-                    # Verde para correlación positiva, rojo para negativa
-                    if corr > 0:
-                        st.success(note_text)  # Verde
+                    if edu_analysis['correlation'] > 0:
+                        st.success(note_text)  # Verde si correlación positiva (mayor educación = más apoyo)
                     else:
-                        st.error(note_text)  # Rojo
+                        st.error(note_text)  # Rojo si correlación negativa
                 
-                # Tabla de clasificación de partidos por nacionalismo
-                with st.expander("📋 Ver clasificación de partidos por nacionalismo"):
-                    st.markdown("**Escala de nacionalismo asignada a cada partido (1=Bajo, 5=Alto):**")
-                    
-                    nationalism_data = {
-                        'Partido': ['PP', 'PSOE', 'VOX', 'SUMAR', 'PACMA', 'Coalición Canaria', 'UPN', 
-                                   'EAJ-PNV', 'BNG', 'ERC', 'JuntsxCat', 'EH-Bildu'],
-                        'Nacionalismo': [1, 1, 1, 1, 1, 2, 2, 3, 3, 4, 4, 4],
-                        'Tipo': ['No nacionalista', 'No nacionalista', 'No nacionalista', 
-                                'No nacionalista', 'No nacionalista', 'Regionalista moderado', 'Regionalista moderado',
-                                'Nacionalista', 'Nacionalista', 
-                                'Independentista', 'Independentista', 'Independentista']
-                    }
-                    st.table(pd.DataFrame(nationalism_data))
+                # Visualización
+                record_figure(tab_data['figure'])
+                st.plotly_chart(tab_data['figure'], use_container_width=True)
+            
+            else:
+                st.warning("⚠️ Datos insuficientes para análisis educativo.")
+    
+    # --- TAB 5: ANÁLISIS POR PAÍS ---
+    with tab5:
+        if tab5.open:
+            tab_data = TAB_CACHE.get('eda', 'country', builders, signature,
+                                     selected_var, df_filtered)
+            st.subheader(f"{DEPENDENT_VARS[selected_var]} por País")
+            
+            # Mapa coroplético - ampliado a ancho completo sin columnas laterales
+            st.markdown("### 🗺️ Mapa de Europa")
+            # Usar contenedor completo sin restricciones para maximizar el ancho del mapa
+            record_figure(tab_data['map'])
+            st.plotly_chart(tab_data['map'], use_container_width=True, config={
+                'displayModeBar': True,
+                'displaylogo': False,
+                'modeBarButtonsToRemove': ['select2d', 'lasso2d']
+            })
+            
+            # Ranking de países
+            st.markdown("### 🏆 Ranking de Países")
+            
+            top_countries, bottom_countries = tab_data['top'], tab_data['bottom']
+            
+            if not top_countries.empty and not bottom_countries.empty:
+                col1, col2 = st.columns(2)
+                
+                with col1:
+                    st.markdown("**Top 5 Países**")
+                    st.dataframe(
+                        top_countries[['country_name', 'mean', 'count']].rename(columns={
+                            'country_name': 'País',
+                            'mean': 'Media',
+                            'count': 'N'
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
                 
-                # Dispersograma nacionalismo
-                fig_nat = create_ideology_scatter(
-                    df_spain,
-                    selected_var_spain,
-                    f"{DEPENDENT_VARS[selected_var_spain]} vs Nacionalismo",
-                    x_var='nationalism'
-                )
-                st.plotly_chart(fig_nat, use_container_width=True)
+                with col2:
+                    st.markdown("**Bottom 5 Países**")
+                    st.dataframe(
+                        bottom_countries[['country_name', 'mean', 'count']].rename(columns={
+                            'country_name': 'País',
+                            'mean': 'Media',
+                            'count': 'N'
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                
+                # Gráfico comparativo
+                record_figure(tab_data['top_bottom_figure'])
+                st.plotly_chart(tab_data['top_bottom_figure'], use_container_width=True)
+            
             else:
-                st.warning("⚠️ Datos insuficientes para análisis de nacionalismo.")
+                st.warning("⚠️ Datos insuficientes para ranking de países.")
     
-    else:
-        st.warning("⚠️ Datos insuficientes de España en la selección actual.")
+    # Precargar en segundo plano las pestañas no visitadas
+    TAB_CACHE.prefetch('eda', builders, signature, selected_var, df_filtered)
+
+render_eda_section(df_filtered, signature, eda_builders)
 
 
 # ============================================================================
-# SECCIÓN: MATRIZ DE CORRELACIONES
+# SECCIÓN: ANÁLISIS ESPAÑA (IDEOLOGÍA Y PARTIDOS)
 # ============================================================================
 
-st.markdown('<a id="matriz-de-correlaci-n"></a>', unsafe_allow_html=True)
-render_section_header(
-    "Matriz de Correlaciones",
-    "Análisis de correlaciones entre todas las variables dependientes (Spearman)",
-    "📈"
-)
+@st.fragment
+@cancellable_section
+@perf_section("Análisis España")
+def render_spain_section(df_filtered: pd.DataFrame, signature: str, builders: dict):
+    """Renderiza el análisis específico de España por partido, ideología y nacionalismo."""
+    if 'ES' in df_filtered['cntry'].values:
+        st.markdown('<a id="an-lisis-espec-fico-espa-a"></a>', unsafe_allow_html=True)
+        render_section_header(
+            "Análisis Específico: España",
+            "Análisis de actitudes por partido político, ideología y nacionalismo",
+            "🟥🟨🟥"
+        )
+        
+        # Filtrar solo España
+        df_spain = df_filtered[df_filtered['cntry'] == 'ES']
+        
+        if len(df_spain) >= 30:
+            # Selector de variable
+            selected_var_spain = render_variable_selector(DEPENDENT_VARS, key="spain_var_select")
+            
+            # Tabs para análisis España
+            tab_spain1, tab_spain2, tab_spain3 = st.tabs(
+                list(SPAIN_TAB_LABELS.values()), key="spain_tabs", on_change="rerun"
+            )
+            
+            # --- TAB: POR PARTIDO ---
+            with tab_spain1:
+                if tab_spain1.open:
+                    tab_data = TAB_CACHE.get('spain', 'party', builders, signature,
+                                             selected_var_spain, df_spain)
+                    st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Partido Político")
+                    
+                    record_figure(tab_data['figure'])
+                    st.plotly_chart(tab_data['figure'], use_container_width=True)
+                    
+                    # Estadísticas por partido
+                    party_stats = tab_data['stats']
+                    
+                    st.markdown("### Estadísticas por Partido")
+                    st.dataframe(
+                        party_stats.rename(columns={
+                            'party_name': 'Partido',
+                            'count': 'N',
+                            'mean': 'Media',
+                            'median': 'Mediana',
+                            'std': 'Desv. Est.',
+                            'min': 'Mínimo',
+                            'max': 'Máximo'
+                        }),
+                        hide_index=True,
+                        use_container_width=True
+                    )
+            
+            # --- TAB: POR IDEOLOGÍA ---
+            with tab_spain2:
+                if tab_spain2.open:
+                    tab_data = TAB_CACHE.get('spain', 'ideology', builders, signature,
+                                             selected_var_spain, df_spain)
+                    st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Ideología")
+                    
+                    # Verificar datos suficientes
+                    if tab_data['sufficient']:
+                        # Correlación y gradiente ideológico
+                        corr, pval = tab_data['correlation'], tab_data['p_value']
+                        ideo_gradient = tab_data['gradient']
+                        
+                        # Métricas en una fila
+                        col1, col2, col3, col4 = st.columns(4)
+                        with col1:
+                            st.metric("Gradiente Ideológico", f"{ideo_gradient:.3f}")
+                        with col2:
+                            st.metric("Correlación con Ideología", f"{corr:.3f}")
+                        with col3:
+                            st.metric("Fuerza", interpret_correlation_strength(corr))
+                        with col4:
+                            significacion = "Sí (p < 0.05)" if pval < 0.05 else "No (p ≥ 0.05)"
+                            st.metric("Significación", significacion)
+                        
+                        # Nota interpretativa personalizada por variable
+                        ideology_notes = {
+                            'ipeqopta': {
+                                'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** apoyan **MÁS** la igualdad de oportunidades.",
+                                'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** apoyan **MÁS** la igualdad de oportunidades."
+                            },
+                            'eqpaybg': {
+                                'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** apoyan **MÁS** la igualdad salarial.",
+                                'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** apoyan **MÁS** la igualdad salarial."
+                            },
+                            'polintr': {
+                                'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** tienen **MÁS** interés en política.",
+                                'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** tienen **MÁS** interés en política."
+                            },
+                            'imwbcnt': {
+                                'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
+                                'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
+                            },
+                            'wsekpwr': {
+                                'positive': "**Nota:** Una correlación positiva indica que los votantes de **DERECHA** perciben **MÁS** control de las mujeres sobre los hombres.",
+                                'negative': "**Nota:** Una correlación negativa indica que los votantes de **IZQUIERDA** perciben **MÁS** control de las mujeres sobre los hombres."
+                            }
+                        }
+                        
+                        # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
+                        if abs(corr) >= 0.3:
+                            note_text = ideology_notes[selected_var_spain]['positive'] if corr > 0 else ideology_notes[selected_var_spain]['negative']
+                            
+                            # Verde para correlación positiva, rojo para negativa
+                            if corr > 0:
+                                st.success(note_text)  # Verde
+                            else:
+                                st.error(note_text)  # Rojo
+                        
+                        # Tabla de clasificación de partidos por ideología
+                        with st.expander("📋 Ver clasificación de partidos por ideología"):
+                            st.markdown("**Escala ideológica asignada a cada partido (1=Izquierda, 5=Derecha):**")
+                            
+                            ideology_data = {
+                                'Partido': ['SUMAR', 'ERC', 'EH-Bildu', 'BNG', 'PSOE', 'PACMA', 
+                                           'EAJ-PNV', 'Coalición Canaria', 'PP', 'JuntsxCat', 'UPN', 'VOX'],
+                                'Ideología': [1, 1, 1, 1, 2, 2, 3, 3, 4, 4, 4, 5],
+                                'Clasificación': ['Izquierda', 'Izquierda nacionalista', 'Izquierda nacionalista', 
+                                                 'Izquierda nacionalista', 'Centroizquierda', 'Centroizquierda ecologista',
+                                                 'Centroderecha nacionalista', 'Centroderecha regionalista', 
+                                                 'Derecha', 'Derecha nacionalista', 'Derecha regionalista', 'Derecha radical']
+                            }
+                            st.table(pd.DataFrame(ideology_data))
+                        
+                        # Dispersograma
+                        record_figure(tab_data['figure'])
+                        st.plotly_chart(tab_data['figure'], use_container_width=True)
+                    else:
+                        st.warning("⚠️ Datos insuficientes para análisis de ideología.")
+            
+            # --- TAB: POR NACIONALISMO ---
+            with tab_spain3:
+                if tab_spain3.open:
+                    tab_data = TAB_CACHE.get('spain', 'nationalism', builders, signature,
+                                             selected_var_spain, df_spain)
+                    st.subheader(f"{DEPENDENT_VARS[selected_var_spain]} por Nacionalismo")
+                    
+                    # Verificar datos suficientes
+                    if tab_data['sufficient']:
+                        # Correlación y gradiente nacionalista (Q4 - Q1 de nacionalismo)
+                        corr, pval = tab_data['correlation'], tab_data['p_value']
+                        nat_gradient = tab_data['gradient']
+                        
+                        # Métricas en una fila
+                        col1, col2, col3, col4 = st.columns(4)
+                        with col1:
+                            st.metric("Gradiente Nacionalista", f"{nat_gradient:.3f}")
+                        with col2:
+                            st.metric("Correlación con Nacionalismo", f"{corr:.3f}")
+                        with col3:
+                            st.metric("Fuerza", interpret_correlation_strength(corr))
+                        with col4:
+                            significacion = "Sí (p < 0.05)" if pval < 0.05 else "No (p ≥ 0.05)"
+                            st.metric("Significación", significacion)
+                        
+                        # Nota interpretativa personalizada por variable
+                        nationalism_notes = {
+                            'ipeqopta': {
+                                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** apoyan **MÁS** la igualdad de oportunidades.",
+                                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** apoyan **MÁS** la igualdad de oportunidades."
+                            },
+                            'eqpaybg': {
+                                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** apoyan **MÁS** la igualdad salarial.",
+                                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** apoyan **MÁS** la igualdad salarial."
+                            },
+                            'polintr': {
+                                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** tienen **MÁS** interés en política.",
+                                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** tienen **MÁS** interés en política."
+                            },
+                            'imwbcnt': {
+                                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** tienen una percepción **MÁS POSITIVA** sobre la inmigración.",
+                                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** tienen una percepción **MÁS POSITIVA** sobre la inmigración."
+                            },
+                            'wsekpwr': {
+                                'positive': "**Nota:** Una correlación positiva indica que las personas con **MAYOR NACIONALISMO** perciben **MÁS** control de las mujeres sobre los hombres.",
+                                'negative': "**Nota:** Una correlación negativa indica que las personas con **MENOR NACIONALISMO** perciben **MÁS** control de las mujeres sobre los hombres."
+                            }
+                        }
+                        
+                        # Mostrar nota solo si la correlación es al menos moderada (|r| >= 0.3)
+                        if abs(corr) >= 0.3:
+                            note_text = nationalism_notes[selected_var_spain]['positive'] if corr > 0 else nationalism_notes[selected_var_spain]['negative']
+                            
+                            # Verde para correlación positiva, rojo para negativa
+                            if corr > 0:
+                                st.success(note_text)  # Verde
+                            else:
+                                st.error(note_text)  # Rojo
+                        
+                        # Tabla de clasificación de partidos por nacionalismo
+                        with st.expander("📋 Ver clasificación de partidos por nacionalismo"):
+                            st.markdown("**Escala de nacionalismo asignada a cada partido (1=Bajo, 5=Alto):**")
+                            
+                            nationalism_data = {
+                                'Partido': ['PP', 'PSOE', 'VOX', 'SUMAR', 'PACMA', 'Coalición Canaria', 'UPN', 
+                                           'EAJ-PNV', 'BNG', 'ERC', 'JuntsxCat', 'EH-Bildu'],
+                                'Nacionalismo': [1, 1, 1, 1, 1, 2, 2, 3, 3, 4, 4, 4],
+                                'Tipo': ['No nacionalista', 'No nacionalista', 'No nacionalista', 
+                                        'No nacionalista', 'No nacionalista', 'Regionalista moderado', 'Regionalista moderado',
+                                        'Nacionalista', 'Nacionalista', 
+                                        'Independentista', 'Independentista', 'Independentista']
+                            }
+                            st.table(pd.DataFrame(nationalism_data))
+                        
+                        # Dispersograma nacionalismo
+                        record_figure(tab_data['figure'])
+                        st.plotly_chart(tab_data['figure'], use_container_width=True)
+                    else:
+                        st.warning("⚠️ Datos insuficientes para análisis de nacionalismo.")
+            
+            # Precargar en segundo plano las pestañas no visitadas
+            TAB_CACHE.prefetch('spain', builders, signature, selected_var_spain, df_spain)
+        
+        else:
+            st.warning("⚠️ Datos insuficientes de España en la selección actual.")
+
 
-# Crear matriz de correlación
-variables_for_corr = list(DEPENDENT_VARS.keys())
-available_vars = [v for v in variables_for_corr if v in df_filtered.columns]
+render_spain_section(df_filtered, spain_signature, spain_builders)
 
-if len(available_vars) >= 2:
-    fig_corr = create_correlation_heatmap(
-        df_filtered,
-        available_vars,
-        "Matriz de Correlación (Spearman)"
+
+# ============================================================================
+# SECCIÓN: MATRIZ DE CORRELACIONES
+# ============================================================================
+
+@st.fragment
+@cancellable_section
+@perf_section("Correlaciones")
+def render_correlation_section(df_filtered: pd.DataFrame, signature: str):
+    """Renderiza la matriz de correlaciones y sus interpretaciones destacadas."""
+    st.markdown('<a id="matriz-de-correlaci-n"></a>', unsafe_allow_html=True)
+    render_section_header(
+        "Matriz de Correlaciones",
+        "Análisis de correlaciones entre todas las variables dependientes (Spearman)",
+        "📈"
     )
-    st.plotly_chart(fig_corr, use_container_width=True)
-    
-    st.info("""
-    💡 **Interpretación:**
-    - Valores cercanos a **1** (rojo): correlación positiva fuerte
-    - Valores cercanos a **-1** (azul): correlación negativa fuerte
-    - Valores cercanos a **0** (blanco): sin correlación
-    """)
     
-    # =========================================================================
-    # INTERPRETACIONES DESTACADAS
-    # =========================================================================
-    st.markdown("### � INTERPRETACIONES DESTACADAS")
+    # Crear matriz de correlación
+    variables_for_corr = list(DEPENDENT_VARS.keys())
+    available_vars = [v for v in variables_for_corr if v in df_filtered.columns]
     
-    # Calcular todas las correlaciones con p-values
-    df_multivar = df_filtered[available_vars].dropna()
-    
-    if len(df_multivar) >= 10:
-        interpretations = []
+    if len(available_vars) >= 2:
+        # Matriz y correlaciones por pares (programadas al inicio de la ejecución)
+        section = TAB_CACHE.get('correlation', 'matrix', CORRELATION_SECTIONS, signature,
+                                None, df_filtered)
+        record_figure(section['figure'])
+        st.plotly_chart(section['figure'], use_container_width=True)
         
-        for i, var1 in enumerate(available_vars):
-            for j, var2 in enumerate(available_vars):
-                if i < j:  # Solo pares únicos (evitar duplicados y diagonal)
-                    corr, pval = calculate_spearman_correlation(df_multivar, var1, var2)
-                    
-                    # Solo mostrar correlaciones significativas Y con valor absoluto > 0.2
-                    if pval < 0.05 and abs(corr) > 0.2:
-                        # Determinar fuerza
-                        abs_corr = abs(corr)
-                        if abs_corr < 0.20:
-                            fuerza = "MUY DÉBIL"
-                        elif abs_corr < 0.40:
-                            fuerza = "DÉBIL"
-                        elif abs_corr < 0.60:
-                            fuerza = "MODERADA"
-                        elif abs_corr < 0.80:
-                            fuerza = "FUERTE"
-                        else:
-                            fuerza = "MUY FUERTE"
-                        
-                        # Significancia
-                        if pval < 0.001:
-                            sig = "***"
-                        elif pval < 0.01:
-                            sig = "**"
-                        else:
-                            sig = "*"
-                        
-                        interpretations.append({
-                            'var1': var1,
-                            'var2': var2,
-                            'corr': corr,
-                            'pval': pval,
-                            'fuerza': fuerza,
-                            'sig': sig,
-                            'abs_corr': abs_corr
-                        })
+        st.info("""
+        💡 **Interpretación:**
+        - Valores cercanos a **1** (rojo): correlación positiva fuerte
+        - Valores cercanos a **-1** (azul): correlación negativa fuerte
+        - Valores cercanos a **0** (blanco): sin correlación
+        """)
         
-        # Ordenar por valor absoluto de correlación (de mayor a menor)
-        interpretations.sort(key=lambda x: x['abs_corr'], reverse=True)
+        # =========================================================================
+        # INTERPRETACIONES DESTACADAS
+        # =========================================================================
+        st.markdown("### � INTERPRETACIONES DESTACADAS")
         
-        if interpretations:
-            for interp in interpretations:
-                var1_name = DEPENDENT_VARS[interp['var1']]
-                var2_name = DEPENDENT_VARS[interp['var2']]
-                
-                # Formato compacto sin columnas
-                st.markdown(f"""
-                ✓ **{var1_name}** vs **{var2_name}**: Correlación = **{interp['corr']:.4f}** ({interp['fuerza']}) | p-value: {interp['pval']:.4e} {interp['sig']}
-                """)
+        interpretations = section['interpretations']
+        
+        if interpretations is not None:
+            if interpretations:
+                for interp in interpretations:
+                    var1_name = DEPENDENT_VARS[interp['var1']]
+                    var2_name = DEPENDENT_VARS[interp['var2']]
+                    
+                    # Formato compacto sin columnas
+                    st.markdown(f"""
+                    ✓ **{var1_name}** vs **{var2_name}**: Correlación = **{interp['corr']:.4f}** ({interp['fuerza']}) | p-value: {interp['pval']:.4e} {interp['sig']}
+                    """)
+            else:
+                st.info("ℹ️ No se encontraron correlaciones significativas mayores a 0.2 entre las variables.")
         else:
-            st.info("ℹ️ No se encontraron correlaciones significativas mayores a 0.2 entre las variables.")
+            st.warning("⚠️ Datos insuficientes para calcular correlaciones significativas.")
     else:
-        st.warning("⚠️ Datos insuficientes para calcular correlaciones significativas.")
-else:
-    st.warning("⚠️ Se necesitan al menos 2 variables para crear matriz de correlación.")
+        st.warning("⚠️ Se necesitan al menos 2 variables para crear matriz de correlación.")
+
+
+render_correlation_section(df_filtered, signature)
 
 
 # ============================================================================
@@ -1128,3 +1118,9 @@ Basándose en el análisis exploratorio de datos del ESS11, se identifican los s
 
 render_methodology_expander()
 render_footer()
+
+# Estado de la sesión en el presupuesto de memoria (los datos filtrados son compartidos)
+account_session_memory(signature)
+
+if perf_recorder is not None:
+    render_perf_overlay(perf_recorder)
@@ -0,0 +1,454 @@
+"""
+Artefactos de servicio precalculados.
+Materializa el dataset limpio, los índices de filtros, los cubos de agregados y
+el catálogo de filtros en una carpeta versionada de archivos .npy que la
+aplicación abre con memory mapping en lugar de leer y limpiar el CSV.
+
+Estructura de <ARTIFACTS_DIR>/<versión>/:
+    manifest.json             Descripción de columnas, índices y cubos
+    row_index.npy             Índice de filas del DataFrame limpio
+    catalog.json              Catálogo de filtros (DataLoader.build_filter_catalog)
+    columns/<columna>.npy     Valores (numéricas) o códigos (texto y categóricas)
+    index/<columna>.positions.npy, index/<columna>.offsets.npy
+    cubes/<cubo>.npy          Matriz de agregados por combinación de dimensiones
+    snapshot.parquet          Dataset limpio en Parquet para los backends de consultas (si hay pyarrow)
+    readers/<pid>             Procesos que tienen abierta la versión (recuento de referencias)
+<ARTIFACTS_DIR>/CURRENT       Nombre de la versión activa
+"""
+
+import atexit
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from config import ARTIFACTS_DIR, DEPENDENT_VARS, CUBE_DIMENSIONS
+
+
+# Versión del formato de los artefactos (cambia si cambia la estructura)
+ARTIFACT_FORMAT = 1
+
+# Estadísticos de los cubos, por variable dependiente
+CUBE_STATISTICS = ['count', 'sum', 'sum_sq']
+
+
+# ============================================================================
+# CONSTRUCCIÓN
+# ============================================================================
+
+def _encode_column(series: pd.Series) -> tuple:
+    """
+    Convierte una columna en un array numpy y su descripción para el manifiesto.
+    
+    Args:
+        series: Columna del DataFrame limpio
+        
+    Returns:
+        Tupla (array, descripción)
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), {
+            'kind': 'categorical',
+            'categories': series.cat.categories.tolist(),
+            'ordered': bool(series.cat.ordered)
+        }
+    
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(), {'kind': 'numeric'}
+    
+    # Texto: se guarda como códigos sobre la lista de valores distintos
+    codes, uniques = pd.factorize(series, sort=True)
+    dtype = np.int8 if len(uniques) < 128 else np.int32
+    return codes.astype(dtype), {
+        'kind': 'string',
+        'categories': uniques.tolist(),
+        'dtype': str(series.dtype)
+    }
+
+
+def build_cube(df: pd.DataFrame, dimensions: list = CUBE_DIMENSIONS) -> pd.DataFrame:
+    """
+    Calcula el cubo de agregados (n, suma y suma de cuadrados de cada variable
+    dependiente) para cada combinación observada de las dimensiones.
+    
+    Args:
+        df: DataFrame limpio
+        dimensions: Columnas que definen las celdas del cubo
+        
+    Returns:
+        DataFrame con una fila por celda
+    """
+    variables = list(DEPENDENT_VARS)
+    values = df[variables]
+    
+    grouped = pd.concat(
+        [values.notna(), values, values ** 2], axis=1,
+        keys=CUBE_STATISTICS
+    ).groupby([df[d] for d in dimensions], observed=True, dropna=False).sum()
+    grouped.columns = [f"{stat}_{var}" for stat, var in grouped.columns]
+    
+    return grouped.reset_index()
+
+
+def build_artifacts(loader, output_dir: Path = ARTIFACTS_DIR) -> Path:
+    """
+    Construye la carpeta de artefactos de la versión actual del dataset y la
+    marca como activa.
+    
+    Args:
+        loader: DataLoader del archivo de datos
+        output_dir: Carpeta raíz de los artefactos
+        
+    Returns:
+        Ruta de la carpeta de la versión construida
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    # Siempre desde el CSV, aunque ya existan artefactos
+    df = loader.clean_data(loader.load_raw_data())
+    catalog = loader.build_filter_catalog(df)
+    filter_index = loader.build_filter_index(df)
+    version = catalog['version']
+    
+    # Se escribe en una carpeta temporal y se renombra al final (sin artefactos a medias)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=output_dir))
+    for sub in ('columns', 'index', 'cubes'):
+        (tmp_dir / sub).mkdir()
+    
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'version': version,
+        'source': str(loader.file_path),
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_rows': len(df),
+        'row_index': "row_index.npy",
+        'columns': {},
+        'index': {},
+        'cubes': {}
+    }
+    
+    # 1. Columnas del dataset limpio (y su índice de filas original)
+    np.save(tmp_dir / manifest['row_index'], df.index.to_numpy())
+    for column in df.columns:
+        array, description = _encode_column(df[column])
+        description['file'] = f"columns/{column}.npy"
+        np.save(tmp_dir / description['file'], np.ascontiguousarray(array))
+        manifest['columns'][column] = description
+    
+    # 2. Índices de filtros: posiciones agrupadas por valor y desplazamientos
+    for column, value_positions in filter_index.items():
+        values = list(value_positions)
+        positions = [value_positions[v] for v in values]
+        offsets = np.cumsum([0] + [len(p) for p in positions])
+        np.save(tmp_dir / f"index/{column}.positions.npy",
+                np.concatenate(positions).astype(np.int64) if positions else np.empty(0, np.int64))
+        np.save(tmp_dir / f"index/{column}.offsets.npy", offsets.astype(np.int64))
+        manifest['index'][column] = {
+            'values': [None if pd.isna(v) else v for v in values],
+            'positions': f"index/{column}.positions.npy",
+            'offsets': f"index/{column}.offsets.npy"
+        }
+    
+    # 3. Cubo de agregados
+    cube = build_cube(df)
+    dimensions = {d: cube[d].astype(object).where(cube[d].notna(), None).tolist() for d in CUBE_DIMENSIONS}
+    np.save(tmp_dir / "cubes/demographics.npy", cube.drop(columns=CUBE_DIMENSIONS).to_numpy(np.float64))
+    manifest['cubes']['demographics'] = {
+        'file': "cubes/demographics.npy",
+        'dimensions': dimensions,
+        'measures': [c for c in cube.columns if c not in CUBE_DIMENSIONS]
+    }
+    
+    # 4. Instantánea Parquet del dataset limpio (backends de consultas);
+    # el índice de filas se guarda como columna row_id
+    if pyarrow is not None:
+        manifest['snapshot'] = "snapshot.parquet"
+        df.rename_axis('row_id').to_parquet(tmp_dir / manifest['snapshot'], index=True)
+    
+    # 5. Catálogo de filtros
+    with open(tmp_dir / "catalog.json", 'w', encoding='utf-8') as f:
+        json.dump(catalog, f, indent=2, ensure_ascii=False, default=float)
+    with open(tmp_dir / "manifest.json", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    
+    # Si la versión ya existe se aparta antes de sustituirla: los procesos que la
+    # tienen mapeada conservan sus archivos y los nuevos abren la reconstruida
+    version_dir = output_dir / version
+    replaced_dir = None
+    if version_dir.exists():
+        replaced_dir = output_dir / f".{version}-replaced-{os.getpid()}"
+        os.replace(version_dir, replaced_dir)
+    os.replace(tmp_dir, version_dir)
+    if replaced_dir is not None:
+        shutil.rmtree(replaced_dir, ignore_errors=True)
+    
+    set_current_version(output_dir, version)
+    
+    return version_dir
+
+
+def set_current_version(output_dir: Path, version: str):
+    """
+    Marca una versión de artefactos como activa de forma atómica.
+    
+    Args:
+        output_dir: Carpeta raíz de los artefactos
+        version: Versión a activar
+    """
+    tmp_file = Path(output_dir) / f".CURRENT.{os.getpid()}"
+    tmp_file.write_text(version, encoding='utf-8')
+    os.replace(tmp_file, Path(output_dir) / "CURRENT")
+
+
+def get_current_version(output_dir: Path = ARTIFACTS_DIR) -> str:
+    """
+    Devuelve la versión de artefactos activa.
+    
+    Args:
+        output_dir: Carpeta raíz de los artefactos
+        
+    Returns:
+        Versión activa o None si no hay artefactos
+    """
+    current = Path(output_dir) / "CURRENT"
+    if not current.exists():
+        return None
+    
+    return current.read_text(encoding='utf-8').strip() or None
+
+
+def _pid_alive(pid: int) -> bool:
+    """Indica si existe un proceso con el pid dado."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def live_readers(version_dir: Path) -> list:
+    """
+    Devuelve los procesos vivos que tienen abierta una versión de artefactos,
+    eliminando los registros de procesos que ya no existen.
+    
+    Args:
+        version_dir: Carpeta de una versión
+        
+    Returns:
+        Lista de pids
+    """
+    readers_dir = Path(version_dir) / "readers"
+    if not readers_dir.exists():
+        return []
+    
+    pids = []
+    for reader in readers_dir.iterdir():
+        if reader.name.isdigit() and _pid_alive(int(reader.name)):
+            pids.append(int(reader.name))
+        else:
+            reader.unlink(missing_ok=True)
+    
+    return pids
+
+
+def collect_garbage(output_dir: Path = ARTIFACTS_DIR) -> list:
+    """
+    Elimina las versiones de artefactos que no están activas ni abiertas por
+    ningún proceso.
+    
+    Args:
+        output_dir: Carpeta raíz de los artefactos
+        
+    Returns:
+        Lista de versiones eliminadas
+    """
+    current = get_current_version(output_dir)
+    removed = []
+    
+    for version_dir in Path(output_dir).iterdir():
+        if (not version_dir.is_dir() or version_dir.name.startswith('.')
+                or version_dir.name == current or live_readers(version_dir)):
+            continue
+        shutil.rmtree(version_dir, ignore_errors=True)
+        removed.append(version_dir.name)
+    
+    return removed
+
+
+# ============================================================================
+# LECTURA
+# ============================================================================
+
+class ArtifactStore:
+    """
+    Acceso de solo lectura a una carpeta de artefactos. Los arrays se abren con
+    memory mapping, de modo que abrir el almacén no lee los datos a memoria.
+    """
+    
+    def __init__(self, path: Path):
+        """
+        Abre una carpeta de artefactos.
+        
+        Args:
+            path: Carpeta de una versión (<ARTIFACTS_DIR>/<versión>)
+        """
+        self.path = Path(path)
+        with open(self.path / "manifest.json", encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        
+        if self.manifest['format'] != ARTIFACT_FORMAT:
+            raise ValueError(
+                f"Formato de artefactos {self.manifest['format']} no soportado "
+                f"(se esperaba {ARTIFACT_FORMAT}); ejecuta 'python run.py build'"
+            )
+        
+        self.version = self.manifest['version']
+        self._reader_file = None
+    
+    @classmethod
+    def open_current(cls, output_dir: Path = ARTIFACTS_DIR):
+        """
+        Abre la versión de artefactos activa.
+        
+        Args:
+            output_dir: Carpeta raíz de los artefactos
+            
+        Returns:
+            ArtifactStore o None si no hay artefactos
+        """
+        version = get_current_version(output_dir)
+        if version is None or not (Path(output_dir) / version / "manifest.json").exists():
+            return None
+        
+        return cls(Path(output_dir) / version)
+    
+    def acquire(self):
+        """
+        Registra el proceso actual como lector de la versión, para que
+        collect_garbage() no la elimine mientras esté en uso.
+        """
+        if self._reader_file is not None:
+            return
+        
+        readers_dir = self.path / "readers"
+        readers_dir.mkdir(exist_ok=True)
+        self._reader_file = readers_dir / str(os.getpid())
+        self._reader_file.touch()
+        atexit.register(self.release)
+    
+    def release(self):
+        """Elimina el registro del proceso actual como lector de la versión."""
+        if self._reader_file is None:
+            return
+        
+        self._reader_file.unlink(missing_ok=True)
+        self._reader_file = None
+        atexit.unregister(self.release)
+    
+    def _load(self, relative: str) -> np.ndarray:
+        """Abre un array con memory mapping."""
+        return np.load(self.path / relative, mmap_mode='r')
+    
+    def load_frame(self, strings: str = 'decode') -> pd.DataFrame:
+        """
+        Reconstruye el DataFrame limpio. Las columnas numéricas y categóricas
+        apuntan directamente a los arrays mapeados en memoria.
+        
+        Args:
+            strings: Cómo cargar las columnas de texto:
+                - 'decode': con su tipo original (copia los valores en memoria)
+                - 'category': como categóricas sobre los códigos mapeados (sin copia)
+                
+        Returns:
+            DataFrame limpio
+        """
+        data = {}
+        
+        for column, description in self.manifest['columns'].items():
+            array = self._load(description['file'])
+            if description['kind'] == 'numeric':
+                data[column] = array
+            elif description['kind'] == 'categorical':
+                data[column] = pd.Categorical.from_codes(
+                    array, categories=description['categories'], ordered=description['ordered']
+                )
+            elif strings == 'category':
+                data[column] = pd.Categorical.from_codes(array, categories=description['categories'])
+            else:
+                values = np.asarray(description['categories'] + [np.nan], dtype=object)[array]
+                data[column] = pd.array(values, dtype=description['dtype'])
+        
+        return pd.DataFrame(data, index=self._load(self.manifest['row_index']), copy=False)
+    
+    def snapshot_path(self) -> Path:
+        """
+        Devuelve la instantánea Parquet del dataset limpio.
+        
+        Returns:
+            Ruta del archivo, o None si la versión no la tiene (sin pyarrow al construirla)
+        """
+        snapshot = self.manifest.get('snapshot')
+        return self.path / snapshot if snapshot else None
+    
+    def load_catalog(self) -> dict:
+        """
+        Carga el catálogo de filtros.
+        
+        Returns:
+            Diccionario del catálogo
+        """
+        with open(self.path / "catalog.json", encoding='utf-8') as f:
+            return json.load(f)
+    
+    def load_filter_index(self) -> dict:
+        """
+        Carga el índice de filtros; las posiciones son vistas del array mapeado.
+        
+        Returns:
+            Diccionario {columna: {valor: posiciones}}
+        """
+        index = {}
+        
+        for column, description in self.manifest['index'].items():
+            positions = self._load(description['positions'])
+            offsets = self._load(description['offsets'])
+            index[column] = {
+                value: positions[offsets[i]:offsets[i + 1]]
+                for i, value in enumerate(description['values'])
+            }
+        
+        return index
+    
+    def load_cube(self, name: str = 'demographics') -> pd.DataFrame:
+        """
+        Carga un cubo de agregados.
+        
+        Args:
+            name: Nombre del cubo
+            
+        Returns:
+            DataFrame con las dimensiones y las medidas (count_, sum_, sum_sq_<variable>),
+            o None si los artefactos no tienen ese cubo
+        """
+        description = self.manifest.get('cubes', {}).get(name)
+        if description is None:
+            return None
+        cube = pd.DataFrame(self._load(description['file']), columns=description['measures'], copy=False)
+        
+        for position, (dimension, values) in enumerate(description['dimensions'].items()):
+            cube.insert(position, dimension, values)
+        
+        return cube
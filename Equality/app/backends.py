@@ -0,0 +1,325 @@
+"""
+Backends de consultas del DataLoader (opcionales).
+Un backend resuelve fuera de pandas las consultas de datos del panel: las filas
+filtradas (filtered_data), las medias por grupo (group_means) y las
+estadísticas por grupo (group_statistics). A pandas solo vuelven los
+resultados, que son los que reciben los gráficos y las tablas.
+
+Implementaciones (QUERY_BACKEND en config.py):
+- 'duckdb' (duckdb_backend.py): SQL sobre la instantánea Parquet de los
+  artefactos ('python run.py build').
+- 'polars' (polars_backend.py): planes lazy de Polars sobre el dataset limpio.
+  Sin artefactos, la carga y limpieza del CSV también son un plan de Polars.
+
+Con 'pandas', o si falta el paquete o la instantánea, DataLoader usa pandas.
+La paridad con pandas se comprueba con 'python -m benchmarks.parity_backends'.
+
+Sin backend, CubeQuery sirve las medias por grupo desde el cubo de agregados de
+los artefactos (cubes/demographics.npy) cuando los filtros y la agrupación son
+dimensiones del cubo (CUBE_DIMENSIONS).
+"""
+
+import threading
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from config import QUERY_BACKEND, CUBE_DIMENSIONS, ISO2_TO_NAME, ISO2_TO_ISO3
+from memory import MEMORY_BUDGET
+
+
+class QueryBackend:
+    """
+    Interfaz común de los backends de consultas. Las columnas se validan
+    contra el esquema del dataset y los filtros siguen el criterio de
+    DataLoader.get_filtered_data (sin valores no se filtra; las columnas
+    desconocidas se ignoran).
+    """
+    
+    def __init__(self, version: str, dtypes: pd.Series):
+        """
+        Inicializa el backend.
+        
+        Args:
+            version: Versión del dataset
+            dtypes: Tipos de las columnas del DataFrame limpio (para devolver
+                los resultados con los mismos tipos que pandas)
+        """
+        self.version = version
+        self.dtypes = dtypes
+    
+    def filtered_data(self, filters: dict, columns: list = None) -> pd.DataFrame:
+        """
+        Filtra el dataset y devuelve las filas con el orden y el índice del
+        DataFrame limpio.
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            columns: Columnas a devolver (por defecto todas)
+            
+        Returns:
+            DataFrame filtrado
+        """
+        raise NotImplementedError
+    
+    def group_means(self, filters: dict, variable: str, by, spain: bool = False) -> pd.DataFrame:
+        """
+        Media y observaciones válidas de una variable por grupo (equivale a
+        df.groupby(by)[variable].agg(['mean', 'count']).reset_index()).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            variable: Variable dependiente
+            by: Columna o lista de columnas de agrupación
+            spain: Si True, solo filas de España
+            
+        Returns:
+            DataFrame con las columnas de agrupación, mean y count, ordenado por grupo
+        """
+        raise NotImplementedError
+    
+    def group_statistics(self, filters: dict, variable: str, group_by: str,
+                         spain: bool = False) -> pd.DataFrame:
+        """
+        Estadísticas por grupo (mismas columnas que calculate_group_statistics).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            variable: Variable dependiente
+            group_by: Variable de agrupación
+            spain: Si True, solo filas de España
+            
+        Returns:
+            DataFrame con count, mean, median, std, min y max por grupo
+        """
+        raise NotImplementedError
+    
+    def nbytes(self) -> int:
+        """Memoria propia del backend (la que no comparte con el DataFrame limpio)."""
+        return 0
+    
+    def _restore_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Devuelve a las columnas del dataset su tipo original (categóricas, texto)."""
+        return df.astype({c: self.dtypes[c] for c in df.columns if c in self.dtypes.index})
+    
+    def bind(self, filters: dict) -> 'FilteredQuery':
+        """
+        Fija los filtros para las consultas de una pestaña.
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            
+        Returns:
+            FilteredQuery con esos filtros
+        """
+        return FilteredQuery(self, filters)
+
+
+class FilteredQuery:
+    """
+    Consultas de agregados del backend con unos filtros fijos. Es lo que
+    reciben las pestañas (parámetro query) en lugar de agregar el DataFrame.
+    """
+    
+    def __init__(self, backend: QueryBackend, filters: dict):
+        """
+        Inicializa la consulta.
+        
+        Args:
+            backend: Backend de consultas
+            filters: Diccionario con filtros {columna: valores}
+        """
+        self.backend = backend
+        self.filters = filters
+    
+    def group_means(self, variable: str, by, spain: bool = False) -> pd.DataFrame:
+        """Ver QueryBackend.group_means."""
+        return self.backend.group_means(self.filters, variable, by, spain)
+    
+    def group_statistics(self, variable: str, group_by: str, spain: bool = False) -> pd.DataFrame:
+        """Ver QueryBackend.group_statistics."""
+        return self.backend.group_statistics(self.filters, variable, group_by, spain)
+
+
+class CubeQuery:
+    """
+    Medias por grupo calculadas con el cubo de agregados de los artefactos (ver
+    artifacts.build_cube) y unos filtros fijos: suma y conteo de las celdas que
+    cumplen los filtros, sin recorrer las filas. Misma interfaz que
+    FilteredQuery para las agrupaciones por dimensiones del cubo.
+    """
+    
+    # Columnas de agrupación derivadas de una dimensión del cubo
+    DERIVED = {
+        'country_iso3': ('country_name', {ISO2_TO_NAME[c]: ISO2_TO_ISO3[c] for c in ISO2_TO_NAME if c in ISO2_TO_ISO3})
+    }
+    
+    def __init__(self, cube: pd.DataFrame, dtypes: pd.Series, filters: dict):
+        """
+        Inicializa la consulta.
+        
+        Args:
+            cube: Cubo de agregados (ArtifactStore.load_cube)
+            dtypes: Tipos de las columnas del DataFrame limpio
+            filters: Diccionario con filtros {columna: valores} (solo de CUBE_DIMENSIONS)
+        """
+        self.dtypes = dtypes
+        self.filters = filters
+        mask = pd.Series(True, index=cube.index)
+        for column, values in filters.items():
+            if values:
+                mask &= cube[column].isin(values if isinstance(values, list) else [values])
+        self.cells = cube[mask]
+    
+    @staticmethod
+    def supports(filters: dict) -> bool:
+        """Indica si todos los filtros con valores son dimensiones del cubo."""
+        return all(column in CUBE_DIMENSIONS for column, values in filters.items() if values)
+    
+    def group_means(self, variable: str, by, spain: bool = False) -> pd.DataFrame:
+        """Ver QueryBackend.group_means."""
+        keys = [by] if isinstance(by, str) else list(by)
+        cells = self.cells
+        if spain:
+            cells = cells[cells['country_name'] == ISO2_TO_NAME['ES']]
+        
+        for key in keys:
+            if key in self.DERIVED:
+                source, mapping = self.DERIVED[key]
+                cells = cells.assign(**{key: cells[source].map(mapping)})
+            elif key not in CUBE_DIMENSIONS:
+                raise ValueError(f"{key} no es una dimensión del cubo")
+        
+        grouped = cells.groupby(keys, observed=True)[[f'count_{variable}', f'sum_{variable}']].sum()
+        counts = grouped[f'count_{variable}']
+        result = pd.DataFrame({
+            'mean': grouped[f'sum_{variable}'] / counts.where(counts > 0),
+            'count': counts.astype('int64')
+        }).reset_index()
+        
+        result = result.astype({key: self.dtypes[key] for key in keys if key in self.dtypes.index})
+        return result.sort_values(keys, ignore_index=True)
+    
+    def group_statistics(self, variable: str, group_by: str, spain: bool = False) -> pd.DataFrame:
+        """El cubo solo guarda conteos y sumas: no hay medianas ni extremos."""
+        raise NotImplementedError("El cubo de agregados no tiene estadísticas por grupo")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_warned = False
+_cube = None
+
+
+def _warn(reason: str):
+    """Avisa una sola vez de que el backend configurado no está disponible."""
+    global _warned
+    if not _warned:
+        _warned = True
+        warnings.warn(f"QUERY_BACKEND='{QUERY_BACKEND}' pero {reason}; se usa pandas", RuntimeWarning)
+
+
+def _open_backend(version: str, dtypes: pd.Series, snapshot: Path, source: Path) -> QueryBackend:
+    """Crea el backend de QUERY_BACKEND (None si no está disponible)."""
+    if QUERY_BACKEND == 'duckdb':
+        from duckdb_backend import DuckDBBackend, duckdb
+        
+        if duckdb is None:
+            _warn("duckdb no está instalado")
+        elif snapshot is None:
+            _warn("los artefactos no tienen instantánea Parquet")
+        else:
+            return DuckDBBackend(snapshot, version, dtypes)
+    
+    elif QUERY_BACKEND == 'polars':
+        from polars_backend import PolarsBackend, pl
+        
+        if pl is None:
+            _warn("polars no está instalado")
+        elif snapshot is not None:
+            return PolarsBackend.from_parquet(snapshot, version, dtypes)
+        elif source is not None:
+            return PolarsBackend.from_csv(source, version)
+        else:
+            _warn("los artefactos no tienen instantánea Parquet")
+    
+    elif QUERY_BACKEND != 'pandas':
+        _warn("no es un backend conocido")
+    
+    return None
+
+
+def activate_backend(version: str, dtypes: pd.Series = None, snapshot: Path = None,
+                     source: Path = None) -> QueryBackend:
+    """
+    Abre el backend de QUERY_BACKEND para el dataset recién cargado (ver
+    DataLoader) y lo deja activo para el resto del proceso.
+    
+    Args:
+        version: Versión del dataset
+        dtypes: Tipos de las columnas del DataFrame limpio (None si el backend
+            hace también la limpieza)
+        snapshot: Ruta de la instantánea Parquet de los artefactos (None si no hay)
+        source: Ruta del CSV, para los backends que pueden cargarlo sin artefactos
+        
+    Returns:
+        Backend de consultas o None si el backend es pandas o no está disponible
+    """
+    global _backend
+    
+    if QUERY_BACKEND == 'pandas':
+        return None
+    
+    with _backend_lock:
+        if _backend is None or _backend.version != version:
+            _backend = _open_backend(version, dtypes, snapshot, source)
+            MEMORY_BUDGET.set_base(('query_backend', 0), _backend.nbytes() if _backend else 0)
+        return _backend
+
+
+def current_backend(version: str = None) -> QueryBackend:
+    """
+    Devuelve el backend activo.
+    
+    Args:
+        version: Si se indica, solo se devuelve si es de esa versión del dataset
+        
+    Returns:
+        QueryBackend o None
+    """
+    backend = _backend
+    if backend is None or (version is not None and backend.version != version):
+        return None
+    return backend
+
+
+def activate_cube(version: str, cube: pd.DataFrame = None, dtypes: pd.Series = None):
+    """
+    Deja activo el cubo de agregados de la versión del dataset cargada (None
+    si los datos no vienen de artefactos con cubo).
+    
+    Args:
+        version: Versión del dataset
+        cube: Cubo de agregados (ArtifactStore.load_cube)
+        dtypes: Tipos de las columnas del DataFrame limpio
+    """
+    global _cube
+    _cube = (version, cube, dtypes) if cube is not None else None
+
+
+def cube_query(filters: dict) -> CubeQuery:
+    """
+    Devuelve las consultas del cubo activo con unos filtros.
+    
+    Args:
+        filters: Diccionario con filtros {columna: valores}
+        
+    Returns:
+        CubeQuery o None si no hay cubo o algún filtro no es una dimensión del cubo
+    """
+    active = _cube
+    if active is None or not CubeQuery.supports(filters):
+        return None
+    _, cube, dtypes = active
+    return CubeQuery(cube, dtypes, filters)
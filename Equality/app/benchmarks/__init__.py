@@ -0,0 +1,6 @@
+"""
+Benchmarks de rendimiento del Panel ESS11.
+
+Ejecutar desde la carpeta app, por ejemplo:
+    python -m benchmarks.bench_figures
+"""
@@ -0,0 +1,155 @@
+"""
+Prueba de carga de la API de agregados.
+
+Lanza 'python run.py api' en un proceso aparte y mide las peticiones por
+segundo con varios clientes concurrentes (conexiones keep-alive) en tres
+escenarios: respuestas calculadas por primera vez, respuestas ya en caché y
+revalidaciones con If-None-Match (304).
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_api [--clients 8] [--requests 2000]
+"""
+
+import argparse
+import http.client
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+from config import DEPENDENT_VARS
+
+
+def build_urls() -> list:
+    """Construye un conjunto de URLs variadas (endpoints, variables y filtros)."""
+    filter_sets = [
+        [],
+        [('gender_label', 'Mujer')],
+        [('gender_label', 'Hombre')],
+        [('age_group', '25-34'), ('age_group', '35-44')],
+        [('country_name', 'España'), ('country_name', 'Francia')],
+    ]
+    urls = []
+    for endpoint in ('/api/kpis', '/api/stats', '/api/country-ranking', '/api/spain/parties'):
+        for variable in DEPENDENT_VARS:
+            for filters in filter_sets:
+                urls.append(f"{endpoint}?{urlencode([('variable', variable)] + filters)}")
+    return urls
+
+
+def free_port() -> int:
+    """Obtiene un puerto TCP libre."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_api(port: int, timeout: float = 120.0):
+    """Espera a que la API acepte peticiones."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/api/catalog')
+            conn.getresponse().read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def load_test(port: int, urls: list, clients: int, n_requests: int, etags: dict = None) -> dict:
+    """
+    Ejecuta una ronda de peticiones con varios clientes concurrentes.
+
+    Args:
+        port: Puerto de la API
+        urls: URLs que se reparten los clientes en turno rotatorio
+        clients: Número de clientes (hilos con su propia conexión)
+        n_requests: Peticiones totales
+        etags: Si se indica, envía If-None-Match con el ETag de cada URL
+
+    Returns:
+        Diccionario con peticiones/s, mediana y p95 (ms), estados y ETags recibidos
+    """
+    latencies = []
+    statuses = {}
+    received = {}
+    lock = threading.Lock()
+
+    def client(index):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local_latencies = []
+        local_statuses = {}
+        for i in range(index, n_requests, clients):
+            url = urls[i % len(urls)]
+            headers = {'If-None-Match': etags[url]} if etags else {}
+            start = time.perf_counter()
+            conn.request('GET', url, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local_latencies.append((time.perf_counter() - start) * 1000)
+            local_statuses[response.status] = local_statuses.get(response.status, 0) + 1
+            received[url] = response.getheader('ETag')
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'rps': len(latencies) / elapsed,
+        'median': statistics.median(latencies),
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'statuses': statuses,
+        'etags': received
+    }
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help="Clientes concurrentes")
+    parser.add_argument('--requests', type=int, default=2000, help="Peticiones por escenario")
+    args = parser.parse_args()
+
+    port = free_port()
+    api = subprocess.Popen(
+        [sys.executable, 'run.py', 'api', '--port', str(port)],
+        cwd=Path(__file__).parent.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    urls = build_urls()
+    try:
+        wait_for_api(port)
+        cold = load_test(port, urls, args.clients, len(urls))
+        warm = load_test(port, urls, args.clients, args.requests)
+        revalidated = load_test(port, urls, args.clients, args.requests, etags=warm['etags'])
+    finally:
+        api.terminate()
+        api.wait()
+
+    print(f"{len(urls)} URLs distintas, {args.clients} clientes concurrentes")
+    print(f"{'Escenario':<20}{'peticiones/s':>14}{'mediana (ms)':>14}{'p95 (ms)':>10}  estados")
+    print("-" * 76)
+    for name, result in (('primera vez', cold), ('en caché', warm), ('304 (ETag)', revalidated)):
+        statuses = ", ".join(f"{status}: {count}" for status, count in sorted(result['statuses'].items()))
+        print(f"{name:<20}{result['rps']:>14.0f}{result['median']:>14.2f}{result['p95']:>10.2f}  {statuses}")
+
+
+if __name__ == "__main__":
+    main()
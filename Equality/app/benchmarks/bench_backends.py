@@ -0,0 +1,146 @@
+"""
+Benchmark de los backends de consultas (Polars, DuckDB) frente a pandas.
+
+Para cada escala (por defecto 1x y 10x el tamaño del ESS11, con datos de
+benchmarks.synthetic) mide el tiempo mediano de:
+- la carga y limpieza del CSV (pandas: read_csv + clean_data; Polars: el plan
+  lazy de clean_plan, con y sin la conversión final a pandas);
+- los filtros del sidebar (filas filtradas como DataFrame de pandas);
+- las medias por grupo de las pestañas y las estadísticas por partido para
+  todas las variables dependientes.
+DuckDB no carga el CSV: sus consultas leen la instantánea Parquet.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_backends [--scales 40k 400k] [--repeat 3]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+from benchmarks.parity_backends import GROUPINGS, filter_cases
+from benchmarks.synthetic import SCALES, write_dataset
+from cache import MemoryCache
+from config import DEPENDENT_VARS
+from data_loader import DataLoader
+from duckdb_backend import DuckDBBackend, duckdb
+from polars_backend import PolarsBackend, pl
+
+
+def measure(fn, repeat: int) -> float:
+    """Tiempo mediano de fn en milisegundos."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000
+
+
+def pandas_queries(loader: DataLoader, df, filters: dict):
+    """Filtro y agregados de las pestañas en pandas (como sin backend)."""
+    df_filtered = loader.get_filtered_data(df, filters)
+    df_spain = df_filtered[(df_filtered['cntry'] == 'ES') & df_filtered['party_name'].notna()]
+    for variable in DEPENDENT_VARS:
+        for by, spain in GROUPINGS.values():
+            source = df_spain if spain else df_filtered
+            source.groupby(by)[variable].agg(['mean', 'count']).reset_index()
+        df_spain.groupby('party_name')[variable].agg(
+            ['count', 'mean', 'median', 'std', 'min', 'max']
+        ).reset_index()
+
+
+def backend_queries(backend, filters: dict):
+    """Los mismos agregados en un backend de consultas."""
+    query = backend.bind(filters)
+    for variable in DEPENDENT_VARS:
+        for by, spain in GROUPINGS.values():
+            query.group_means(variable, by, spain=spain)
+        query.group_statistics(variable, 'party_name', spain=True)
+
+
+def run_scale(rows: int, data_file: Path, snapshot: Path, repeat: int) -> dict:
+    """
+    Mide todas las operaciones en una escala.
+
+    Args:
+        rows: Filas del dataset
+        data_file: CSV sintético
+        snapshot: Ruta donde escribir la instantánea Parquet
+        repeat: Repeticiones de cada medida
+
+    Returns:
+        Diccionario {operación: {motor: ms}}
+    """
+    loader = DataLoader(data_file, cache=MemoryCache())
+    # Sin la caché del cargador, como en benchmarks.suite
+    load_and_clean = lambda: loader.clean_data(loader.read_raw_data())
+    df = load_and_clean()
+    catalog = loader.build_filter_catalog(df)
+    # Sin catálogo en la instantánea: get_filtered_data mide el filtrado en pandas
+    loader.snapshot = (df, None, loader.build_filter_index(df))
+    df.rename_axis('row_id').to_parquet(snapshot, index=True)
+
+    results = {'carga y limpieza': {}}
+    results['carga y limpieza']['pandas'] = measure(load_and_clean, repeat)
+
+    backends = {}
+    if pl is not None:
+        results['carga y limpieza']['polars (plan)'] = measure(
+            lambda: PolarsBackend.from_csv(data_file, catalog['version']), repeat
+        )
+        results['carga y limpieza']['polars'] = measure(
+            lambda: PolarsBackend.from_csv(data_file, catalog['version']).to_pandas(), repeat
+        )
+        backends['polars'] = PolarsBackend.from_csv(data_file, catalog['version'])
+    if duckdb is not None:
+        backends['duckdb'] = DuckDBBackend(snapshot, catalog['version'], df.dtypes)
+
+    for case, filters in filter_cases(catalog).items():
+        if case == 'sin filas':
+            continue
+        if filters:
+            results[f"filtro: {case}"] = {'pandas': measure(lambda: loader.get_filtered_data(df, filters), repeat)}
+            for name, backend in backends.items():
+                results[f"filtro: {case}"][name] = measure(lambda: backend.filtered_data(filters), repeat)
+
+        results[f"agregados: {case}"] = {'pandas': measure(lambda: pandas_queries(loader, df, filters), repeat)}
+        for name, backend in backends.items():
+            results[f"agregados: {case}"][name] = measure(lambda: backend_queries(backend, filters), repeat)
+
+    return results
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=['40k', '400k'], choices=list(SCALES),
+                        help="Escalas (40k ≈ ESS11, 400k = 10x)")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones de cada medida")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    if pl is None:
+        print("⚠️  polars no está instalado (pip install polars); solo se mide pandas")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for scale in args.scales:
+            data_file = write_dataset(SCALES[scale], tmp / f"ess11_{scale}.csv")
+            results = run_scale(SCALES[scale], data_file, tmp / f"snapshot_{scale}.parquet", args.repeat)
+            engines = list(dict.fromkeys(engine for row in results.values() for engine in row))
+
+            print(f"\n{scale} filas ({SCALES[scale]:,})")
+            print(f"{'Operación (ms)':<32}" + "".join(f"{engine:>16}" for engine in engines))
+            print("-" * (32 + 16 * len(engines)))
+            for operation, row in results.items():
+                print(f"{operation:<32}" + "".join(
+                    f"{row[engine]:>16.1f}" if engine in row else f"{'':>16}" for engine in engines
+                ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark de la cancelación de cálculos con cambios rápidos de filtros.
+
+Simula una sesión en la que el usuario cambia de país cada --interval
+segundos mientras la ejecución anterior sigue calculando (resumen y tests de
+cada variable, matriz de correlaciones y precarga de las pestañas EDA). Como
+en Streamlit, un único hilo ejecuta el script y las peticiones pendientes se
+agrupan en la última. Compara el tiempo de CPU total y el tiempo hasta el
+resultado de los últimos filtros con y sin cancelación.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_cancellation [--clicks 10] [--interval 0.1]
+"""
+
+import argparse
+import threading
+import time
+import warnings
+
+from analytics import perform_gender_comparison, perform_age_correlation, perform_education_correlation
+from cancellation import CancelToken, FilterGeneration, OperationCancelled, activate, get_cancellation_stats
+from config import DEPENDENT_VARS
+from data_loader import DataLoader, filter_signature
+from sections import LazyTabCache, EDA_TABS, compute_variable_summary, compute_correlation_section
+
+
+def heavy_run(loader: DataLoader, df, filters: dict, tab_cache: LazyTabCache):
+    """Cálculos de una ejecución completa del panel para unos filtros."""
+    variables = list(DEPENDENT_VARS)
+    signature = filter_signature(filters)
+    df_filtered = loader.get_filtered_data(df, filters)
+
+    for variable in variables:
+        compute_variable_summary(df_filtered, variable)
+        perform_gender_comparison(df_filtered, variable)
+        perform_age_correlation(df_filtered, variable)
+        perform_education_correlation(df_filtered, variable)
+    compute_correlation_section(df_filtered, variables)
+
+    tab_cache.get('eda', 'distribution', EDA_TABS, signature, variables[0], df_filtered)
+    tab_cache.prefetch('eda', EDA_TABS, signature, variables[0], df_filtered)
+
+
+def simulate(loader: DataLoader, df, clicks: list, interval: float, cancel: bool) -> dict:
+    """
+    Reproduce la secuencia de clics con o sin cancelación.
+
+    Args:
+        loader: DataLoader con los datos cargados
+        df: Dataset limpio
+        clicks: Lista de diccionarios de filtros, uno por clic
+        interval: Segundos entre clics
+        cancel: Si True, cancela los cálculos de generaciones superadas
+
+    Returns:
+        Diccionario con CPU total, tiempo hasta el último resultado y ejecuciones
+    """
+    tab_cache = LazyTabCache()
+    generation = FilterGeneration()
+    state = {'requested': 0, 'running': 0, 'filters': None, 'completed': 0, 'cancelled': 0}
+    condition = threading.Condition()
+
+    def rerun_requested():
+        return state['requested'] > state['running']
+
+    def script_runner():
+        while True:
+            with condition:
+                # Como en Streamlit, las peticiones pendientes se agrupan en la última
+                condition.wait_for(lambda: state['requested'] > state['running'])
+                state['running'] = state['requested']
+                filters = state['filters']
+
+            if cancel:
+                signature = filter_signature(filters)
+                if signature != generation.signature:
+                    generation.advance(signature)
+                activate(CancelToken(parent=generation.token, probe=rerun_requested))
+            else:
+                activate(None)
+
+            try:
+                heavy_run(loader, df, filters, tab_cache)
+                outcome = 'completed'
+            except OperationCancelled:
+                outcome = 'cancelled'
+
+            with condition:
+                state[outcome] += 1
+                if state['running'] == len(clicks) and outcome == 'completed':
+                    return
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    runner = threading.Thread(target=script_runner)
+    runner.start()
+    for i, filters in enumerate(clicks):
+        with condition:
+            state['requested'] = i + 1
+            state['filters'] = filters
+            condition.notify()
+        time.sleep(interval)
+    runner.join()
+    last_result = time.perf_counter() - wall
+
+    # La precarga en segundo plano también consume CPU
+    tab_cache._executor.shutdown(wait=True)
+
+    return {
+        'cpu': time.process_time() - cpu,
+        'last_result': last_result,
+        'completed': state['completed'],
+        'cancelled': state['cancelled']
+    }
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clicks', type=int, default=10, help="Cambios de filtros")
+    parser.add_argument('--interval', type=float, default=0.1, help="Segundos entre cambios")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    loader = DataLoader()
+    df = loader.get_data()
+    countries = loader.get_filter_catalog()['countries']
+    clicks = [{'country_name': countries[:i + 2]} for i in range(args.clicks)]
+
+    # Calentar importaciones y cachés fuera de la medición
+    heavy_run(loader, df, {}, LazyTabCache())
+
+    results = {
+        'sin cancelación': simulate(loader, df, clicks, args.interval, cancel=False),
+        'con cancelación': simulate(loader, df, clicks, args.interval, cancel=True),
+    }
+
+    print(f"{args.clicks} cambios de filtros cada {args.interval:.2f} s")
+    print(f"{'Modo':<20}{'CPU (s)':>10}{'último resultado (s)':>22}{'completas':>11}{'canceladas':>12}")
+    print("-" * 75)
+    for name, result in results.items():
+        print(f"{name:<20}{result['cpu']:>10.2f}{result['last_result']:>22.2f}"
+              f"{result['completed']:>11}{result['cancelled']:>12}")
+
+    saved = results['sin cancelación']['cpu'] - results['con cancelación']['cpu']
+    print(f"\nCPU ahorrada: {saved:.2f} s "
+          f"({saved / results['sin cancelación']['cpu'] * 100:.0f}%); "
+          f"puntos de control que cancelaron: {get_cancellation_stats()['cancelled']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Microbenchmark de los constructores de figuras de visualizations.py.
+
+Compara, para cada función create_*, la ruta de Plotly Express con la ruta
+rápida de graph_objects sobre un DataFrame sintético con la forma del
+dataset limpio.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_figures [--rows 40000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import visualizations as viz
+from data_loader import assign_education_quartiles
+from config import (
+    AGE_BINS, AGE_LABELS, DEPENDENT_VARS, EDUCATION_SCALE,
+    ISO2_TO_ISO3, ISO2_TO_NAME, PARTY_NAMES, IDEOLOGY_SCALE, NATIONALISM_SCALE
+)
+
+
+def make_clean_frame(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Genera un DataFrame sintético con las columnas del dataset limpio.
+
+    Args:
+        n_rows: Número de filas
+        seed: Semilla aleatoria
+
+    Returns:
+        DataFrame con la forma de DataLoader.clean_data()
+    """
+    rng = np.random.default_rng(seed)
+    cntry = rng.choice(list(ISO2_TO_NAME), n_rows)
+    party = np.where(cntry == 'ES', rng.choice(list(PARTY_NAMES), n_rows), np.nan)
+    gndr = rng.choice([1, 2], n_rows)
+    agea = rng.integers(15, 90, n_rows)
+
+    df = pd.DataFrame({
+        'cntry': cntry,
+        'gndr': gndr,
+        'agea': agea,
+        'prtvtges': party,
+        'ipeqopta': rng.integers(1, 7, n_rows),
+        'eqpaybg': rng.integers(0, 7, n_rows),
+        'polintr': rng.integers(1, 5, n_rows),
+        'imwbcnt': rng.integers(0, 11, n_rows),
+        'wsekpwr': rng.integers(1, 6, n_rows),
+        'education_level': rng.choice(sorted(set(EDUCATION_SCALE.values())), n_rows),
+    })
+    df['age_group'] = pd.cut(df['agea'], bins=AGE_BINS, labels=AGE_LABELS, right=False)
+    df['ideology'] = df['prtvtges'].map(IDEOLOGY_SCALE)
+    df['nationalism'] = df['prtvtges'].map(NATIONALISM_SCALE)
+    df['party_name'] = df['prtvtges'].map(PARTY_NAMES)
+    df['country_name'] = df['cntry'].map(ISO2_TO_NAME)
+    df['country_iso3'] = df['cntry'].map(ISO2_TO_ISO3)
+    df['gender_label'] = df['gndr'].map({1: 'Hombre', 2: 'Mujer'})
+    df['education_quartile'] = assign_education_quartiles(df)
+
+    return df
+
+
+def get_cases(df: pd.DataFrame, variable: str) -> dict:
+    """
+    Define un caso de benchmark por cada función create_* del módulo.
+
+    Args:
+        df: DataFrame limpio sintético
+        variable: Variable dependiente a visualizar
+
+    Returns:
+        Diccionario {nombre_función: callable(engine)}
+    """
+    country_means = df.groupby('country_name')[variable].agg(['mean', 'count']).reset_index()
+    country_means = country_means.sort_values('mean', ascending=False)
+    top_df = country_means.head(5)
+    bottom_df = country_means.tail(5).sort_values('mean', ascending=True)
+
+    return {
+        'create_distribution_histogram': lambda e: viz.create_distribution_histogram(df, variable, engine=e),
+        'create_gender_frequency_histogram': lambda e: viz.create_gender_frequency_histogram(df, variable, engine=e),
+        'create_gender_comparison': lambda e: viz.create_gender_comparison(df, variable, engine=e),
+        'create_age_trend': lambda e: viz.create_age_trend(df, variable, engine=e),
+        'create_education_trend': lambda e: viz.create_education_trend(df, variable, engine=e),
+        'create_country_map': lambda e: viz.create_country_map(df, variable, engine=e),
+        'create_party_bar_chart': lambda e: viz.create_party_bar_chart(df, variable, engine=e),
+        'create_ideology_scatter': lambda e: viz.create_ideology_scatter(df, variable, engine=e),
+        'create_correlation_heatmap': lambda e: viz.create_correlation_heatmap(df, list(DEPENDENT_VARS), engine=e),
+        'create_top_bottom_chart': lambda e: viz.create_top_bottom_chart(top_df, bottom_df, variable, engine=e),
+        'create_violin_plot': lambda e: viz.create_violin_plot(df, variable, 'age_group', engine=e),
+    }
+
+
+def run_benchmark(n_rows: int = 40000, repeat: int = 5, variable: str = 'ipeqopta') -> list:
+    """
+    Ejecuta el microbenchmark para ambos motores.
+
+    Args:
+        n_rows: Número de filas del DataFrame sintético
+        repeat: Repeticiones por caso (se toma el mínimo)
+        variable: Variable dependiente a visualizar
+
+    Returns:
+        Lista de diccionarios con los tiempos (ms) por función y motor
+    """
+    df = make_clean_frame(n_rows)
+    results = []
+
+    for name, build in get_cases(df, variable).items():
+        row = {'function': name}
+        for engine in ('express', 'graph_objects'):
+            build(engine)  # Calentamiento
+            times = timeit.repeat(lambda: build(engine), number=1, repeat=repeat)
+            row[engine] = min(times) * 1000
+        row['speedup'] = row['express'] / row['graph_objects']
+        results.append(row)
+
+    return results
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=40000, help="Filas del dataset sintético")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por caso")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.repeat)
+
+    print(f"{'Función':<36}{'express (ms)':>14}{'go (ms)':>10}{'speedup':>10}")
+    print("-" * 70)
+    for row in results:
+        print(f"{row['function']:<36}{row['express']:>14.2f}"
+              f"{row['graph_objects']:>10.2f}{row['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
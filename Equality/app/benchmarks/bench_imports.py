@@ -0,0 +1,120 @@
+"""
+Perfil del tiempo de importación de los módulos de la aplicación.
+
+Importa cada módulo en un intérprete nuevo (con streamlit, pandas y numpy ya
+cargados, como en el proceso de Streamlit) y mide el tiempo adicional. Con
+--budget termina con código 1 si algún módulo supera el presupuesto, de modo
+que puede usarse como comprobación automática.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_imports [--repeat 3] [--budget 0.1] [--importtime]
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+
+# Módulos importados al arrancar app.py
+APP_MODULES = [
+    'config', 'data_loader', 'analytics', 'visualizations',
+    'components', 'sections', 'exports'
+]
+
+# Dependencias que ya ha cargado el proceso de Streamlit
+_PRELOADED = "import streamlit, pandas, numpy"
+
+
+def measure_import(module: str, repeat: int = 3) -> float:
+    """
+    Mide el tiempo de importación de un módulo en procesos nuevos.
+
+    Args:
+        module: Nombre del módulo
+        repeat: Procesos a lanzar (se toma el mínimo)
+
+    Returns:
+        Tiempo de importación en segundos
+    """
+    code = (
+        f"import time, warnings; warnings.simplefilter('ignore'); {_PRELOADED}; "
+        f"start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    )
+    times = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+        )
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+
+    return min(times)
+
+
+def top_imports(module: str, n: int = 10) -> list:
+    """
+    Obtiene las importaciones más costosas de un módulo con 'python -X importtime'.
+
+    Args:
+        module: Nombre del módulo
+        n: Número de importaciones a devolver
+
+    Returns:
+        Lista de tuplas (microsegundos acumulados, nombre del módulo)
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"{_PRELOADED}; import {module}"],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+    )
+    preloaded = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PRELOADED],
+        capture_output=True, text=True, check=True
+    )
+
+    def parse(stderr):
+        rows = {}
+        for line in stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            _, cumulative, name = line.split('|')
+            rows[name.strip()] = int(cumulative)
+        return rows
+
+    baseline = parse(preloaded.stderr)
+    rows = [(us, name) for name, us in parse(result.stderr).items() if name not in baseline]
+
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Procesos por módulo (se toma el mínimo)")
+    parser.add_argument('--budget', type=float, default=None,
+                        help="Tiempo máximo por módulo en segundos (código de salida 1 si se supera)")
+    parser.add_argument('--importtime', action='store_true',
+                        help="Muestra las importaciones más costosas de cada módulo")
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'Módulo':<20}{'import (ms)':>14}")
+    print("-" * 34)
+    for module in APP_MODULES:
+        seconds = measure_import(module, args.repeat)
+        flag = ""
+        if args.budget is not None and seconds > args.budget:
+            over_budget.append(module)
+            flag = "  ⚠️ supera el presupuesto"
+        print(f"{module:<20}{seconds * 1000:>14.1f}{flag}")
+
+        if args.importtime:
+            for us, name in top_imports(module):
+                print(f"    {name:<36}{us / 1000:>10.1f} ms")
+
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
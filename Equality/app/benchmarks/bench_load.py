@@ -0,0 +1,305 @@
+"""
+Prueba de carga con sesiones concurrentes del panel.
+
+Ejecuta app.py sin navegador con el API de pruebas de Streamlit (AppTest):
+cada sesión simulada tiene su propio estado y, como en un worker de Streamlit,
+todas comparten proceso, cachés y motor de cálculo. Las sesiones repiten un
+guion de interacciones realista (elegir países y aplicar filtros, cambiar de
+variable, abrir pestañas de EDA y de España) con un tiempo de reflexión entre
+clics. La carga sube por niveles (--sessions 1 2 4 8): las sesiones de un nivel
+siguen vivas en el siguiente, de modo que el crecimiento de RSS por sesión es
+el de las sesiones añadidas.
+
+Para cada nivel informa de los percentiles de latencia por interacción, las
+interacciones por segundo, la CPU del proceso y la RSS. No necesita red.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_load [--sessions 1 2 4 8] [--duration 20]
+                                    [--think 0.5] [--output load.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import resource
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+from streamlit.runtime.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+
+from config import DEPENDENT_VARS
+
+
+APP_FILE = Path(__file__).parent.parent / 'app.py'
+
+# Percentiles de latencia que se informan
+PERCENTILES = (50, 90, 95, 99)
+
+
+def current_rss_mb() -> float:
+    """RSS actual del proceso en MB (Linux)."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def allow_concurrent_runs():
+    """
+    Adapta AppTest, pensado para una ejecución a la vez, a sesiones simultáneas
+    en el mismo proceso, como en el servidor:
+
+    - El bytecode de app.py se comparte: AppTest crea una ScriptCache por
+      ejecución y compilar a la vez desde varios hilos falla en algunas
+      versiones de Python (además de falsear la CPU).
+    - El runtime simulado que AppTest instala y retira en cada ejecución queda
+      fijado tras la primera; si no, al terminar una sesión las demás se quedan
+      sin runtime a mitad de ejecución.
+    """
+    shared = ScriptCache()
+    get_bytecode = ScriptCache.get_bytecode
+    ScriptCache.get_bytecode = lambda self, script_path: get_bytecode(shared, script_path)
+
+    installed = {}
+
+    def instance(cls):
+        runtime = cls._instance or installed.get('runtime')
+        if runtime is None:
+            raise RuntimeError("Runtime hasn't been created!")
+        installed['runtime'] = runtime
+        return runtime
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or 'runtime' in installed)
+
+
+class Session:
+    """
+    Sesión simulada: un AppTest con su propio estado y un guion de interacciones.
+    """
+
+    def __init__(self, number: int, timeout: float):
+        """
+        Inicializa la sesión (sin ejecutar el script).
+
+        Args:
+            number: Número de sesión (semilla de sus decisiones)
+            timeout: Tiempo máximo de cada ejecución del script (s)
+        """
+        self.number = number
+        self.rng = random.Random(number)
+        self.at = AppTest.from_file(str(APP_FILE), default_timeout=timeout)
+        self.countries = []
+        self.tab_labels = {}
+        self.errors = 0
+
+    def _run(self):
+        """Ejecuta el script y cuenta las excepciones mostradas."""
+        self.at.run()
+        if len(self.at.exception):
+            self.errors += 1
+
+    def open(self):
+        """Primera carga de la página; descubre países y pestañas."""
+        self._run()
+        options = self.at.sidebar.multiselect[0].options
+        self.countries = [c for c in options if c != 'Todos']
+        labels = [tab.label for tab in self.at.tabs]
+        # Las pestañas de cada grupo van seguidas; su valor inicial es la primera
+        starts = {key: labels.index(self.at.session_state[key])
+                  for key in ('eda_tabs', 'spain_tabs') if key in self.at.session_state}
+        bounds = sorted(starts.values()) + [len(labels)]
+        for key, start in starts.items():
+            self.tab_labels[key] = labels[start:bounds[bounds.index(start) + 1]]
+
+    def choose_countries(self):
+        """Elige entre uno y tres países (a veces todos) y aplica los filtros."""
+        selector = self.at.sidebar.multiselect[0]
+        if self.rng.random() < 0.2:
+            selector.set_value(['Todos'])
+        else:
+            selector.set_value(self.rng.sample(self.countries, self.rng.randint(1, 3)))
+        # En modo por lotes los filtros se aplican con el botón del formulario
+        if len(self.at.sidebar.button):
+            self.at.sidebar.button[0].click()
+        self._run()
+
+    def switch_variable(self):
+        """Cambia la variable de la sección descriptiva o de la EDA."""
+        key = self.rng.choice(['var_desc_select', 'eda_var_select'])
+        self.at.selectbox(key=key).set_value(self.rng.choice(list(DEPENDENT_VARS)))
+        self._run()
+
+    def open_eda_tab(self):
+        """Abre una pestaña de la EDA."""
+        self.at.session_state['eda_tabs'] = self.rng.choice(self.tab_labels['eda_tabs'])
+        self._run()
+
+    def open_spain_tab(self):
+        """Abre una pestaña del análisis de España (si está visible)."""
+        if 'spain_tabs' not in self.at.session_state:
+            return self.choose_countries()
+        self.at.session_state['spain_tabs'] = self.rng.choice(self.tab_labels['spain_tabs'])
+        self._run()
+
+    # Guion: interacción y peso relativo
+    SCRIPT = {
+        'choose_countries': 2,
+        'switch_variable': 3,
+        'open_eda_tab': 4,
+        'open_spain_tab': 1,
+    }
+
+    def next_interaction(self) -> str:
+        """Elige la siguiente interacción según los pesos del guion."""
+        return self.rng.choices(list(self.SCRIPT), weights=list(self.SCRIPT.values()))[0]
+
+
+def drive(session: Session, stop: threading.Event, think: float, latencies: dict, lock: threading.Lock):
+    """
+    Bucle de una sesión: interacción, registro de latencia y tiempo de reflexión.
+
+    Args:
+        session: Sesión simulada
+        stop: Evento que termina el nivel de carga
+        think: Tiempo medio de reflexión entre interacciones (s, exponencial)
+        latencies: Diccionario {interacción: [latencias s]} compartido
+        lock: Cerrojo de latencies
+    """
+    while not stop.is_set():
+        name = session.next_interaction()
+        start = time.perf_counter()
+        try:
+            getattr(session, name)()
+        except Exception:
+            # Interacción fallida (p. ej. widget ausente): se cuenta y se recarga la página
+            session.errors += 1
+            session.at.run()
+            continue
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.setdefault(name, []).append(elapsed)
+        if think > 0:
+            stop.wait(session.rng.expovariate(1 / think))
+
+
+def summarize(values: list) -> dict:
+    """Número, media, percentiles y máximo de una lista de latencias (ms)."""
+    data = np.asarray(values) * 1000
+    summary = {'n': len(data), 'mean_ms': float(data.mean())}
+    summary.update({f"p{p}_ms": float(np.percentile(data, p)) for p in PERCENTILES})
+    summary['max_ms'] = float(data.max())
+    return summary
+
+
+def run_level(sessions: list, target: int, duration: float, think: float, timeout: float) -> dict:
+    """
+    Sube el número de sesiones a target y mantiene la carga durante duration.
+
+    Args:
+        sessions: Sesiones ya abiertas (se amplía en el sitio)
+        target: Sesiones concurrentes del nivel
+        duration: Duración de la medición (s)
+        think: Tiempo medio de reflexión (s)
+        timeout: Tiempo máximo de cada ejecución del script (s)
+
+    Returns:
+        Diccionario con latencias, rendimiento, CPU y RSS del nivel
+    """
+    rss_before = current_rss_mb()
+    opened = []
+    while len(sessions) < target:
+        session = Session(len(sessions), timeout)
+        start = time.perf_counter()
+        session.open()
+        opened.append(time.perf_counter() - start)
+        sessions.append(session)
+    rss_opened = current_rss_mb()
+
+    latencies, lock, stop = {}, threading.Lock(), threading.Event()
+    threads = [threading.Thread(target=drive, args=(s, stop, think, latencies, lock), daemon=True)
+               for s in sessions]
+    errors_before = sum(s.errors for s in sessions)
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    added = len(opened)
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        'sessions': target,
+        'interactions': len(all_latencies),
+        'throughput_per_s': len(all_latencies) / wall,
+        'overall': summarize(all_latencies) if all_latencies else {},
+        'by_interaction': {name: summarize(values) for name, values in sorted(latencies.items())},
+        'first_load_ms': summarize(opened) if opened else {},
+        'cpu_s': cpu,
+        'cpu_percent': cpu / wall * 100,
+        'cpu_ms_per_interaction': cpu / len(all_latencies) * 1000 if all_latencies else None,
+        'rss_mb': current_rss_mb(),
+        'rss_per_new_session_mb': (rss_opened - rss_before) / added if added else None,
+        'rss_growth_mb': current_rss_mb() - rss_before,
+        'errors': sum(s.errors for s in sessions) - errors_before,
+    }
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 2, 4, 8],
+                        help="Sesiones concurrentes de cada nivel (creciente)")
+    parser.add_argument('--duration', type=float, default=20, help="Segundos de medición por nivel")
+    parser.add_argument('--think', type=float, default=0.5, help="Tiempo medio de reflexión entre clics (s)")
+    parser.add_argument('--timeout', type=float, default=120, help="Tiempo máximo por ejecución del script (s)")
+    parser.add_argument('--output', type=Path, help="Archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    # Los avisos de Streamlit sin servidor (contexto, parámetros obsoletos) no aportan
+    logging.disable(logging.WARNING)
+    allow_concurrent_runs()
+
+    rss_start = current_rss_mb()
+    sessions, levels = [], []
+    for target in sorted(set(args.sessions)):
+        level = run_level(sessions, target, args.duration, args.think, args.timeout)
+        levels.append(level)
+        overall = level['overall']
+        print(f"\n== {target} sesiones: {level['interactions']} interacciones "
+              f"({level['throughput_per_s']:.1f}/s), CPU {level['cpu_percent']:.0f}% "
+              f"({level['cpu_ms_per_interaction'] or 0:.0f} ms/interacción), "
+              f"RSS {level['rss_mb']:.0f} MB, errores {level['errors']} ==")
+        if level['rss_per_new_session_mb'] is not None:
+            print(f"   RSS por sesión nueva: {level['rss_per_new_session_mb']:.1f} MB; "
+                  f"primera carga p50 {level['first_load_ms']['p50_ms']:.0f} ms")
+        print(f"   {'Interacción':<20}{'n':>6}" + ''.join(f"{f'p{p} (ms)':>11}" for p in PERCENTILES)
+              + f"{'máx (ms)':>11}")
+        for name, summary in list(level['by_interaction'].items()) + [('total', overall)]:
+            if summary:
+                print(f"   {name:<20}{summary['n']:>6}"
+                      + ''.join(f"{summary[f'p{p}_ms']:>11.0f}" for p in PERCENTILES)
+                      + f"{summary['max_ms']:>11.0f}")
+
+    print(f"\nRSS: {rss_start:.0f} MB al inicio, {current_rss_mb():.0f} MB al final, "
+          f"pico {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB; "
+          f"{os.cpu_count()} CPU(s)")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            'cpus': os.cpu_count(), 'duration_s': args.duration, 'think_s': args.think,
+            'levels': levels
+        }, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"✅ Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark del cálculo en paralelo de las secciones de una ejecución completa.
+
+Calcula las secciones del panel (resumen de variable con Shapiro-Wilk,
+pestañas EDA con mapa y ranking, análisis de España y matriz de correlaciones)
+de forma secuencial y programadas con schedule_sections en un pool de hilos,
+con y sin procesos para las estadísticas pesadas. El objetivo es que el tiempo
+total se acerque al de la sección más lenta y no a la suma.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_sections [--repeat 3] [--threads 4] [--processes 2]
+"""
+
+import argparse
+import os
+import time
+import warnings
+
+from config import DEPENDENT_VARS
+from data_loader import DataLoader
+from sections import (
+    LazyTabCache, EDA_TABS, SPAIN_TABS, VARIABLE_SECTIONS, CORRELATION_SECTIONS,
+    schedule_sections
+)
+
+
+def section_plan(df, variable: str) -> list:
+    """
+    Lista de tareas de una ejecución completa en orden de renderizado.
+
+    Returns:
+        Lista de tuplas (grupo, pestaña, funciones, variable, DataFrame)
+    """
+    df_spain = df[df['cntry'] == 'ES']
+    plan = [('variables', 'summary', VARIABLE_SECTIONS, variable, df)]
+    plan += [('eda', tab, EDA_TABS, variable, df) for tab in EDA_TABS]
+    plan += [('spain', tab, SPAIN_TABS, variable, df_spain) for tab in SPAIN_TABS]
+    plan += [('correlation', 'matrix', CORRELATION_SECTIONS, None, df)]
+    return plan
+
+
+def run_sequential(df, variable: str) -> tuple:
+    """
+    Calcula las secciones una tras otra.
+
+    Returns:
+        Tupla (tiempo total s, {sección: tiempo s})
+    """
+    times = {}
+    start = time.perf_counter()
+    for group, tab, builders, var, data in section_plan(df, variable):
+        section_start = time.perf_counter()
+        builders[tab](data, var)
+        times[f"{group}/{tab}"] = time.perf_counter() - section_start
+    return time.perf_counter() - start, times
+
+
+def run_scheduled(df, variable: str, threads: int, processes: int, run_id: int) -> float:
+    """
+    Programa las secciones con schedule_sections y las recoge en orden.
+
+    Returns:
+        Tiempo total en segundos
+    """
+    cache = LazyTabCache(max_workers=threads, process_workers=processes)
+    # Calentar el pool de procesos (arranque de los intérpretes) fuera de la medición
+    if processes:
+        pool = cache._get_process_pool()
+        for future in [pool.submit(VARIABLE_SECTIONS['summary'], df[[variable]], variable)
+                       for _ in range(processes)]:
+            future.result()
+
+    signature = f"bench-{run_id}"
+    start = time.perf_counter()
+    schedule_sections(df, signature, signature,
+                      {'variables': variable, 'eda': variable, 'spain': variable},
+                      cache=cache)
+    for group, tab, builders, var, data in section_plan(df, variable):
+        cache.get(group, tab, builders, signature, var, data)
+    elapsed = time.perf_counter() - start
+
+    cache._executor.shutdown(wait=True)
+    if cache._process_pool is not None:
+        cache._process_pool.shutdown(wait=True)
+    return elapsed
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones (se toma el mínimo)")
+    parser.add_argument('--threads', type=int, default=4, help="Hilos del pool de secciones")
+    parser.add_argument('--processes', type=int, default=2, help="Procesos para estadísticas pesadas")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    df = DataLoader().get_data()
+    variable = next(iter(DEPENDENT_VARS))
+
+    # Calentar importaciones y cachés
+    run_sequential(df, variable)
+
+    sequential = min((run_sequential(df, variable) for _ in range(args.repeat)), key=lambda r: r[0])
+    threads = min(run_scheduled(df, variable, args.threads, 0, i) for i in range(args.repeat))
+    processes = min(run_scheduled(df, variable, args.threads, args.processes, i)
+                    for i in range(args.repeat))
+
+    print(f"{len(df):,} filas, {os.cpu_count()} CPU(s)")
+    print(f"{'Sección':<24}{'tiempo (s)':>12}")
+    print("-" * 36)
+    for name, seconds in sequential[1].items():
+        print(f"{name:<24}{seconds:>12.3f}")
+    print("-" * 36)
+    print(f"{'suma (secuencial)':<36}{sequential[0]:>10.3f} s")
+    print(f"{'sección más lenta':<36}{max(sequential[1].values()):>10.3f} s")
+    print(f"{f'pool de {args.threads} hilos':<36}{threads:>10.3f} s")
+    print(f"{f'hilos + {args.processes} procesos':<36}{processes:>10.3f} s")
+
+
+if __name__ == "__main__":
+    main()
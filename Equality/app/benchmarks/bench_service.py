@@ -0,0 +1,111 @@
+"""
+Benchmark de latencia del servicio de análisis.
+
+Compara el motor dentro del proceso (alternativa sin servicio) con el servicio
+por socket Unix lanzado en un proceso aparte ('python run.py serve'), para las
+operaciones de KPIs, ranking de países y pestañas. Mide la primera petición
+(fría) y la mediana y p95 de las siguientes (caché caliente).
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_service [--requests 50]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from analytics_service import AnalyticsEngine, ServiceClient
+
+
+# Peticiones del benchmark: (nombre, operación, parámetros)
+CASES = [
+    ('kpis', 'kpis', {'filters': {}, 'variable': 'ipeqopta'}),
+    ('kpis filtrado', 'kpis', {'filters': {'gender_label': ['Mujer']}, 'variable': 'ipeqopta'}),
+    ('country_ranking', 'country_ranking', {'filters': {}, 'variable': 'eqpaybg'}),
+    ('tab eda/distribution', 'tab', {'group': 'eda', 'tab': 'distribution', 'filters': {}, 'variable': 'ipeqopta'}),
+    ('tab eda/country', 'tab', {'group': 'eda', 'tab': 'country', 'filters': {}, 'variable': 'ipeqopta'}),
+]
+
+
+def measure(engine, n_requests: int) -> dict:
+    """
+    Mide la latencia de cada caso con un motor o cliente.
+
+    Args:
+        engine: AnalyticsEngine o ServiceClient
+        n_requests: Peticiones calientes por caso
+
+    Returns:
+        Diccionario {caso: (fría ms, mediana ms, p95 ms)}
+    """
+    results = {}
+
+    for name, op, params in CASES:
+        start = time.perf_counter()
+        engine.request(op, **params)
+        cold = (time.perf_counter() - start) * 1000
+
+        times = []
+        for _ in range(n_requests):
+            start = time.perf_counter()
+            engine.request(op, **params)
+            times.append((time.perf_counter() - start) * 1000)
+
+        times.sort()
+        results[name] = (cold, statistics.median(times), times[int(len(times) * 0.95) - 1])
+
+    return results
+
+
+def wait_for_service(client: ServiceClient, timeout: float = 60.0):
+    """Espera a que el servicio acepte peticiones."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client.request('ping')
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=50, help="Peticiones calientes por caso")
+    args = parser.parse_args()
+
+    app_dir = Path(__file__).parent.parent
+    socket_path = Path(tempfile.mkdtemp()) / "bench.sock"
+    service = subprocess.Popen(
+        [sys.executable, 'run.py', 'serve', '--socket', str(socket_path)],
+        cwd=app_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    try:
+        client = ServiceClient(socket_path)
+        wait_for_service(client)
+
+        modes = {
+            'en proceso': measure(AnalyticsEngine(), args.requests),
+            'servicio': measure(client, args.requests),
+        }
+    finally:
+        service.terminate()
+        service.wait()
+
+    print(f"{'Caso':<24}{'Modo':<12}{'fría (ms)':>11}{'mediana (ms)':>14}{'p95 (ms)':>10}")
+    print("-" * 71)
+    for name, _, _ in CASES:
+        for mode, results in modes.items():
+            cold, median, p95 = results[name]
+            print(f"{name:<24}{mode:<12}{cold:>11.2f}{median:>14.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
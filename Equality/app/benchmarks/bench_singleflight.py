@@ -0,0 +1,95 @@
+"""
+Benchmark de la deduplicación single-flight con sesiones concurrentes.
+
+Simula N sesiones que piden a la vez los mismos datos con los filtros por
+defecto (carga del dataset, filtrado, resumen de variable y matriz de
+correlaciones) y compara el tiempo total y de CPU con y sin single-flight.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_singleflight [--sessions 16]
+"""
+
+import argparse
+import threading
+import time
+import warnings
+
+from config import DEPENDENT_VARS
+from data_loader import DataLoader, filter_signature
+from sections import compute_variable_summary, compute_correlation_section
+from singleflight import get_flight, get_flight_stats
+
+
+def run_sessions(n_sessions: int, work) -> tuple:
+    """
+    Lanza n_sessions hilos que ejecutan work a la vez.
+
+    Args:
+        n_sessions: Número de sesiones simultáneas
+        work: Función sin argumentos ejecutada por cada sesión
+
+    Returns:
+        Tupla (tiempo total s, tiempo de CPU s)
+    """
+    barrier = threading.Barrier(n_sessions)
+
+    def session():
+        barrier.wait()
+        work()
+
+    threads = [threading.Thread(target=session) for _ in range(n_sessions)]
+    wall, cpu = time.perf_counter(), time.process_time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return time.perf_counter() - wall, time.process_time() - cpu
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=16, help="Sesiones simultáneas")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    variables = list(DEPENDENT_VARS)
+    filters = {}
+
+    def scenario(coalesce: bool):
+        loader = DataLoader()
+        do = get_flight('bench').do if coalesce else (lambda key, fn, *a: fn(*a))
+
+        def work():
+            # get_data ya agrupa la carga: sin single-flight se llama a _load directamente
+            if coalesce:
+                df = loader.get_data()
+            else:
+                loader._load()
+                df = loader.df_clean
+            signature = filter_signature(filters, loader.get_filter_catalog()['version'])
+            df_filtered = do(('filter', signature), loader.get_filtered_data, df, filters)
+            do(('variables', signature), compute_variable_summary, df_filtered, variables[0])
+            do(('correlation', signature), compute_correlation_section, df_filtered, variables)
+
+        return run_sessions(args.sessions, work)
+
+    # Calentar importaciones y cachés del cargador fuera de la medición
+    scenario(True)
+
+    results = {'sin single-flight': scenario(False), 'con single-flight': scenario(True)}
+
+    print(f"{args.sessions} sesiones simultáneas con los filtros por defecto")
+    print(f"{'Modo':<22}{'total (s)':>12}{'CPU (s)':>10}")
+    print("-" * 44)
+    for name, (wall, cpu) in results.items():
+        print(f"{name:<22}{wall:>12.2f}{cpu:>10.2f}")
+
+    print("\nContadores single-flight:")
+    for name, stats in get_flight_stats().items():
+        print(f"  {name:<14}" + ", ".join(f"{k}={v}" for k, v in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark del tiempo hasta el primer gráfico en un proceso nuevo.
+
+Mide, en un intérprete recién lanzado, la carga de datos y la primera figura
+del panel partiendo del CSV o de los artefactos de 'python run.py build'.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.bench_startup [--repeat 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+
+# Código ejecutado en cada proceso nuevo; imprime los tiempos en JSON
+_PROBE = """
+import json, time, warnings
+start = time.perf_counter()
+warnings.simplefilter('ignore')
+import data_loader
+data_loader.USE_ARTIFACTS = {use_artifacts}
+from visualizations import create_distribution_histogram
+imported = time.perf_counter()
+loader = data_loader.DataLoader()
+df = loader.get_data()
+loaded = time.perf_counter()
+create_distribution_histogram(df, 'ipeqopta', 'Distribución')
+charted = time.perf_counter()
+print(json.dumps({{
+    'source': 'artifacts' if loader.artifacts is not None else 'csv',
+    'import': imported - start,
+    'load': loaded - imported,
+    'first_chart': charted - start
+}}))
+"""
+
+
+def measure(use_artifacts: bool) -> dict:
+    """
+    Lanza un proceso nuevo y mide el arranque.
+
+    Args:
+        use_artifacts: Si True, abre los artefactos precalculados
+
+    Returns:
+        Diccionario con los tiempos (s) de importación, carga y primer gráfico
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', _PROBE.format(use_artifacts=use_artifacts)],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+    )
+
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Procesos por modo (se toma el mínimo)")
+    args = parser.parse_args()
+
+    print(f"{'Origen':<12}{'import (s)':>12}{'carga (s)':>12}{'1er gráfico (s)':>18}")
+    print("-" * 54)
+    for use_artifacts in (False, True):
+        runs = [measure(use_artifacts) for _ in range(args.repeat)]
+        best = min(runs, key=lambda r: r['first_chart'])
+        print(f"{best['source']:<12}{best['import']:>12.3f}{best['load']:>12.3f}{best['first_chart']:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
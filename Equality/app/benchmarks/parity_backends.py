@@ -0,0 +1,198 @@
+"""
+Prueba de paridad de los backends de consultas (DuckDB, Polars) con pandas.
+
+Genera un dataset sintético (benchmarks.synthetic) o usa el CSV indicado,
+escribe la instantánea Parquet del dataset limpio en una carpeta temporal y
+compara, para varias combinaciones de filtros y todas las variables
+dependientes, los resultados de pandas y de cada backend instalado: filas
+filtradas, medias por grupo de las pestañas, estadísticas por partido y
+ranking de países. El backend Polars se construye desde el CSV, así que
+también se compara su limpieza con DataLoader.clean_data.
+Termina con código 1 si algún resultado difiere.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.parity_backends [--rows 40000] [--data ESS11.csv]
+                                         [--backends duckdb polars]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import calculate_group_statistics
+from benchmarks.synthetic import write_dataset
+from cache import MemoryCache
+from config import DEPENDENT_VARS
+from data_loader import DataLoader
+from duckdb_backend import DuckDBBackend, duckdb
+from polars_backend import PolarsBackend, pl
+
+# Agrupaciones de las pestañas que usan el backend (pestaña: claves, solo España)
+GROUPINGS = {
+    'age': ('age_group', False),
+    'education': ('education_level', False),
+    'country': (['country_iso3', 'country_name'], False),
+    'ranking': ('country_name', False),
+    'party': ('party_name', True),
+}
+
+
+def filter_cases(catalog: dict) -> dict:
+    """Combinaciones de filtros del sidebar que se comparan."""
+    return {
+        'sin filtros': {},
+        'países': {'country_name': catalog['countries'][:3]},
+        'España': {'country_name': ['España']},
+        'edad y género': {'age_group': catalog['age_groups'][1:3], 'gender_label': ['Mujer']},
+        'cuartil': {'education_quartile': catalog['education_quartile_labels'][-1:]},
+        'partidos': {'party_name': catalog['parties_spain'][:2]},
+        'sin filas': {'country_name': ['España'], 'party_name': ['__ninguno__']},
+    }
+
+
+def pandas_means(df: pd.DataFrame, variable: str, by, spain: bool) -> pd.DataFrame:
+    """Medias por grupo como las calculan las figuras y el ranking en pandas."""
+    if spain:
+        df = df[df['cntry'] == 'ES']
+    return df.groupby(by)[variable].agg(['mean', 'count']).reset_index()
+
+
+def compare(name: str, expected: pd.DataFrame, actual: pd.DataFrame, failures: list,
+            check_index: bool = False):
+    """Compara dos resultados y anota la diferencia si la hay."""
+    if not check_index:
+        expected, actual = expected.reset_index(drop=True), actual.reset_index(drop=True)
+    try:
+        pd.testing.assert_frame_equal(
+            expected, actual,
+            check_dtype=False, check_categorical=False, check_index_type=False
+        )
+    except AssertionError as error:
+        failures.append((name, str(error).splitlines()[0]))
+
+
+def open_backends(names: list, data_file: Path, snapshot: Path, version: str, dtypes) -> dict:
+    """Abre los backends pedidos que estén instalados."""
+    backends = {}
+    for name in names:
+        if name == 'duckdb' and duckdb is not None:
+            backends[name] = DuckDBBackend(snapshot, version, dtypes)
+        elif name == 'polars' and pl is not None:
+            backends[name] = PolarsBackend.from_csv(data_file, version)
+        else:
+            print(f"⚠️  {name} no está instalado; no se comprueba su paridad")
+    return backends
+
+
+def check_backend(backend, loader: DataLoader, df: pd.DataFrame, catalog: dict,
+                  failures: list, timings: dict) -> int:
+    """
+    Compara un backend con pandas en todas las combinaciones de filtros.
+
+    Args:
+        backend: Backend de consultas
+        loader: DataLoader con el dataset limpio
+        df: Dataset limpio de pandas
+        catalog: Catálogo de filtros
+        failures: Lista donde se anotan las diferencias
+        timings: Segundos acumulados {'pandas', 'backend'}
+
+    Returns:
+        Número de comparaciones
+    """
+    checks = 0
+    for case, filters in filter_cases(catalog).items():
+        start = time.perf_counter()
+        df_filtered = loader.get_filtered_data(df, filters)
+        timings['pandas'] += time.perf_counter() - start
+        start = time.perf_counter()
+        compare(f"{case} / filas", df_filtered, backend.filtered_data(filters), failures,
+                check_index=True)
+        timings['backend'] += time.perf_counter() - start
+        checks += 1
+
+        query = backend.bind(filters)
+        for variable in DEPENDENT_VARS:
+            for tab, (by, spain) in GROUPINGS.items():
+                start = time.perf_counter()
+                expected = pandas_means(df_filtered, variable, by, spain)
+                timings['pandas'] += time.perf_counter() - start
+                start = time.perf_counter()
+                actual = query.group_means(variable, by, spain=spain)
+                timings['backend'] += time.perf_counter() - start
+                compare(f"{case} / {variable} / {tab}", expected, actual, failures)
+                checks += 1
+
+            df_spain = df_filtered[df_filtered['cntry'] == 'ES']
+            start = time.perf_counter()
+            expected = calculate_group_statistics(
+                df_spain[df_spain['party_name'].notna()], variable, 'party_name'
+            )
+            timings['pandas'] += time.perf_counter() - start
+            start = time.perf_counter()
+            actual = query.group_statistics(variable, 'party_name', spain=True)
+            timings['backend'] += time.perf_counter() - start
+            compare(f"{case} / {variable} / estadísticas por partido", expected, actual, failures)
+
+            means = query.group_means(variable, 'country_name')
+            for position, (expected, actual) in enumerate(zip(
+                loader.get_country_ranking(df_filtered, variable),
+                loader.get_country_ranking(df_filtered, variable, means=means)
+            )):
+                compare(f"{case} / {variable} / ranking {('top', 'bottom')[position]}",
+                        expected, actual, failures)
+            checks += 3
+    return checks
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=40_000, help="Filas del dataset sintético")
+    parser.add_argument('--data', type=Path, default=None, help="CSV del ESS11 (en lugar del sintético)")
+    parser.add_argument('--backends', nargs='+', default=['duckdb', 'polars'],
+                        choices=['duckdb', 'polars'], help="Backends a comprobar")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        data_file = args.data or write_dataset(args.rows, tmp / 'ess11.csv')
+        loader = DataLoader(data_file, cache=MemoryCache())
+        df = loader.clean_data(loader.read_raw_data())
+        catalog = loader.build_filter_catalog(df)
+        loader.snapshot = (df, None, None)
+
+        # Misma instantánea que escribe build_artifacts
+        snapshot = tmp / 'snapshot.parquet'
+        df.rename_axis('row_id').to_parquet(snapshot, index=True)
+        backends = open_backends(args.backends, data_file, snapshot, catalog['version'], df.dtypes)
+
+        failures = []
+        print(f"{len(df):,} filas")
+        for name, backend in backends.items():
+            errors = []
+            if name == 'polars':
+                compare("limpieza", df, backend.to_pandas(), errors, check_index=True)
+            timings = {'pandas': 0.0, 'backend': 0.0}
+            checks = check_backend(backend, loader, df, catalog, errors, timings)
+            print(f"{name:<8}{checks} comparaciones, {len(errors)} distintas; "
+                  f"pandas {timings['pandas']:.2f} s, {name} {timings['backend']:.2f} s")
+            failures.extend((f"{name} / {case}", error) for case, error in errors)
+
+    if failures:
+        print(f"\n❌ {len(failures)} resultados distintos:")
+        for name, error in failures:
+            print(f"   {name}: {error}")
+        sys.exit(1)
+    if backends:
+        print(f"✅ {', '.join(backends)} y pandas dan los mismos resultados")
+
+
+if __name__ == "__main__":
+    main()
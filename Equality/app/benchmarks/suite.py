@@ -0,0 +1,343 @@
+"""
+Suite de benchmarks de la app a varias escalas con datos sintéticos.
+
+Genera datasets con la forma del ESS11 (benchmarks.synthetic) de 40k, 400k y
+4M filas y, para cada escala, mide todas las funciones públicas de
+data_loader.py, analytics.py y visualizations.py (tiempo mediano, filas/s y
+pico de memoria con tracemalloc) y una ejecución completa del script con
+AppTest en un proceso nuevo (primera y segunda ejecución y pico de RSS).
+Guarda los resultados como línea base JSON y, con --compare, los contrasta con
+una línea base anterior y marca las regresiones.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.suite [--scales 40k 400k 4m] [--repeat 3]
+                               [--output baseline.json] [--compare baseline.json]
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import analytics
+import data_loader
+import visualizations
+from benchmarks.synthetic import SCALES, write_dataset
+from cache import MemoryCache
+from config import DEPENDENT_VARS, REPORTS_DIR
+from data_loader import DataLoader
+
+
+# Módulos cuyas funciones públicas deben estar cubiertas por la suite
+MODULES = (data_loader, analytics, visualizations)
+
+# Funciones públicas que no dependen del tamaño de los datos (no se miden)
+EXCLUDED = {
+    'data_loader.get_data_loader',
+    'data_loader.DataLoader.open_artifacts',
+    'data_loader.FrameCache.evict',
+}
+
+# Código de la ejecución completa del script; imprime los tiempos en JSON
+_SCRIPT_PROBE = """
+import json, resource, time, warnings
+warnings.simplefilter('ignore')
+import config
+config.USE_ARTIFACTS = False
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout={timeout})
+start = time.perf_counter()
+at.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+at.run()
+second = time.perf_counter() - start
+print(json.dumps({{
+    'first_run': first,
+    'second_run': second,
+    'exceptions': [str(e.value) for e in at.exception],
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+}}))
+"""
+
+
+def build_cases(loader: DataLoader, df_raw, df) -> dict:
+    """
+    Casos de la suite: una llamada representativa por función pública.
+
+    Args:
+        loader: DataLoader con los datos sintéticos cargados
+        df_raw: Dataset crudo
+        df: Dataset limpio
+
+    Returns:
+        Diccionario {módulo.función: (función sin argumentos, filas procesadas)}
+    """
+    variable = next(iter(DEPENDENT_VARS))
+    variables = list(DEPENDENT_VARS)
+    countries = loader.get_filter_catalog()['countries']
+    filters = {'country_name': countries[:len(countries) // 2], 'gender_label': ['Mujer']}
+    df_spain = df[df['cntry'] == 'ES']
+    top, bottom = loader.get_country_ranking(df, variable)
+    n, n_raw, n_spain = len(df), len(df_raw), len(df_spain)
+
+    def fresh_get_data():
+        # Carga completa con una caché vacía
+        return DataLoader(loader.file_path, cache=MemoryCache()).get_data()
+
+    return {
+        # data_loader.py
+        'data_loader.DataLoader.load_raw_data': (lambda: DataLoader(loader.file_path, cache=MemoryCache()).load_raw_data(), n_raw),
+        'data_loader.DataLoader.read_raw_data': (loader.read_raw_data, n_raw),
+        'data_loader.DataLoader.clean_data': (lambda: loader.clean_data(df_raw), n_raw),
+        'data_loader.DataLoader.get_data': (fresh_get_data, n_raw),
+        'data_loader.DataLoader.get_dataset_version': (loader.get_dataset_version, n_raw),
+        'data_loader.DataLoader.build_filter_catalog': (lambda: loader.build_filter_catalog(df), n),
+        'data_loader.DataLoader.build_filter_index': (lambda: loader.build_filter_index(df), n),
+        'data_loader.DataLoader.get_filter_catalog': (loader.get_filter_catalog, n),
+        'data_loader.DataLoader.get_filtered_data': (lambda: loader.get_filtered_data(df, filters), n),
+        'data_loader.DataLoader.get_variable_stats': (lambda: loader.get_variable_stats(df, variable), n),
+        'data_loader.DataLoader.calculate_gender_gap': (lambda: loader.calculate_gender_gap(df, variable), n),
+        'data_loader.DataLoader.calculate_age_gradient': (lambda: loader.calculate_age_gradient(df, variable), n),
+        'data_loader.DataLoader.calculate_education_gradient':
+            (lambda: loader.calculate_education_gradient(df, variable), n),
+        'data_loader.DataLoader.get_country_ranking': (lambda: loader.get_country_ranking(df, variable), n),
+        'data_loader.assign_education_quartiles': (lambda: data_loader.assign_education_quartiles(df, 'country'), n),
+        'data_loader.education_quartile_thresholds':
+            (lambda: data_loader.education_quartile_thresholds(df, 'country'), n),
+        'data_loader.filter_signature': (lambda: data_loader.filter_signature(filters), 1),
+        'data_loader.spain_filter_signature': (lambda: data_loader.spain_filter_signature(filters), 1),
+        # Fallo de la caché compartida: filtrado más estimación de tamaño
+        'data_loader.FrameCache.get':
+            (lambda: data_loader.FrameCache().get('bench', loader, df, filters), n),
+        # analytics.py
+        'analytics.calculate_spearman_correlation':
+            (lambda: analytics.calculate_spearman_correlation(df, variable, 'education_level'), n),
+        'analytics.interpret_correlation_strength': (lambda: analytics.interpret_correlation_strength(0.25), 1),
+        'analytics.test_normality': (lambda: analytics.test_normality(df, variable), n),
+        'analytics.calculate_group_statistics':
+            (lambda: analytics.calculate_group_statistics(df, variable, 'country_name'), n),
+        'analytics.calculate_top2_box': (lambda: analytics.calculate_top2_box(df, variable), n),
+        'analytics.calculate_confidence_interval': (lambda: analytics.calculate_confidence_interval(df[variable]), n),
+        'analytics.perform_gender_comparison': (lambda: analytics.perform_gender_comparison(df, variable), n),
+        'analytics.perform_age_correlation': (lambda: analytics.perform_age_correlation(df, variable), n),
+        'analytics.perform_education_correlation': (lambda: analytics.perform_education_correlation(df, variable), n),
+        'analytics.calculate_ideology_gradient': (lambda: analytics.calculate_ideology_gradient(df_spain, variable), n_spain),
+        'analytics.calculate_nationalism_gradient': (lambda: analytics.calculate_nationalism_gradient(df_spain, variable), n_spain),
+        'analytics.generate_summary_statistics': (lambda: analytics.generate_summary_statistics(df, variable), n),
+        # visualizations.py
+        'visualizations.create_distribution_histogram':
+            (lambda: visualizations.create_distribution_histogram(df, variable), n),
+        'visualizations.create_gender_frequency_histogram':
+            (lambda: visualizations.create_gender_frequency_histogram(df, variable), n),
+        'visualizations.create_gender_comparison': (lambda: visualizations.create_gender_comparison(df, variable), n),
+        'visualizations.create_age_trend': (lambda: visualizations.create_age_trend(df, variable), n),
+        'visualizations.create_education_trend': (lambda: visualizations.create_education_trend(df, variable), n),
+        'visualizations.create_country_map': (lambda: visualizations.create_country_map(df, variable), n),
+        'visualizations.create_party_bar_chart': (lambda: visualizations.create_party_bar_chart(df_spain, variable), n_spain),
+        'visualizations.create_ideology_scatter':
+            (lambda: visualizations.create_ideology_scatter(df_spain, variable), n_spain),
+        'visualizations.create_correlation_heatmap':
+            (lambda: visualizations.create_correlation_heatmap(df, variables), n),
+        'visualizations.create_top_bottom_chart':
+            (lambda: visualizations.create_top_bottom_chart(top, bottom, variable), len(top) + len(bottom)),
+        'visualizations.create_violin_plot':
+            (lambda: visualizations.create_violin_plot(df, variable, 'gender_label'), n),
+    }
+
+
+def public_functions() -> set:
+    """
+    Funciones y métodos públicos definidos en los módulos de MODULES.
+
+    Returns:
+        Conjunto de nombres 'módulo.función' y 'módulo.Clase.método'
+    """
+    names = set()
+    for module in MODULES:
+        prefix = module.__name__
+        for name, obj in vars(module).items():
+            if name.startswith('_') or getattr(obj, '__module__', None) != prefix:
+                continue
+            if inspect.isclass(obj):
+                names.update(f"{prefix}.{name}.{attr}" for attr in vars(obj)
+                             if not attr.startswith('_') and callable(getattr(obj, attr)))
+            elif callable(obj):
+                names.add(f"{prefix}.{name}")
+    return names - EXCLUDED
+
+
+def measure(fn, rows: int, repeat: int) -> dict:
+    """
+    Mide una función: tiempos sin trazado y una pasada con tracemalloc.
+
+    Args:
+        fn: Función sin argumentos
+        rows: Filas que procesa (para el rendimiento en filas/s)
+        repeat: Repeticiones cronometradas
+
+    Returns:
+        Diccionario con tiempo mediano y mínimo (s), filas/s y pico de memoria (MB)
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(times)
+    return {
+        'median_s': median,
+        'min_s': min(times),
+        'rows': rows,
+        'rows_per_s': rows / median if median > 0 else None,
+        'peak_mb': peak / 2**20
+    }
+
+
+def run_script(data_file: Path, timeout: int) -> dict:
+    """
+    Ejecuta app.py completo con AppTest en un proceso nuevo sobre un dataset.
+
+    Args:
+        data_file: CSV sintético (se pasa con ESS11_DATA_FILE)
+        timeout: Tiempo máximo de cada ejecución del script (s)
+
+    Returns:
+        Diccionario con las dos ejecuciones (s), excepciones y pico de RSS (MB)
+    """
+    result = subprocess.run(
+        [sys.executable, '-c', _SCRIPT_PROBE.format(timeout=timeout)],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+        env={**os.environ, 'ESS11_DATA_FILE': str(data_file)}
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_scale(scale: str, data_dir: Path, repeat: int, script: bool, timeout: int) -> dict:
+    """
+    Genera (o reutiliza) el dataset de una escala y mide todos los casos.
+
+    Returns:
+        Diccionario con las filas, los resultados por función y el script completo
+    """
+    n_rows = SCALES[scale]
+    start = time.perf_counter()
+    data_file = write_dataset(n_rows, data_dir / f"ESS11_synthetic_{scale}.csv")
+    print(f"\n== {scale}: {n_rows:,} filas ({data_file}, {time.perf_counter() - start:.1f} s) ==")
+
+    data_loader.USE_ARTIFACTS = False
+    loader = DataLoader(data_file, cache=MemoryCache())
+    df = loader.get_data()
+    cases = build_cases(loader, loader.df_raw, df)
+
+    results = {}
+    for name, (fn, rows) in cases.items():
+        results[name] = measure(fn, rows, repeat)
+        r = results[name]
+        print(f"  {name:<58}{r['median_s'] * 1000:>10.1f} ms{r['peak_mb']:>10.1f} MB")
+
+    report = {'rows': n_rows, 'clean_rows': len(df), 'functions': results}
+    if script:
+        report['script'] = run_script(data_file, timeout)
+        s = report['script']
+        print(f"  {'app.py (AppTest)':<58}{s['first_run']:>10.2f} s / {s['second_run']:.2f} s"
+              f"{s['peak_rss_mb']:>8.0f} MB RSS")
+    return report
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compara los tiempos medianos con una línea base.
+
+    Args:
+        current: Resultados actuales
+        baseline: Resultados de la línea base
+        threshold: Cociente a partir del cual un caso cuenta como regresión
+
+    Returns:
+        Lista de tuplas (escala, caso, tiempo base s, tiempo actual s) con regresiones
+    """
+    regressions = []
+    for scale, report in current['scales'].items():
+        base = baseline.get('scales', {}).get(scale)
+        if base is None:
+            continue
+        for name, result in report['functions'].items():
+            before = base['functions'].get(name)
+            # Por debajo de 1 ms el ruido domina
+            if before and max(before['median_s'], result['median_s']) >= 1e-3 \
+                    and result['median_s'] > before['median_s'] * threshold:
+                regressions.append((scale, name, before['median_s'], result['median_s']))
+        if 'script' in report and 'script' in base \
+                and report['script']['second_run'] > base['script']['second_run'] * threshold:
+            regressions.append((scale, 'app.py', base['script']['second_run'], report['script']['second_run']))
+    return regressions
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', nargs='+', default=['40k', '400k'], choices=list(SCALES),
+                        help="Escalas a medir")
+    parser.add_argument('--repeat', type=int, default=3, help="Repeticiones por función")
+    parser.add_argument('--data-dir', type=Path, default=REPORTS_DIR / 'benchmarks' / 'data',
+                        help="Carpeta de los datasets sintéticos (se reutilizan entre ejecuciones)")
+    parser.add_argument('--output', type=Path, default=REPORTS_DIR / 'benchmarks' / 'baseline.json',
+                        help="Archivo JSON de resultados")
+    parser.add_argument('--compare', type=Path, help="Línea base JSON con la que comparar")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="Cociente de tiempo que cuenta como regresión")
+    parser.add_argument('--no-script', action='store_true', help="No ejecutar app.py completo")
+    parser.add_argument('--timeout', type=int, default=600, help="Tiempo máximo por ejecución del script (s)")
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scales': {}
+    }
+    for scale in args.scales:
+        report['scales'][scale] = run_scale(scale, args.data_dir, args.repeat, not args.no_script, args.timeout)
+        covered = set(report['scales'][scale]['functions'])
+        missing = public_functions() - covered
+        if missing:
+            print(f"⚠️  Funciones públicas sin caso en la suite: {', '.join(sorted(missing))}")
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"\n✅ Resultados guardados en {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones (> x{args.threshold:.2f}):")
+            for scale, name, before, after in regressions:
+                print(f"  [{scale}] {name}: {before * 1000:.1f} ms → {after * 1000:.1f} ms")
+            sys.exit(1)
+        print(f"\n✅ Sin regresiones respecto a {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
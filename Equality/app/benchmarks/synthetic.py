@@ -0,0 +1,197 @@
+"""
+Generador de datos sintéticos con la forma del CSV del ESS11.
+
+Produce las columnas que usa la aplicación con los dominios de config.py:
+códigos válidos de cada variable, códigos de no respuesta de INVALID_VALUES
+con tasas realistas, tamaños de muestra por país parecidos a los de la ronda 11
+y voto en España (prtvtges) con el reparto aproximado de las generales de 2023.
+Las variables dependientes dependen de género, edad, educación y país, de modo
+que brechas, gradientes y correlaciones no son nulos.
+
+Uso (desde la carpeta app):
+    python -m benchmarks.synthetic --rows 400000 --output /tmp/ESS11_400k.csv
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import EDUCATION_SCALE, INVALID_VALUES, ISO2_TO_NAME, PARTY_NAMES
+
+
+# Escalas predefinidas del benchmark (filas)
+SCALES = {'40k': 40_000, '400k': 400_000, '4m': 4_000_000}
+
+# Peso relativo de cada país (tamaños de muestra aproximados del ESS11)
+COUNTRY_WEIGHTS = {
+    'AT': 2350, 'BE': 1590, 'BG': 2240, 'CH': 1380, 'CY': 690, 'CZ': 1480,
+    'DE': 2420, 'DK': 1150, 'EE': 1420, 'ES': 1840, 'FI': 1560, 'FR': 1770,
+    'GB': 1680, 'GR': 2760, 'HR': 1560, 'HU': 2120, 'IE': 2020, 'IS': 840,
+    'IT': 2860, 'LT': 1370, 'LV': 1200, 'ME': 1260, 'MK': 1430, 'NL': 1690,
+    'NO': 1340, 'PL': 1440, 'PT': 1370, 'RO': 1980, 'RS': 1560, 'SE': 1230,
+    'SI': 1250, 'SK': 1440
+}
+
+# Voto en España (proporciones aproximadas de las generales de 2023 sobre los
+# encuestados que votaron; 50-52: otro partido, en blanco y nulo)
+PARTY_WEIGHTS = {
+    1: 33.0, 2: 31.7, 3: 12.4, 4: 12.3, 5: 1.9, 6: 1.6, 7: 1.4, 8: 1.1,
+    9: 0.6, 10: 0.5, 11: 0.2, 12: 0.7, 50: 1.6, 51: 0.7, 52: 0.3
+}
+
+# Distribución de los niveles ISCED (edulvlb) entre los encuestados
+EDUCATION_WEIGHTS = {
+    0: 1.5, 113: 4.0, 129: 5.0, 212: 8.0, 213: 6.0, 221: 7.0, 222: 5.0,
+    223: 6.0, 229: 9.0, 311: 3.0, 312: 2.5, 313: 2.0, 321: 3.0, 322: 2.0,
+    421: 8.0, 422: 4.0, 423: 3.0, 510: 5.0, 520: 4.0, 610: 0.8, 620: 0.6,
+    710: 1.5, 720: 0.4, 800: 0.7
+}
+
+# Códigos válidos de las variables dependientes (escala original del cuestionario)
+DEPENDENT_DOMAINS = {
+    'ipeqopta': list(range(1, 7)),   # 1 = muy parecido a mí ... 6 = nada parecido
+    'eqpaybg': list(range(0, 7)),
+    'polintr': list(range(1, 5)),    # 1 = muy interesado ... 4 = nada interesado
+    'imwbcnt': list(range(0, 11)),
+    'wsekpwr': list(range(1, 6)),
+}
+
+# Efectos (en desviaciones típicas de la variable latente) de mujer, edad
+# estandarizada y educación estandarizada; el signo refleja la codificación original
+DEPENDENT_EFFECTS = {
+    'ipeqopta': (-0.20, 0.10, -0.15),
+    'eqpaybg': (0.15, -0.10, 0.20),
+    'polintr': (0.25, -0.20, -0.40),
+    'imwbcnt': (0.05, -0.20, 0.35),
+    'wsekpwr': (-0.30, 0.10, -0.25),
+}
+
+# Proporción de códigos de no respuesta por variable
+INVALID_RATES = {
+    'gndr': 0.001, 'agea': 0.004, 'edulvlb': 0.01, 'prtvtges': 0.35,
+    'ipeqopta': 0.02, 'eqpaybg': 0.04, 'polintr': 0.005, 'imwbcnt': 0.03, 'wsekpwr': 0.05
+}
+
+
+def _ordinal(rng: np.random.Generator, latent: np.ndarray, domain: list) -> np.ndarray:
+    """Convierte una variable latente en categorías ordinales con frecuencias desiguales."""
+    # Cortes por cuantiles con pesos triangulares: las categorías centrales son más frecuentes
+    weights = np.minimum(np.arange(1, len(domain) + 1), np.arange(len(domain), 0, -1)).astype(float)
+    cuts = np.quantile(latent, np.cumsum(weights)[:-1] / weights.sum())
+    return np.asarray(domain)[np.searchsorted(cuts, latent)]
+
+
+def generate(n_rows: int, seed: int = 11) -> pd.DataFrame:
+    """
+    Genera un DataFrame con la forma del CSV del ESS11.
+
+    Args:
+        n_rows: Número de filas
+        seed: Semilla aleatoria
+
+    Returns:
+        DataFrame con las columnas de EXPLICATIVE_VARS y DEPENDENT_VARS (más idno,
+        essround y anweight) con códigos crudos, incluidos los de no respuesta
+    """
+    rng = np.random.default_rng(seed)
+
+    countries = np.array(list(COUNTRY_WEIGHTS))
+    country_p = np.array(list(COUNTRY_WEIGHTS.values()), dtype=float)
+    cntry = rng.choice(countries, n_rows, p=country_p / country_p.sum())
+    assert set(countries) <= set(ISO2_TO_NAME)
+
+    female = rng.random(n_rows) < 0.52
+    gndr = np.where(female, 2, 1)
+
+    # Edad: mezcla truncada a 15-90 con más peso en edades medias
+    agea = np.clip(np.round(rng.normal(50, 18, n_rows)), 15, 90).astype(int)
+
+    education_codes = np.array(list(EDUCATION_WEIGHTS))
+    education_p = np.array(list(EDUCATION_WEIGHTS.values()))
+    edulvlb = rng.choice(education_codes, n_rows, p=education_p / education_p.sum())
+    assert set(education_codes) <= set(EDUCATION_SCALE)
+
+    # Partido solo para España; el resto de países no tiene la pregunta (NaN)
+    party_codes = np.array(list(PARTY_WEIGHTS))
+    party_p = np.array(list(PARTY_WEIGHTS.values()))
+    assert set(party_codes) <= set(PARTY_NAMES)
+    prtvtges = np.full(n_rows, np.nan)
+    is_spain = cntry == 'ES'
+    prtvtges[is_spain] = rng.choice(party_codes, is_spain.sum(), p=party_p / party_p.sum())
+
+    df = pd.DataFrame({
+        'idno': np.arange(1, n_rows + 1),
+        'essround': 11,
+        'anweight': np.round(rng.gamma(4.0, 0.25, n_rows), 6),
+        'cntry': cntry,
+        'gndr': gndr,
+        'agea': agea,
+        'edulvlb': edulvlb,
+        'prtvtges': prtvtges,
+    })
+
+    # Variables dependientes a partir de una variable latente por variable
+    age_z = (agea - agea.mean()) / agea.std()
+    education = pd.Series(edulvlb).map(EDUCATION_SCALE).to_numpy(dtype=float)
+    education_z = (education - education.mean()) / education.std()
+    country_index = pd.factorize(cntry)[0]
+
+    for variable, domain in DEPENDENT_DOMAINS.items():
+        female_effect, age_effect, education_effect = DEPENDENT_EFFECTS[variable]
+        country_effect = rng.normal(0, 0.3, len(countries))[country_index]
+        latent = (female_effect * female + age_effect * age_z + education_effect * education_z
+                  + country_effect + rng.normal(0, 1, n_rows))
+        df[variable] = _ordinal(rng, latent, domain)
+
+    # Códigos de no respuesta
+    for variable in INVALID_RATES:
+        values = df[variable].to_numpy(copy=True)
+        valid = ~np.isnan(values) if values.dtype.kind == 'f' else np.ones(len(values), dtype=bool)
+        mask = valid & (rng.random(n_rows) < INVALID_RATES[variable])
+        values = values.astype(float) if values.dtype.kind == 'f' else values
+        values[mask] = rng.choice(INVALID_VALUES[variable], mask.sum())
+        df[variable] = values
+
+    return df
+
+
+def write_dataset(n_rows: int, output: Path, seed: int = 11) -> Path:
+    """
+    Genera el dataset y lo escribe como CSV (reutiliza el archivo si ya existe).
+
+    Args:
+        n_rows: Número de filas
+        output: Ruta del CSV
+        seed: Semilla aleatoria
+
+    Returns:
+        Ruta del CSV
+    """
+    output = Path(output)
+    if not output.exists():
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp = output.with_suffix('.tmp')
+        generate(n_rows, seed).to_csv(tmp, index=False)
+        tmp.replace(output)
+    return output
+
+
+def main():
+    """Función principal."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', default='40k',
+                        help="Filas: número o escala predefinida (40k, 400k, 4m)")
+    parser.add_argument('--output', type=Path, required=True, help="Ruta del CSV de salida")
+    parser.add_argument('--seed', type=int, default=11, help="Semilla aleatoria")
+    args = parser.parse_args()
+
+    n_rows = SCALES.get(args.rows.lower()) or int(args.rows)
+    args.output.unlink(missing_ok=True)
+    write_dataset(n_rows, args.output, args.seed)
+    print(f"✅ {n_rows:,} filas escritas en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""
+Cachés de datos del cargador (sin dependencia de Streamlit).
+DataLoader guarda en una caché (ResultCache) los datos crudos y limpios de cada
+versión del dataset. La clave es una tupla pequeña (operación, versión), así
+que no hay que calcular el hash de ningún DataFrame. Implementaciones:
+- MemoryCache: LRU en memoria del proceso (notebooks, trabajos por lotes,
+  benchmarks, servicio de análisis).
+- DiskCache: archivos en CACHE_DIR (Parquet para DataFrames, pickle para el
+  resto) que sobreviven a reinicios, con límite de tamaño y descarte LRU.
+- StreamlitCache: st.cache_data (solo dentro de la app).
+
+default_cache() elige la implementación según CACHE_BACKEND.
+
+PersistentResultCache (result_cache()) guarda en disco los resultados de las
+pestañas y del motor de análisis para que un reinicio los sirva sin recalcular.
+"""
+
+import functools
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from config import (
+    CACHE_BACKEND, CACHE_DIR, CACHE_MAX_MB, DATA_CACHE_ENTRIES,
+    RESULT_CACHE, RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB
+)
+from profiling import record_cache
+
+
+class ResultCache:
+    """
+    Interfaz común de las cachés: get_or_compute devuelve el valor guardado
+    con una clave o lo calcula y lo guarda.
+    """
+    
+    # Nombre de la capa en el panel de rendimiento y en las métricas
+    layer = 'data_cache'
+    
+    def get_or_compute(self, key: tuple, compute, *args):
+        """
+        Devuelve el valor de la clave, calculándolo con compute(*args) si no está.
+        
+        Args:
+            key: Tupla de valores simples (cadenas, números) que identifica el resultado
+            compute: Función que calcula el valor
+            *args: Argumentos de compute (no forman parte de la clave)
+            
+        Returns:
+            Valor guardado o recién calculado
+        """
+        raise NotImplementedError
+    
+    def clear(self):
+        """Vacía la caché."""
+        raise NotImplementedError
+
+
+class MemoryCache(ResultCache):
+    """
+    Caché LRU en memoria del proceso.
+    """
+    
+    def __init__(self, max_entries: int = DATA_CACHE_ENTRIES):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_entries: Número máximo de entradas
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: tuple, compute, *args):
+        """Ver ResultCache.get_or_compute."""
+        with self._lock:
+            hit = key in self._entries
+            if hit:
+                self._entries.move_to_end(key)
+                value = self._entries[key]
+        record_cache(self.layer, hit)
+        if hit:
+            return value
+        
+        value = compute(*args)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        """Vacía la caché."""
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskCache(ResultCache):
+    """
+    Caché en disco que sobrevive a reinicios del proceso. Cada entrada es un
+    archivo con el hash de su clave: Parquet si el valor es un DataFrame y hay
+    pyarrow (conserva índice y tipos, incluidas las categóricas) y pickle en
+    otro caso. La fecha de modificación marca el último uso.
+    """
+    
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = CACHE_MAX_MB * 2**20):
+        """
+        Inicializa la caché.
+        
+        Args:
+            directory: Carpeta de la caché (se crea al guardar la primera entrada)
+            max_bytes: Tamaño máximo en bytes (0 sin límite)
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+    
+    def _path(self, key: tuple) -> Path:
+        """Ruta base (sin extensión) de la entrada de una clave."""
+        return self.directory / hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+    
+    def _read(self, base: Path):
+        """Lee una entrada; devuelve (encontrada, valor)."""
+        for suffix, reader in (('.parquet', pd.read_parquet), ('.pkl', _read_pickle)):
+            path = base.with_suffix(suffix)
+            try:
+                value = reader(path)
+                os.utime(path)
+            except FileNotFoundError:
+                continue
+            except Exception:
+                # Entrada dañada (p. ej. versión de pandas incompatible): se recalcula
+                path.unlink(missing_ok=True)
+                continue
+            return True, value
+        return False, None
+    
+    def _write(self, base: Path, value):
+        """Escribe una entrada de forma atómica (archivo temporal y os.replace)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        as_parquet = pyarrow is not None and isinstance(value, pd.DataFrame)
+        path = base.with_suffix('.parquet' if as_parquet else '.pkl')
+        fd, tmp = tempfile.mkstemp(prefix='.', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if as_parquet:
+                    value.to_parquet(f)
+                else:
+                    pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except Exception:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    
+    def _files(self) -> list:
+        """Archivos de las entradas (sin temporales ni subcarpetas)."""
+        return [path for path in self.directory.glob('[!.]*') if path.suffix in ('.parquet', '.pkl')]
+    
+    def _evict(self):
+        """Borra las entradas usadas hace más tiempo hasta volver al límite."""
+        if not self.max_bytes:
+            return
+        entries = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                # Borrada por otro proceso que comparte la carpeta
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+    
+    def get_or_compute(self, key: tuple, compute, *args):
+        """Ver ResultCache.get_or_compute."""
+        base = self._path(key)
+        with self._lock:
+            hit, value = self._read(base)
+        record_cache(self.layer, hit)
+        if hit:
+            return value
+        
+        value = compute(*args)
+        with self._lock:
+            try:
+                self._write(base, value)
+                self._evict()
+            except (OSError, pickle.PicklingError, AttributeError, ValueError, TypeError) as e:
+                # Sin caché en disco la carga sigue funcionando
+                warnings.warn(f"No se pudo guardar en la caché en disco ({self.directory}): {e}", RuntimeWarning)
+        return value
+    
+    def clear(self):
+        """Borra todas las entradas."""
+        with self._lock:
+            for path in self._files():
+                path.unlink(missing_ok=True)
+
+
+class PersistentResultCache(DiskCache):
+    """
+    Caché en disco de los resultados de análisis y figuras. La clave de cada
+    entrada es la que da quien llama (función, firma de filtros con la versión
+    del dataset, argumentos) más la versión del código de la app, de modo que
+    un despliegue con cambios no sirve resultados calculados con el código
+    anterior.
+    """
+    
+    layer = 'result_cache'
+    
+    def _path(self, key: tuple) -> Path:
+        """Ruta base de la entrada de una clave en esta versión del código."""
+        return super()._path(key + (code_version(),))
+
+
+@functools.lru_cache(maxsize=None)
+def code_version() -> str:
+    """
+    Versión del código de la app: hash del contenido de sus módulos (.py de la
+    carpeta app, incluido config.py). Se calcula una vez por proceso.
+    
+    Returns:
+        Versión hexadecimal
+    """
+    digest = hashlib.sha1()
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@functools.lru_cache(maxsize=None)
+def result_cache() -> ResultCache:
+    """
+    Devuelve la caché persistente de resultados del proceso.
+    
+    Returns:
+        PersistentResultCache o None si RESULT_CACHE está desactivada
+    """
+    if not RESULT_CACHE:
+        return None
+    return PersistentResultCache(RESULT_CACHE_DIR, RESULT_CACHE_MAX_MB * 2**20)
+
+
+def _read_pickle(path: Path):
+    """Lee un valor guardado con pickle."""
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class StreamlitCache(ResultCache):
+    """
+    Caché de Streamlit (st.cache_data) para la app. Solo se calcula el hash de
+    la clave; compute y sus argumentos quedan fuera (parámetros con '_').
+    """
+    
+    def __init__(self, max_entries: int = DATA_CACHE_ENTRIES):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_entries: Número máximo de entradas
+        """
+        import streamlit as st
+        
+        @st.cache_data(show_spinner=False, max_entries=max_entries)
+        def cached(key: tuple, _compute, _args: tuple, _computed: list):
+            _computed.append(True)
+            return _compute(*_args)
+        
+        self._cached = cached
+    
+    def get_or_compute(self, key: tuple, compute, *args):
+        """Ver ResultCache.get_or_compute."""
+        computed = []
+        value = self._cached(key, compute, args, computed)
+        record_cache(self.layer, not computed)
+        return value
+    
+    def clear(self):
+        """Vacía la caché."""
+        self._cached.clear()
+
+
+def _streamlit_running() -> bool:
+    """Indica si el proceso ejecuta la app de Streamlit (sin importar streamlit si no)."""
+    if 'streamlit' not in sys.modules:
+        return False
+    from streamlit import runtime
+    return runtime.exists()
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_cache(backend: str) -> ResultCache:
+    """Caché compartida por los cargadores del proceso con el mismo backend."""
+    if backend == 'disk':
+        return DiskCache()
+    if backend == 'streamlit':
+        return StreamlitCache()
+    return MemoryCache()
+
+
+def default_cache() -> ResultCache:
+    """
+    Devuelve la caché de CACHE_BACKEND, compartida por todo el proceso.
+    
+    Returns:
+        ResultCache ('auto': StreamlitCache dentro de la app, MemoryCache fuera)
+    """
+    backend = CACHE_BACKEND
+    if backend == 'auto':
+        backend = 'streamlit' if _streamlit_running() else 'memory'
+    return _shared_cache(backend)
@@ -0,0 +1,135 @@
+"""
+Cancelación cooperativa de cálculos superados por un cambio de filtros.
+Cada sesión tiene una generación de filtros (FilterGeneration); los cálculos
+pesados se ejecutan con el token de la generación activa y comprueban en
+puntos de control (checkpoint) si ha sido cancelado. Al aplicar filtros nuevos
+se cancela el token anterior y el trabajo obsoleto (también el de los hilos de
+precarga) se aborta en el siguiente punto de control en lugar de competir por
+CPU con la nueva ejecución.
+
+El token activo se guarda en una variable de contexto: checkpoint() sin token
+activo no hace nada, de modo que las funciones se pueden usar fuera de la app.
+"""
+
+import contextvars
+import threading
+
+
+class OperationCancelled(Exception):
+    """El cálculo pertenece a una generación de filtros ya superada."""
+
+
+class CancelToken:
+    """
+    Token de cancelación. Se cancela explícitamente, al cancelarse su token
+    padre o cuando la función probe indica una cancelación externa (como una
+    nueva ejecución del script solicitada por Streamlit).
+    """
+    
+    __slots__ = ('_cancelled', '_parent', '_probe')
+    
+    def __init__(self, parent: 'CancelToken' = None, probe=None):
+        """
+        Inicializa el token.
+        
+        Args:
+            parent: Token cuya cancelación cancela también este
+            probe: Función sin argumentos que devuelve True si hay que cancelar
+        """
+        self._cancelled = False
+        self._parent = parent
+        self._probe = probe
+    
+    def cancel(self):
+        """Cancela el token."""
+        self._cancelled = True
+    
+    @property
+    def cancelled(self) -> bool:
+        """Indica si el token se ha cancelado."""
+        return (
+            self._cancelled
+            or (self._parent is not None and self._parent.cancelled)
+            or (self._probe is not None and self._probe())
+        )
+
+
+class FilterGeneration:
+    """
+    Generación de filtros de una sesión: número, firma y token de los cálculos
+    hechos con esos filtros.
+    """
+    
+    def __init__(self):
+        """Inicializa la primera generación."""
+        self.number = 0
+        self.signature = None
+        self.token = CancelToken()
+    
+    def advance(self, signature: str = None) -> CancelToken:
+        """
+        Pasa a una nueva generación cancelando los cálculos de la anterior.
+        
+        Args:
+            signature: Firma de los filtros de la nueva generación
+            
+        Returns:
+            Token de la nueva generación
+        """
+        self.token.cancel()
+        self.number += 1
+        self.signature = signature
+        self.token = CancelToken()
+        return self.token
+
+
+_current_token = contextvars.ContextVar('cancel_token', default=None)
+
+_stats = {'cancelled': 0}
+_stats_lock = threading.Lock()
+
+
+def activate(token: CancelToken):
+    """
+    Establece el token de los cálculos del contexto actual.
+    
+    Args:
+        token: Token de la generación activa (None para desactivar la cancelación)
+    """
+    _current_token.set(token)
+
+
+def current_token() -> CancelToken:
+    """Devuelve el token del contexto actual (o None)."""
+    return _current_token.get()
+
+
+def is_cancelled() -> bool:
+    """Indica si el token del contexto actual se ha cancelado."""
+    token = _current_token.get()
+    return token is not None and token.cancelled
+
+
+def checkpoint():
+    """
+    Punto de control: lanza OperationCancelled si el token activo se ha cancelado.
+    
+    Raises:
+        OperationCancelled: Si el cálculo pertenece a una generación superada
+    """
+    token = _current_token.get()
+    if token is not None and token.cancelled:
+        with _stats_lock:
+            _stats['cancelled'] += 1
+        raise OperationCancelled()
+
+
+def get_cancellation_stats() -> dict:
+    """
+    Devuelve los contadores de cancelación del proceso.
+    
+    Returns:
+        Diccionario con el número de cálculos cancelados
+    """
+    with _stats_lock:
+        return dict(_stats)
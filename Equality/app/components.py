@@ -3,30 +3,49 @@ Componentes reutilizables de la interfaz de Streamlit.
 Incluye sidebar, métricas KPI, secciones, etc.
 """
 
+import functools
+import warnings
+
 import streamlit as st
 import pandas as pd
-from config import DEPENDENT_VARS, ISO2_TO_NAME, PARTY_NAMES
+from cancellation import CancelToken, FilterGeneration, OperationCancelled, activate, get_cancellation_stats
+from config import DEPENDENT_VARS, ISO2_TO_NAME, PARTY_NAMES, FILTER_MODE, PERF_OVERLAY, PERF_QUERY_PARAM
+from memory import MEMORY_BUDGET, estimate_size
+from metrics import enable_metrics
+from exports import EXPORT_FORMATS, DOWNLOAD_CACHE, get_available_formats, serialize_dataframe
+from profiling import PerfRecorder, install_instrumentation, is_instrumented, start_run
+from singleflight import get_flight_stats
 
 
-def render_sidebar(df: pd.DataFrame) -> dict:
+def render_sidebar(catalog: dict, batch: bool = None) -> dict:
     """
     Renderiza el menú lateral con filtros interactivos.
     
+    En modo por lotes los filtros se agrupan en un formulario: los cambios se
+    acumulan sin re-ejecutar la app y se aplican todos juntos al confirmar.
+    
     Args:
-        df: DataFrame con los datos limpios
+        catalog: Catálogo de dominios de filtros (ver DataLoader.build_filter_catalog)
+        batch: Si True, aplica los filtros por lotes (por defecto según FILTER_MODE)
         
     Returns:
         Diccionario con los filtros seleccionados
     """
+    if batch is None:
+        batch = FILTER_MODE == 'batch'
+    
     st.sidebar.title("🔍 Filtros")
     st.sidebar.markdown("---")
     
+    # Contenedor de los widgets: formulario (por lotes) o sidebar (inmediato)
+    container = st.sidebar.form("filters_form", border=False) if batch else st.sidebar
+    
     filters = {}
     
     # Filtro por País
-    st.sidebar.subheader("🌍 País")
-    countries = ['Todos'] + sorted(df['country_name'].dropna().unique().tolist())
-    selected_countries = st.sidebar.multiselect(
+    container.subheader("🌍 País")
+    countries = ['Todos'] + catalog['countries']
+    selected_countries = container.multiselect(
         "Seleccionar países",
         options=countries,
         default=['Todos'],
@@ -37,9 +56,9 @@ def render_sidebar(df: pd.DataFrame) -> dict:
         filters['country_name'] = selected_countries
     
     # Filtro por Género
-    st.sidebar.subheader("👥 Género")
+    container.subheader("👥 Género")
     gender_options = ['Todos', 'Hombre', 'Mujer']
-    selected_gender = st.sidebar.radio(
+    selected_gender = container.radio(
         "Seleccionar género",
         options=gender_options,
         help="Filtra los datos por género"
@@ -49,9 +68,9 @@ def render_sidebar(df: pd.DataFrame) -> dict:
         filters['gender_label'] = [selected_gender]
     
     # Filtro por Tramo de Edad
-    st.sidebar.subheader("📅 Edad")
-    age_groups = ['Todos'] + df['age_group'].dropna().unique().tolist()
-    selected_age = st.sidebar.multiselect(
+    container.subheader("📅 Edad")
+    age_groups = ['Todos'] + catalog['age_groups']
+    selected_age = container.multiselect(
         "Seleccionar tramos de edad",
         options=age_groups,
         default=['Todos'],
@@ -62,27 +81,23 @@ def render_sidebar(df: pd.DataFrame) -> dict:
         filters['age_group'] = selected_age
     
     # Filtro por Nivel Educativo (cuartiles)
-    st.sidebar.subheader("🎓 Nivel Educativo")
-    edu_q1 = df['education_level'].quantile(0.25)
-    edu_q2 = df['education_level'].quantile(0.50)
-    edu_q3 = df['education_level'].quantile(0.75)
-    
-    edu_option = st.sidebar.select_slider(
+    container.subheader("🎓 Nivel Educativo")
+    edu_option = container.select_slider(
         "Nivel educativo",
-        options=['Todos', 'Bajo (Q1)', 'Medio-Bajo (Q2)', 'Medio-Alto (Q3)', 'Alto (Q4)'],
+        options=['Todos'] + catalog['education_quartile_labels'],
         value='Todos',
         help="Filtra por cuartil educativo"
     )
     
-    # Aplicar filtro educativo si no es "Todos"
-    # (Se aplicará en la función de filtrado principal)
-    filters['education_filter'] = edu_option
+    # Los cuartiles se precalculan al cargar los datos (columna education_quartile)
+    if edu_option != 'Todos':
+        filters['education_quartile'] = [edu_option]
     
     # Filtro por Partido (solo para España)
-    if 'ES' in df['cntry'].values:
-        st.sidebar.subheader("🗳️ Partido (España)")
-        parties = ['Todos'] + sorted(df[df['cntry'] == 'ES']['party_name'].dropna().unique().tolist())
-        selected_parties = st.sidebar.multiselect(
+    if catalog['has_spain']:
+        container.subheader("🗳️ Partido (España)")
+        parties = ['Todos'] + catalog['parties_spain']
+        selected_parties = container.multiselect(
             "Seleccionar partidos",
             options=parties,
             default=['Todos'],
@@ -92,43 +107,16 @@ def render_sidebar(df: pd.DataFrame) -> dict:
         if 'Todos' not in selected_parties and selected_parties:
             filters['party_name'] = selected_parties
     
+    if batch:
+        container.form_submit_button("✅ Aplicar filtros", width="stretch")
+    
     # Información de datos filtrados
     st.sidebar.markdown("---")
-    st.sidebar.info(f"📊 **Datos disponibles:** {len(df):,} observaciones")
+    st.sidebar.info(f"📊 **Datos disponibles:** {catalog['n_rows']:,} observaciones")
     
     return filters
 
 
-def apply_education_filter(df: pd.DataFrame, edu_option: str) -> pd.DataFrame:
-    """
-    Aplica el filtro de nivel educativo basado en cuartiles.
-    
-    Args:
-        df: DataFrame a filtrar
-        edu_option: Opción de educación seleccionada
-        
-    Returns:
-        DataFrame filtrado
-    """
-    if edu_option == 'Todos':
-        return df
-    
-    q1 = df['education_level'].quantile(0.25)
-    q2 = df['education_level'].quantile(0.50)
-    q3 = df['education_level'].quantile(0.75)
-    
-    if edu_option == 'Bajo (Q1)':
-        return df[df['education_level'] <= q1]
-    elif edu_option == 'Medio-Bajo (Q2)':
-        return df[(df['education_level'] > q1) & (df['education_level'] <= q2)]
-    elif edu_option == 'Medio-Alto (Q3)':
-        return df[(df['education_level'] > q2) & (df['education_level'] <= q3)]
-    elif edu_option == 'Alto (Q4)':
-        return df[df['education_level'] > q3]
-    
-    return df
-
-
 def render_kpi_cards(kpis: dict):
     """
     Renderiza tarjetas de KPIs en columnas.
@@ -175,6 +163,21 @@ def render_variable_selector(variables: dict, key: str = "var_select") -> str:
     return selected_var
 
 
+def get_open_tab(labels: dict, key: str) -> str:
+    """
+    Pestaña abierta de un grupo de st.tabs con key, antes de renderizarlo.
+    
+    Args:
+        labels: Diccionario {pestaña: etiqueta} en el orden de las pestañas
+        key: Key del grupo de pestañas
+        
+    Returns:
+        Nombre de la pestaña abierta (la primera si aún no se ha renderizado)
+    """
+    label = st.session_state.get(key)
+    return next((tab for tab, tab_label in labels.items() if tab_label == label), next(iter(labels)))
+
+
 def render_section_header(title: str, description: str = None, icon: str = "📊"):
     """
     Renderiza un encabezado de sección con estilo.
@@ -243,22 +246,42 @@ def render_data_quality_warning(df: pd.DataFrame, min_obs: int = 30):
                   f"Se recomienda tener al menos {min_obs} para análisis robustos.")
 
 
-def create_download_button(df: pd.DataFrame, filename: str, button_text: str = "📥 Descargar datos"):
+def create_download_button(df: pd.DataFrame, filename: str, button_text: str = "📥 Descargar datos",
+                           signature: str = None, key: str = "download"):
     """
-    Crea un botón para descargar datos en formato CSV.
+    Crea un botón para descargar datos en el formato elegido (CSV, CSV comprimido
+    o Parquet). El archivo solo se genera al pulsar el botón.
     
     Args:
         df: DataFrame a descargar
-        filename: Nombre del archivo
+        filename: Nombre del archivo (sin extensión)
         button_text: Texto del botón
+        signature: Firma de los filtros aplicados a df (clave de la caché de descargas)
+        key: Key única para los widgets
     """
-    csv = df.to_csv(index=False).encode('utf-8')
+    formats = get_available_formats()
+    fmt = st.radio(
+        "Formato de descarga",
+        options=formats,
+        format_func=lambda x: EXPORT_FORMATS[x][0],
+        horizontal=True,
+        key=f"{key}_format"
+    )
+    label, extension, mime = EXPORT_FORMATS[fmt]
+    
+    # Sin firma no se puede reutilizar el archivo entre ejecuciones
+    if signature is None:
+        generate = lambda: serialize_dataframe(df, fmt)
+    else:
+        generate = lambda: DOWNLOAD_CACHE.get(signature, fmt, df)
     
     st.download_button(
         label=button_text,
-        data=csv,
-        file_name=filename,
-        mime='text/csv',
+        data=generate,
+        file_name=f"{filename}{extension}",
+        mime=mime,
+        key=key,
+        on_click="ignore",
     )
 
 
@@ -313,3 +336,251 @@ def render_footer():
         <p>Fuente de datos: European Social Survey Round 11</p>
     </div>
     """, unsafe_allow_html=True)
+
+
+# ============================================================================
+# CANCELACIÓN DE CÁLCULOS OBSOLETOS
+# ============================================================================
+
+# La sonda de re-ejecución lee atributos privados de Streamlit: ScriptRequests._state
+# y los campos fragment_id_queue e is_fragment_scoped_rerun de ScriptRequests._rerun_data.
+# Están comprobados con Streamlit 1.66 (requirements.txt fija la versión máxima);
+# si desaparecen, _rerun_probe_supported() avisa y la sonda se desactiva.
+_RERUN_DATA_FIELDS = ('fragment_id_queue', 'is_fragment_scoped_rerun')
+
+
+@functools.lru_cache(maxsize=None)
+def _rerun_probe_supported(requests_type: type, rerun_data_type: type) -> bool:
+    """
+    Comprueba (una vez por tipo) que ScriptRequests tiene los atributos privados
+    que lee la sonda, y avisa si no.
+    """
+    import dataclasses
+    
+    fields = {field.name for field in dataclasses.fields(rerun_data_type)} \
+        if dataclasses.is_dataclass(rerun_data_type) else set()
+    supported = set(_RERUN_DATA_FIELDS) <= fields
+    if not supported:
+        warnings.warn(
+            "Esta versión de Streamlit no expone ScriptRequests._rerun_data con "
+            f"{', '.join(_RERUN_DATA_FIELDS)}: los cálculos del script no se cancelan "
+            "al pedirse una nueva ejecución",
+            RuntimeWarning
+        )
+    return supported
+
+
+def _rerun_probe():
+    """
+    Devuelve una función que indica si Streamlit tiene pendiente una nueva
+    ejecución que interrumpirá la actual (p. ej. al aplicar otros filtros).
+    
+    Returns:
+        Función sin argumentos, o None fuera del runtime de Streamlit o si la
+        versión de Streamlit no tiene los atributos que lee
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    
+    ctx = get_script_run_ctx()
+    requests = getattr(ctx, 'script_requests', None)
+    if requests is None:
+        return None
+    if not hasattr(requests, '_state') or not _rerun_probe_supported(
+            type(requests), type(getattr(requests, '_rerun_data', None))):
+        return None
+    
+    def rerun_requested() -> bool:
+        # Estado interno de ScriptRequests: las re-ejecuciones de fragmentos no
+        # interrumpen la ejecución completa, el resto sí
+        if requests._state.name != 'RERUN':
+            return False
+        rerun_data = requests._rerun_data
+        return not (rerun_data.fragment_id_queue and not rerun_data.is_fragment_scoped_rerun)
+    
+    return rerun_requested
+
+
+def activate_filter_generation(signature: str = None) -> FilterGeneration:
+    """
+    Activa para la ejecución actual el token de la generación de filtros de la
+    sesión. Con una firma distinta de la activa se pasa a una nueva generación,
+    cancelando los cálculos (y precargas) de la anterior.
+    
+    Args:
+        signature: Firma de los filtros aplicados (None para mantener la generación)
+        
+    Returns:
+        Generación de filtros de la sesión
+    """
+    generation = st.session_state.get('filter_generation')
+    if generation is None:
+        generation = st.session_state['filter_generation'] = FilterGeneration()
+    
+    if signature is not None and signature != generation.signature:
+        generation.advance(signature)
+    
+    activate(CancelToken(parent=generation.token, probe=_rerun_probe()))
+    return generation
+
+
+def cancellable_section(render):
+    """
+    Decorador de secciones: activa el token de la sesión y, si un cálculo se
+    cancela porque el usuario ya ha cambiado los filtros, cede el control a
+    Streamlit para que empiece la nueva ejecución sin mostrar un error.
+    
+    Args:
+        render: Función que renderiza la sección
+        
+    Returns:
+        Función decorada
+    """
+    @functools.wraps(render)
+    def wrapper(*args, **kwargs):
+        activate_filter_generation()
+        try:
+            return render(*args, **kwargs)
+        except OperationCancelled:
+            # Cualquier elemento nuevo es un punto de cesión: Streamlit lanza ahí
+            # la re-ejecución pendiente
+            st.empty()
+            raise
+    
+    return wrapper
+
+
+# ============================================================================
+# PANEL DE RENDIMIENTO
+# ============================================================================
+
+def start_perf_overlay() -> PerfRecorder:
+    """
+    Inicia el registro de rendimiento de la ejecución si el panel está activo
+    (ESS11_PERF_OVERLAY para todas las sesiones o ?perf=1 en la URL para una).
+    Las funciones solo se instrumentan con ESS11_PERF_OVERLAY: una sesión con
+    ?perf=1 registra secciones, cachés y figuras sin modificar el proceso.
+    
+    Returns:
+        Registro de la ejecución, o None si el panel no está activo
+    """
+    if PERF_OVERLAY:
+        install_instrumentation()
+    enabled = PERF_OVERLAY or st.query_params.get(PERF_QUERY_PARAM) in ('1', 'true')
+    return start_run(enabled)
+
+
+def _runtime():
+    """Runtime del servidor de Streamlit (None sin servidor)."""
+    from streamlit.runtime import Runtime
+    
+    return Runtime.instance() if Runtime.exists() else None
+
+
+def _active_sessions() -> int:
+    """
+    Sesiones activas del servidor de Streamlit entre las contabilizadas en el
+    presupuesto de memoria (None sin servidor).
+    """
+    runtime = _runtime()
+    if runtime is None:
+        return None
+    return sum(1 for session_id in MEMORY_BUDGET.session_ids() if runtime.is_active_session(session_id))
+
+
+def start_metrics():
+    """
+    Activa las métricas Prometheus del proceso (una sola vez por proceso), con
+    el número de sesiones activas del servidor.
+    """
+    enable_metrics(active_sessions=_active_sessions)
+
+
+def account_session_memory(signature: str):
+    """
+    Contabiliza el estado de la sesión actual en el presupuesto de memoria y
+    aplica el presupuesto. Los datos filtrados no cuentan aquí: son compartidos
+    y se contabilizan en su caché (la sesión solo guarda la firma).
+    
+    Args:
+        signature: Firma de los filtros aplicados en la sesión
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    
+    state = {key: st.session_state[key] for key in st.session_state}
+    MEMORY_BUDGET.set_session(ctx.session_id, estimate_size(state), signature)
+    
+    runtime = _runtime()
+    if runtime is not None:
+        MEMORY_BUDGET.prune_sessions(
+            session_id for session_id in MEMORY_BUDGET.session_ids()
+            if runtime.is_active_session(session_id)
+        )
+    MEMORY_BUDGET.enforce()
+
+
+def _memory_table(stats: dict) -> pd.DataFrame:
+    """Tabla de memoria contabilizada (MB) por componente del proceso."""
+    rows = [(name, None, nbytes / 2**20, None) for name, nbytes in sorted(stats['base'].items())]
+    rows.append((f"sesiones ({stats['sessions']['count']})", None, stats['sessions']['bytes'] / 2**20, None))
+    rows.extend(
+        (name, cache['entries'], cache['bytes'] / 2**20, cache['evictions'])
+        for name, cache in sorted(stats['caches'].items())
+    )
+    return pd.DataFrame(rows, columns=['Componente', 'Entradas', 'MB', 'Descartes'])
+
+
+def render_perf_overlay(recorder: PerfRecorder):
+    """
+    Muestra en el sidebar el panel de rendimiento de la ejecución.
+    
+    Args:
+        recorder: Registro de la ejecución (start_perf_overlay)
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    
+    tables = recorder.tables()
+    
+    with st.sidebar.expander("⏱️ Rendimiento de la ejecución", expanded=True):
+        st.caption(
+            f"Ejecución completa: {recorder.elapsed() * 1000:.0f} ms · "
+            f"{len(tables['figures'])} figuras, {tables['figures']['KB'].sum():.0f} KB. "
+            "Las re-ejecuciones de una sola sección no se registran."
+        )
+        
+        st.markdown("**Secciones**")
+        st.dataframe(tables['sections'].round(2), hide_index=True)
+        
+        st.markdown("**Funciones** (tiempo acumulado, incluye llamadas anidadas)")
+        if not is_instrumented():
+            st.caption("Sin tiempos por función: requieren arrancar el proceso con ESS11_PERF_OVERLAY=1.")
+        st.dataframe(tables['calls'].round(2), hide_index=True)
+        
+        st.markdown("**Cachés**")
+        st.dataframe(tables['caches'], hide_index=True)
+        
+        st.markdown("**Figuras enviadas**")
+        st.dataframe(tables['figures'].round(2), hide_index=True)
+        
+        memory = MEMORY_BUDGET.stats()
+        budget = f"{memory['budget_bytes'] / 2**20:.0f} MB" if memory['budget_bytes'] else "sin límite"
+        st.markdown("**Memoria contabilizada** (proceso)")
+        st.caption(
+            f"{memory['total_bytes'] / 2**20:.1f} MB de {budget}"
+            + (" · por encima del presupuesto" if memory['over_budget'] else "")
+        )
+        st.dataframe(_memory_table(memory).round(2), hide_index=True)
+        ctx = get_script_run_ctx()
+        usage = MEMORY_BUDGET.session_usage(ctx.session_id) if ctx is not None else None
+        if usage is not None:
+            st.caption(
+                f"Esta sesión: {usage['state_bytes'] / 1024:.1f} KB de estado; datos "
+                f"filtrados compartidos con {usage['frame_sharers']} sesión(es)."
+            )
+        
+        st.markdown("**Single-flight y cancelación** (acumulado del proceso)")
+        st.json({'single_flight': get_flight_stats(), 'cancellation': get_cancellation_stats()},
+                expanded=False)
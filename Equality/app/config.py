@@ -14,9 +14,11 @@ BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "data"
 DOCS_DIR = BASE_DIR / "docs"
 NOTEBOOKS_DIR = BASE_DIR / "notebooks"
+REPORTS_DIR = BASE_DIR / "reports"
+ARTIFACTS_DIR = BASE_DIR / "artifacts"
 
-# Archivo de datos principal
-DATA_FILE = DATA_DIR / "ESS11.csv"
+# Archivo de datos principal (ESS11_DATA_FILE permite usar otro, p. ej. en benchmarks)
+DATA_FILE = Path(os.environ.get('ESS11_DATA_FILE', DATA_DIR / "ESS11.csv"))
 
 # ============================================================================
 # VARIABLES DEL DATASET ESS11
@@ -203,6 +205,11 @@ PLOTLY_CONFIG = {
 # Plantilla de gráficos
 PLOTLY_TEMPLATE = 'plotly_white'
 
+# Motor de construcción de figuras:
+# - 'graph_objects': construye go.Figure directamente desde arrays agregados (rápido)
+# - 'express': usa Plotly Express (implementación original)
+FIGURE_ENGINE = 'graph_objects'
+
 # ============================================================================
 # CONFIGURACIÓN DE PÁGINA STREAMLIT
 # ============================================================================
@@ -285,6 +292,41 @@ VAR_DESCRIPTIONS = {
     """
 }
 
+# Etiquetas de las pestañas de cada sección (en orden; claves de sections.EDA_TABS
+# y sections.SPAIN_TABS)
+EDA_TAB_LABELS = {
+    'distribution': "📊 Distribución General",
+    'gender': "👥 Análisis por Género",
+    'age': "📅 Análisis por Edad",
+    'education': "🎓 Análisis por Educación",
+    'country': "🌍 Análisis por País"
+}
+
+SPAIN_TAB_LABELS = {
+    'party': "🗳️ Por Partido",
+    'ideology': "⬅️➡️ Por Ideología",
+    'nationalism': "🏴 Por Nacionalismo"
+}
+
+# ============================================================================
+# CONFIGURACIÓN DE FILTROS
+# ============================================================================
+
+# Modo de aplicación de los filtros del sidebar:
+# - 'batch': los cambios se acumulan y se aplican juntos con "Aplicar filtros"
+# - 'instant': cada cambio re-ejecuta la app inmediatamente
+FILTER_MODE = 'batch'
+
+# ============================================================================
+# CONFIGURACIÓN DE DESCARGAS
+# ============================================================================
+
+# Filas por bloque al serializar los datos filtrados
+EXPORT_CHUNK_ROWS = 50000
+
+# Número máximo de archivos de descarga en caché (por firma de filtros y formato)
+EXPORT_CACHE_ENTRIES = 8
+
 # ============================================================================
 # CONFIGURACIÓN DE TRAMOS DE EDAD
 # ============================================================================
@@ -292,6 +334,142 @@ VAR_DESCRIPTIONS = {
 AGE_BINS = [15, 25, 35, 45, 55, 65, 100]
 AGE_LABELS = ['15-24', '25-34', '35-44', '45-54', '55-64', '65+']
 
+# ============================================================================
+# CONFIGURACIÓN DE CUARTILES EDUCATIVOS
+# ============================================================================
+
+# Etiquetas de los cuartiles de education_level (de menor a mayor)
+EDUCATION_QUARTILE_LABELS = ['Bajo (Q1)', 'Medio-Bajo (Q2)', 'Medio-Alto (Q3)', 'Alto (Q4)']
+
+# Población de referencia para calcular los umbrales de los cuartiles:
+# - 'global': umbrales comunes calculados sobre todos los encuestados
+# - 'country': umbrales calculados dentro de cada país
+EDUCATION_QUARTILE_REFERENCE = 'global'
+
+# Dimensiones de filtrado indexadas al cargar los datos
+FILTER_DIMENSIONS = ['country_name', 'gender_label', 'age_group', 'education_quartile', 'party_name']
+
+# ============================================================================
+# CONFIGURACIÓN DE ARTEFACTOS PRECALCULADOS
+# ============================================================================
+
+# Si True, la app abre los artefactos de 'python run.py build' (si están al día)
+# en lugar de leer y limpiar el CSV
+USE_ARTIFACTS = True
+
+# Dimensiones del cubo de agregados (n, suma y suma de cuadrados por variable)
+CUBE_DIMENSIONS = ['country_name', 'gender_label', 'age_group', 'education_quartile']
+
+# Modo de dataset compartido entre varios procesos de Streamlit en el mismo host:
+# un proceso publica los artefactos ('python run.py publish') y los workers los
+# abren sin copia (texto como categóricas), se registran como lectores y cambian
+# a la nueva versión cuando se publica. Sin artefactos publicados se usa el CSV.
+SHARED_DATASET = False
+
+# Backend de consultas (ver backends.py): 'pandas' (en memoria), 'duckdb' (filtros
+# y agregados en SQL sobre la instantánea Parquet de los artefactos; requiere
+# 'python run.py build') o 'polars' (carga, limpieza, filtros y agregados como
+# planes lazy de Polars). Sin el paquete o sin instantánea se usa pandas
+QUERY_BACKEND = os.environ.get('ESS11_QUERY_BACKEND', 'pandas').lower()
+
+# ============================================================================
+# CONFIGURACIÓN DEL SERVICIO DE ANÁLISIS
+# ============================================================================
+
+# Si True, la app pide los datos de las pestañas al servicio de análisis
+# ('python run.py serve'); si el servicio no responde se calculan en el proceso
+ANALYTICS_SERVICE = False
+
+# Socket Unix del servicio (ruta corta: el límite del sistema es ~100 caracteres)
+ANALYTICS_SOCKET = Path(os.environ.get('ESS11_ANALYTICS_SOCKET', '/tmp/ess11-analytics.sock'))
+
+# ============================================================================
+# CONFIGURACIÓN DE LA EJECUCIÓN EN PARALELO
+# ============================================================================
+
+# Si True, cada ejecución completa programa al inicio en un pool el cálculo de
+# las secciones y de la pestaña abierta de cada grupo, y las recoge en orden al
+# renderizar (el resto de pestañas se precargan tras renderizar la abierta)
+PARALLEL_SECTIONS = True
+
+# Hilos del pool de secciones (también usados para la precarga de pestañas)
+SECTION_WORKERS = 4
+
+# Procesos para las estadísticas pesadas de scipy (resumen y correlaciones);
+# con una sola CPU no aportan nada y se calculan en los hilos
+SECTION_PROCESS_WORKERS = min(4, (os.cpu_count() or 1) - 1)
+
+# ============================================================================
+# PRESUPUESTO DE MEMORIA
+# ============================================================================
+
+# Presupuesto de memoria del proceso (MB) para el dataset, las cachés derivadas
+# y el estado de las sesiones. Al superarlo se descartan entradas de las cachés
+# derivadas, primero las más baratas de recalcular por MB (0: sin límite)
+MEMORY_BUDGET_MB = int(os.environ.get('ESS11_MEMORY_BUDGET_MB', 2048))
+
+# Número máximo de DataFrames filtrados compartidos entre sesiones (por firma de filtros)
+FRAME_CACHE_ENTRIES = 16
+
+# Entradas de la caché de datos del cargador en memoria o en Streamlit (datos
+# crudos y limpios por versión del dataset; con 1 solo se conservan los limpios
+# de la última versión); se reutilizan al volver a crear el cargador
+DATA_CACHE_ENTRIES = 1
+
+# ============================================================================
+# CACHÉ DE DATOS DEL CARGADOR
+# ============================================================================
+
+# Caché de la carga y limpieza de DataLoader (ver cache.py): 'auto' (Streamlit
+# dentro de la app y memoria fuera), 'memory', 'disk' o 'streamlit'
+CACHE_BACKEND = os.environ.get('ESS11_CACHE_BACKEND', 'auto').lower()
+
+# Carpeta y tamaño máximo (MB) de la caché en disco; al superarlo se borran
+# las entradas usadas hace más tiempo
+CACHE_DIR = Path(os.environ.get('ESS11_CACHE_DIR', BASE_DIR / "cache"))
+CACHE_MAX_MB = int(os.environ.get('ESS11_CACHE_MAX_MB', 1024))
+
+# Caché persistente de resultados de pestañas y análisis (estadísticas y
+# figuras) que sobrevive a reinicios y despliegues: desactivada salvo con
+# ESS11_RESULT_CACHE=1. Se guarda en RESULT_CACHE_DIR con un límite de tamaño
+# (MB) y descarte LRU
+RESULT_CACHE = os.environ.get('ESS11_RESULT_CACHE', '0') == '1'
+RESULT_CACHE_DIR = Path(os.environ.get('ESS11_RESULT_CACHE_DIR', CACHE_DIR / "results"))
+RESULT_CACHE_MAX_MB = int(os.environ.get('ESS11_RESULT_CACHE_MAX_MB', 512))
+
+# ============================================================================
+# CONFIGURACIÓN DEL PANEL DE RENDIMIENTO
+# ============================================================================
+
+# Panel de depuración con el tiempo de cada sección y función, los aciertos de
+# caché y el tamaño de las figuras. Con ESS11_PERF_OVERLAY=1 se activa para todas
+# las sesiones y las funciones se instrumentan al arrancar el proceso; con ?perf=1
+# en la URL se activa solo para esa sesión, sin tiempos por función salvo que el
+# proceso ya esté instrumentado
+PERF_OVERLAY = os.environ.get('ESS11_PERF_OVERLAY', '').lower() in ('1', 'true', 'yes')
+
+# Parámetro de la URL que activa el panel en una sesión
+PERF_QUERY_PARAM = 'perf'
+
+# ============================================================================
+# CONFIGURACIÓN DE MÉTRICAS
+# ============================================================================
+
+# Métricas del proceso en formato Prometheus (tiempos de carga, filtrado y
+# cálculo, aciertos de caché, tamaño del dataset, sesiones activas, memoria).
+# Se activan con ESS11_METRICS=1
+METRICS_ENABLED = os.environ.get('ESS11_METRICS', '').lower() in ('1', 'true', 'yes')
+
+# Endpoint local http://METRICS_HOST:METRICS_PORT/metrics (puerto 0: sin endpoint)
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = int(os.environ.get('ESS11_METRICS_PORT', 9464))
+
+# Archivo .prom para el textfile collector de node_exporter (vacío: sin archivo)
+METRICS_FILE = Path(os.environ['ESS11_METRICS_FILE']) if os.environ.get('ESS11_METRICS_FILE') else None
+
+# Segundos entre escrituras del archivo de métricas
+METRICS_FILE_INTERVAL = 15
+
 # ============================================================================
 # CONSTANTES DE ANÁLISIS
 # ============================================================================
@@ -3,57 +3,127 @@ Módulo de carga y preprocesamiento de datos.
 Gestiona la lectura del CSV, limpieza de valores inválidos y transformaciones.
 """
 
+import hashlib
+import json
+import threading
+import time
+import weakref
+from collections import OrderedDict
 import pandas as pd
 import numpy as np
 from pathlib import Path
-import streamlit as st
 from config import (
     DATA_FILE, INVALID_VALUES, EDUCATION_SCALE, 
     IDEOLOGY_SCALE, NATIONALISM_SCALE, PARTY_NAMES,
-    ISO2_TO_ISO3, ISO2_TO_NAME, AGE_BINS, AGE_LABELS
+    ISO2_TO_ISO3, ISO2_TO_NAME, AGE_BINS, AGE_LABELS,
+    EDUCATION_QUARTILE_LABELS, EDUCATION_QUARTILE_REFERENCE, FILTER_DIMENSIONS,
+    ARTIFACTS_DIR, USE_ARTIFACTS, SHARED_DATASET, FRAME_CACHE_ENTRIES
 )
+from backends import activate_backend, activate_cube, current_backend
+from cache import ResultCache, default_cache
+from memory import MEMORY_BUDGET, estimate_size, shares_memory
+from profiling import record_cache, record_dataset, timed
+from singleflight import get_flight
+
+# Copy-on-Write (por defecto desde pandas 3): los DataFrames filtrados se
+# comparten entre sesiones sin copiar y ninguna puede modificar los de otra
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+
+class DataLoadError(Exception):
+    """Error al leer el archivo de datos (la app lo muestra y se detiene)."""
 
 
 class DataLoader:
     """
     Clase para cargar y preprocesar datos del ESS11.
-    Implementa caché de Streamlit para optimizar el rendimiento.
+    No depende de Streamlit: los datos crudos y limpios se guardan en una
+    caché (cache.py) que en la app es la de Streamlit y fuera de ella la
+    memoria del proceso o el disco, así que notebooks y trabajos por lotes
+    comparten el mismo pipeline.
     """
     
-    def __init__(self, file_path: Path = DATA_FILE):
+    def __init__(self, file_path: Path = DATA_FILE, cache: ResultCache = None):
         """
         Inicializa el cargador de datos.
         
         Args:
             file_path: Ruta al archivo CSV de datos
+            cache: Caché de los datos crudos y limpios (por defecto default_cache())
         """
         self.file_path = file_path
+        self.cache = cache if cache is not None else default_cache()
         self.df_raw = None
-        self.df_clean = None
-        
-    @st.cache_data(show_spinner=False)
-    def load_raw_data(_self) -> pd.DataFrame:
+        # (df_clean, catalog, filter_index) de la versión cargada: se publica con
+        # una sola asignación para que nadie combine piezas de dos versiones
+        self.snapshot = (None, None, None)
+        self.artifacts = None
+        # El dataset cuenta en el presupuesto de memoria mientras exista el cargador
+        weakref.finalize(self, MEMORY_BUDGET.set_base, ('dataset', id(self)), 0)
+    
+    @property
+    def df_clean(self) -> pd.DataFrame:
+        """DataFrame limpio de la versión cargada (o None)."""
+        return self.snapshot[0]
+    
+    @property
+    def catalog(self) -> dict:
+        """Catálogo de filtros de la versión cargada (ver build_filter_catalog)."""
+        return self.snapshot[1]
+    
+    @property
+    def filter_index(self) -> dict:
+        """Índice invertido de la versión cargada (ver build_filter_index)."""
+        return self.snapshot[2]
+    
+    def load_raw_data(self) -> pd.DataFrame:
         """
         Carga los datos crudos desde el CSV.
-        Usa caché de Streamlit para evitar recargas innecesarias.
+        Usa la caché del cargador para evitar recargas innecesarias.
+        
+        Returns:
+            DataFrame con los datos sin procesar
+        
+        Raises:
+            DataLoadError: Si el archivo no existe o no se puede leer
+        """
+        return self.cache.get_or_compute(('raw_data', self._cache_version()), self.read_raw_data)
+    
+    def read_raw_data(self) -> pd.DataFrame:
+        """
+        Lee el CSV sin pasar por la caché.
         
         Returns:
             DataFrame con los datos sin procesar
+        
+        Raises:
+            DataLoadError: Si el archivo no existe o no se puede leer
         """
         try:
-            df = pd.read_csv(_self.file_path, low_memory=False)
+            df = pd.read_csv(self.file_path, low_memory=False)
             return df
-        except FileNotFoundError:
-            st.error(f"❌ No se encontró el archivo de datos en: {_self.file_path}")
-            st.stop()
+        except FileNotFoundError as e:
+            raise DataLoadError(f"No se encontró el archivo de datos en: {self.file_path}") from e
         except Exception as e:
-            st.error(f"❌ Error al cargar los datos: {str(e)}")
-            st.stop()
+            raise DataLoadError(f"Error al cargar los datos: {str(e)}") from e
+    
+    def _cache_version(self) -> str:
+        """Versión del dataset para las claves de la caché (DataLoadError si falta el archivo)."""
+        try:
+            return self.get_dataset_version()
+        except FileNotFoundError as e:
+            raise DataLoadError(f"No se encontró el archivo de datos en: {self.file_path}") from e
     
-    @st.cache_data(show_spinner=False)
-    def clean_data(_self, df: pd.DataFrame) -> pd.DataFrame:
+    def _clean_from_csv(self) -> pd.DataFrame:
+        """Lee (de la caché si está) y limpia el CSV."""
+        self.df_raw = self.load_raw_data()
+        return self.clean_data(self.df_raw)
+    
+    def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Limpia los datos eliminando valores inválidos y creando variables derivadas.
+        Es una función pura: no usa caché (ver _read_data).
         
         Args:
             df: DataFrame con datos crudos
@@ -87,6 +157,16 @@ class DataLoader:
                 df_clean['education_level'].median()
             )
         
+        # 4b. Crear cuartiles educativos (umbrales fijos según la población de referencia)
+        if 'education_level' in df_clean.columns:
+            df_clean['education_quartile'] = assign_education_quartiles(
+                df_clean, EDUCATION_QUARTILE_REFERENCE
+            )
+            # Grupo alto del gradiente educativo: education_level >= p75 (incluye
+            # los empates en p75, que en education_quartile quedan en Q3)
+            _, _, q3 = education_quartile_thresholds(df_clean, EDUCATION_QUARTILE_REFERENCE)
+            df_clean['education_upper'] = df_clean['education_level'] >= q3
+        
         # 5. Crear tramos de edad
         if 'agea' in df_clean.columns:
             df_clean['age_group'] = pd.cut(
@@ -123,12 +203,229 @@ class DataLoader:
         Returns:
             DataFrame limpio
         """
-        if force_reload or self.df_clean is None:
-            self.df_raw = self.load_raw_data()
-            self.df_clean = self.clean_data(self.df_raw)
+        needs_load = force_reload or self._needs_load()
+        record_cache('data_loader', not needs_load)
+        if needs_load:
+            # Las sesiones que arrancan a la vez esperan a una única carga
+            get_flight('data_loader').do(('get_data', id(self)), self._load, force_reload)
         
         return self.df_clean
     
+    def _needs_load(self) -> bool:
+        """Indica si hay que (re)cargar los datos."""
+        return self.df_clean is None or self._artifacts_outdated()
+    
+    def _load(self, force_reload: bool = False):
+        """
+        Carga los datos desde los artefactos o el CSV (ver get_data).
+        
+        Args:
+            force_reload: Si True, recarga aunque los datos ya estén cargados
+        """
+        # Otra llamada pudo completar la carga mientras esta esperaba
+        if not force_reload and not self._needs_load():
+            return
+        
+        with timed('data_loader.load'):
+            self._read_data()
+        record_dataset(self.df_clean)
+        MEMORY_BUDGET.set_base(('dataset', id(self)), estimate_size([self.df_raw, self.df_clean]))
+        MEMORY_BUDGET.enforce()
+    
+    def _read_data(self):
+        """Lee los datos de los artefactos o del CSV con su catálogo e índice."""
+        # El lector de la versión anterior se libera después del cambio: hasta
+        # entonces su DataFrame sigue publicado
+        previous = self.artifacts
+        try:
+            self._swap_data()
+        finally:
+            # Si se reabre la misma versión, el registro de lector es el mismo archivo
+            current = self.artifacts
+            if previous is not None and (current is None or current.path != previous.path):
+                previous.release()
+    
+    def _swap_data(self):
+        """Abre la versión actual y publica su instantánea (ver _read_data)."""
+        # Artefactos precalculados ('python run.py build'): sin leer el CSV
+        artifacts = self.open_artifacts()
+        if artifacts is not None:
+            catalog = artifacts.load_catalog()
+            filter_index = artifacts.load_filter_index()
+            df_clean = artifacts.load_frame(
+                strings='category' if SHARED_DATASET else 'decode'
+            )
+            # Backend de consultas opcional sobre la instantánea Parquet de esta versión
+            activate_backend(artifacts.version, df_clean.dtypes,
+                             snapshot=artifacts.snapshot_path())
+            # Cubo de agregados para las medias por grupo de las pestañas
+            activate_cube(artifacts.version, artifacts.load_cube(), df_clean.dtypes)
+            self.snapshot = (df_clean, catalog, filter_index)
+            self.artifacts = artifacts
+            return
+        activate_cube(None)
+        
+        # Con el backend Polars, la carga y la limpieza del CSV son un plan lazy
+        # (es el único backend que devuelve un backend sin instantánea)
+        backend = None
+        if Path(self.file_path).exists():
+            backend = activate_backend(self.get_dataset_version(), source=self.file_path)
+        
+        self.df_raw = None
+        if backend is not None:
+            df_clean = backend.to_pandas()
+        else:
+            # Los datos limpios de esta versión salen de la caché del cargador
+            # (el CSV solo se lee y se limpia si no están)
+            df_clean = self.cache.get_or_compute(('clean_data', self._cache_version()), self._clean_from_csv)
+        self.snapshot = (df_clean, self.build_filter_catalog(df_clean), self.build_filter_index(df_clean))
+        self.artifacts = None
+    
+    def open_artifacts(self):
+        """
+        Abre los artefactos precalculados si existen y corresponden al archivo de datos.
+        
+        Returns:
+            ArtifactStore o None si no hay artefactos utilizables
+        """
+        if not USE_ARTIFACTS:
+            return None
+        
+        from artifacts import ArtifactStore
+        
+        try:
+            store = ArtifactStore.open_current(ARTIFACTS_DIR)
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        if store is None:
+            return None
+        
+        # En modo compartido manda la versión publicada; si no, se ignoran los
+        # artefactos desactualizados respecto al CSV
+        if SHARED_DATASET:
+            store.acquire()
+        elif Path(self.file_path).exists() and store.version != self.get_dataset_version():
+            return None
+        
+        return store
+    
+    def _artifacts_outdated(self) -> bool:
+        """
+        En modo compartido, indica si se ha publicado una versión distinta de la
+        abierta (comprobación de un archivo pequeño en cada ejecución).
+        
+        Returns:
+            True si hay que cambiar a la nueva versión
+        """
+        if not SHARED_DATASET or self.artifacts is None:
+            return False
+        
+        from artifacts import get_current_version
+        
+        current = get_current_version(ARTIFACTS_DIR)
+        return current is not None and current != self.artifacts.version
+    
+    def get_dataset_version(self) -> str:
+        """
+        Calcula la versión del dataset a partir de la ruta, tamaño y fecha de
+        modificación del archivo de datos (sin leer su contenido).
+        
+        Returns:
+            Versión hexadecimal del dataset
+        """
+        stat = Path(self.file_path).stat()
+        payload = f"{self.file_path}|{stat.st_size}|{stat.st_mtime_ns}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]
+    
+    def build_filter_catalog(self, df: pd.DataFrame) -> dict:
+        """
+        Precalcula los dominios de todos los filtros del sidebar.
+        Se construye una sola vez al cargar los datos, de modo que renderizar
+        el sidebar no requiere recorrer el DataFrame.
+        
+        Args:
+            df: DataFrame limpio
+            
+        Returns:
+            Diccionario con la versión del dataset y los valores de cada filtro
+        """
+        df_spain = df[df['cntry'] == 'ES']
+        
+        return {
+            'version': self.get_dataset_version(),
+            'n_rows': len(df),
+            'n_countries': df['cntry'].nunique(),
+            'countries': sorted(df['country_name'].dropna().unique().tolist()),
+            'age_groups': [
+                group for group in df['age_group'].cat.categories
+                if group in set(df['age_group'].dropna().unique())
+            ],
+            'education_quartile_reference': EDUCATION_QUARTILE_REFERENCE,
+            'education_quartile_labels': list(EDUCATION_QUARTILE_LABELS),
+            'education_quartiles': self._catalog_quartiles(df),
+            'has_spain': len(df_spain) > 0,
+            'parties_spain': sorted(df_spain['party_name'].dropna().unique().tolist())
+        }
+    
+    def _catalog_quartiles(self, df: pd.DataFrame) -> dict:
+        """
+        Umbrales de los cuartiles educativos con los que se asignó education_quartile.
+        
+        Args:
+            df: DataFrame limpio
+            
+        Returns:
+            Diccionario {'q1', 'q2', 'q3'}: escalares con la referencia 'global' y
+            {país: umbral} con 'country'
+        """
+        thresholds = education_quartile_thresholds(df, EDUCATION_QUARTILE_REFERENCE)
+        names = ('q1', 'q2', 'q3')
+        
+        if EDUCATION_QUARTILE_REFERENCE == 'country':
+            return {
+                name: values.groupby(df['country_name']).first().to_dict()
+                for name, values in zip(names, thresholds)
+            }
+        return dict(zip(names, thresholds))
+    
+    def build_filter_index(self, df: pd.DataFrame) -> dict:
+        """
+        Construye un índice invertido de las dimensiones de filtrado.
+        
+        Args:
+            df: DataFrame limpio
+            
+        Returns:
+            Diccionario {columna: {valor: posiciones (np.ndarray)}}
+        """
+        index = {}
+        
+        for column in FILTER_DIMENSIONS:
+            if column not in df.columns:
+                continue
+            codes, uniques = pd.factorize(df[column], sort=False)
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            index[column] = {
+                value: order[bounds[i]:bounds[i + 1]]
+                for i, value in enumerate(uniques)
+            }
+        
+        return index
+    
+    def get_filter_catalog(self) -> dict:
+        """
+        Obtiene el catálogo de dominios de filtros del dataset cargado.
+        
+        Returns:
+            Diccionario del catálogo (ver build_filter_catalog)
+        """
+        if self.catalog is None:
+            self.get_data()
+        
+        return self.catalog
+    
     def get_filtered_data(self, df: pd.DataFrame, filters: dict) -> pd.DataFrame:
         """
         Aplica filtros al DataFrame según los criterios especificados.
@@ -140,7 +437,24 @@ class DataLoader:
         Returns:
             DataFrame filtrado
         """
-        df_filtered = df.copy()
+        # Una sola lectura de la instantánea: catálogo e índice son los de df_clean
+        # aunque otra sesión cambie de versión mientras tanto
+        df_clean, catalog, filter_index = self.snapshot
+        
+        # Con un backend de consultas (DuckDB, Polars) los filtros se aplican en
+        # él; sin filtros se devuelve la vista del dataset, como en pandas
+        if df is df_clean and catalog and any(filters.values()):
+            backend = current_backend(catalog['version'])
+            if backend is not None:
+                return backend.filtered_data(filters)
+        
+        # Si df es el dataset limpio, resolver las dimensiones indexadas por posiciones
+        if df is df_clean and filter_index:
+            df, filters = self._apply_indexed_filters(df, filters, filter_index)
+        
+        # Con Copy-on-Write basta una copia superficial: sin filtros es una vista
+        # del dataset y los filtros crean DataFrames nuevos
+        df_filtered = df.copy(deep=False)
         
         for column, values in filters.items():
             if column in df_filtered.columns and values:
@@ -152,6 +466,36 @@ class DataLoader:
         
         return df_filtered
     
+    def _apply_indexed_filters(self, df: pd.DataFrame, filters: dict, filter_index: dict) -> tuple:
+        """
+        Aplica los filtros de las dimensiones indexadas mediante el índice invertido.
+        
+        Args:
+            df: DataFrame limpio
+            filters: Diccionario con filtros {columna: valores}
+            filter_index: Índice invertido de la misma versión que df
+            
+        Returns:
+            Tupla (DataFrame filtrado, filtros restantes no indexados)
+        """
+        mask = None
+        remaining = {}
+        
+        for column, values in filters.items():
+            if column not in filter_index or not values:
+                remaining[column] = values
+                continue
+            values = values if isinstance(values, list) else [values]
+            column_mask = np.zeros(len(df), dtype=bool)
+            for value in values:
+                column_mask[filter_index[column].get(value, [])] = True
+            mask = column_mask if mask is None else mask & column_mask
+        
+        if mask is None:
+            return df, remaining
+        
+        return df.iloc[np.flatnonzero(mask)], remaining
+    
     def get_variable_stats(self, df: pd.DataFrame, variable: str) -> dict:
         """
         Calcula estadísticas descriptivas de una variable.
@@ -220,6 +564,9 @@ class DataLoader:
     def calculate_education_gradient(self, df: pd.DataFrame, variable: str) -> float:
         """
         Calcula el gradiente educativo (Q4 vs Q1).
+        Usa los umbrales fijos calculados en clean_data: Q1 es education_level
+        <= p25 (education_quartile) y Q4 es education_level >= p75
+        (education_upper, con los empates en p75 como el gradiente original).
         
         Args:
             df: DataFrame con los datos
@@ -228,19 +575,17 @@ class DataLoader:
         Returns:
             Gradiente educativo (Media Q4 - Media Q1)
         """
-        if variable not in df.columns or 'education_level' not in df.columns:
+        if variable not in df.columns or 'education_quartile' not in df.columns:
             return np.nan
         
-        q1_threshold = df['education_level'].quantile(0.25)
-        q4_threshold = df['education_level'].quantile(0.75)
-        
-        q1_mean = df[df['education_level'] <= q1_threshold][variable].mean()
-        q4_mean = df[df['education_level'] >= q4_threshold][variable].mean()
+        values = df[variable]
+        q1_mean = values[df['education_quartile'] == EDUCATION_QUARTILE_LABELS[0]].mean()
+        q4_mean = values[df['education_upper']].mean()
         
         return q4_mean - q1_mean
     
     def get_country_ranking(self, df: pd.DataFrame, variable: str, 
-                           top_n: int = 5) -> tuple:
+                           top_n: int = 5, means: pd.DataFrame = None) -> tuple:
         """
         Obtiene el ranking de países para una variable.
         
@@ -248,14 +593,19 @@ class DataLoader:
             df: DataFrame con los datos
             variable: Variable dependiente a analizar
             top_n: Número de países a mostrar en top/bottom
-            
+            means: Medias por país ya agregadas (country_name, mean, count), p. ej.
+                por el backend de consultas; si se indican, df no se agrega
+                
         Returns:
             Tupla (top_countries, bottom_countries) como DataFrames
         """
-        if variable not in df.columns or 'country_name' not in df.columns:
+        if means is not None:
+            country_means = means
+        elif variable not in df.columns or 'country_name' not in df.columns:
             return pd.DataFrame(), pd.DataFrame()
+        else:
+            country_means = df.groupby('country_name')[variable].agg(['mean', 'count']).reset_index()
         
-        country_means = df.groupby('country_name')[variable].agg(['mean', 'count']).reset_index()
         country_means = country_means[country_means['count'] >= 30]  # Filtro de muestra mínima
         country_means = country_means.sort_values('mean', ascending=False)
         
@@ -265,6 +615,56 @@ class DataLoader:
         return top_countries, bottom_countries
 
 
+def education_quartile_thresholds(df: pd.DataFrame, reference: str = 'global') -> tuple:
+    """
+    Calcula los percentiles 25, 50 y 75 de education_level sobre la población
+    de referencia.
+    
+    Args:
+        df: DataFrame con la columna education_level (y cntry si reference='country')
+        reference: 'global' (todos los encuestados) o 'country' (dentro de cada país)
+        
+    Returns:
+        Tupla (p25, p50, p75): escalares con 'global' y Series alineadas con df
+        (el umbral del país de cada fila) con 'country'
+    """
+    education = df['education_level']
+    
+    if reference == 'country':
+        grouped = education.groupby(df['cntry'])
+        return tuple(grouped.transform('quantile', q) for q in (0.25, 0.50, 0.75))
+    return tuple(education.quantile(q) for q in (0.25, 0.50, 0.75))
+
+
+def assign_education_quartiles(df: pd.DataFrame, reference: str = 'global') -> pd.Series:
+    """
+    Asigna a cada fila su cuartil de education_level.
+    
+    Los cuartiles se definen como Q1: <= p25, Q2: (p25, p50], Q3: (p50, p75] y
+    Q4: > p75, calculando los percentiles sobre la población de referencia.
+    
+    Args:
+        df: DataFrame con la columna education_level (y cntry si reference='country')
+        reference: 'global' (todos los encuestados) o 'country' (dentro de cada país)
+        
+    Returns:
+        Serie categórica ordenada con las etiquetas de EDUCATION_QUARTILE_LABELS
+    """
+    education = df['education_level']
+    q1, q2, q3 = education_quartile_thresholds(df, reference)
+    
+    codes = np.select(
+        [education <= q1, education <= q2, education <= q3, education > q3],
+        [0, 1, 2, 3],
+        default=-1
+    )
+    
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=EDUCATION_QUARTILE_LABELS, ordered=True),
+        index=df.index
+    )
+
+
 def get_data_loader() -> DataLoader:
     """
     Factory function para obtener una instancia del cargador de datos.
@@ -273,3 +673,118 @@ def get_data_loader() -> DataLoader:
         Instancia de DataLoader
     """
     return DataLoader()
+
+
+def _normalize_filters(filters: dict) -> dict:
+    """Normaliza los valores de los filtros (listas ordenadas) para compararlos."""
+    return {
+        column: sorted(map(str, values)) if isinstance(values, list) else values
+        for column, values in filters.items()
+    }
+
+
+def filter_signature(filters: dict, version: str = None) -> str:
+    """
+    Calcula una firma estable de un diccionario de filtros.
+    Sirve como clave de caché: dos selecciones equivalentes producen la misma firma
+    independientemente del orden en que se eligieron los valores.
+    
+    Args:
+        filters: Diccionario con filtros {columna: valores}
+        version: Versión del dataset (ver DataLoader.get_dataset_version)
+        
+    Returns:
+        Firma hexadecimal de los filtros
+    """
+    payload = json.dumps([version, _normalize_filters(filters)], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def spain_filter_signature(filters: dict, version: str = None) -> str:
+    """
+    Calcula la firma de los filtros que afectan al subconjunto de España.
+    
+    La selección de países solo importa en cuanto a si España está incluida,
+    de modo que añadir o quitar otros países no invalida el análisis de España.
+    
+    Args:
+        filters: Diccionario con filtros {columna: valores}
+        version: Versión del dataset (ver DataLoader.get_dataset_version)
+        
+    Returns:
+        Firma hexadecimal de los filtros relevantes para España
+    """
+    spain_filters = dict(filters)
+    countries = spain_filters.get('country_name')
+    
+    if countries:
+        spain_filters['country_name'] = ISO2_TO_NAME['ES'] in countries
+    
+    return filter_signature(spain_filters, version)
+
+
+class FrameCache:
+    """
+    Caché LRU de DataFrames filtrados compartida por todas las sesiones e
+    indexada por firma de filtros. Las sesiones solo guardan la firma: con los
+    mismos filtros usan el mismo DataFrame en lugar de una copia cada una.
+    """
+    
+    def __init__(self, max_entries: int = FRAME_CACHE_ENTRIES):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_entries: Número máximo de DataFrames filtrados en memoria
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.ledger = MEMORY_BUDGET.register('filtered_frames', self.evict)
+    
+    def get(self, signature: str, loader: DataLoader, df: pd.DataFrame, filters: dict) -> tuple:
+        """
+        Devuelve los datos filtrados de una firma, filtrándolos si no están en caché.
+        
+        Args:
+            signature: Firma de los filtros (ver filter_signature)
+            loader: Cargador que aplica los filtros
+            df: Dataset limpio
+            filters: Diccionario con filtros {columna: valores}
+            
+        Returns:
+            Tupla (DataFrame filtrado, True si ya estaba en caché)
+        """
+        with self._lock:
+            df_filtered = self._entries.get(signature)
+            if df_filtered is not None:
+                self._entries.move_to_end(signature)
+        
+        if df_filtered is not None:
+            self.ledger.touch(signature)
+            return df_filtered, True
+        
+        start = time.perf_counter()
+        # Las sesiones que piden a la vez los mismos filtros comparten un único filtrado
+        df_filtered = get_flight('filters').do(signature, loader.get_filtered_data, df, filters)
+        cost = time.perf_counter() - start
+        # Sin filtros es una vista del dataset, que ya está contabilizado
+        nbytes = 0 if shares_memory(df_filtered, df) else estimate_size(df_filtered)
+        
+        with self._lock:
+            self._entries[signature] = df_filtered
+            self.ledger.add(signature, nbytes, cost)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self.ledger.discard(evicted)
+        
+        MEMORY_BUDGET.enforce()
+        return df_filtered, False
+    
+    def evict(self, signature: str):
+        """Retira de la caché los datos filtrados de una firma."""
+        with self._lock:
+            self._entries.pop(signature, None)
+
+
+FRAME_CACHE = FrameCache()
@@ -0,0 +1,159 @@
+"""
+Backend de consultas con DuckDB embebido (ver backends.py).
+Aplica los filtros del sidebar y las agregaciones por grupo como SQL sobre la
+instantánea Parquet del dataset limpio que genera 'python run.py build'. DuckDB
+lee solo las columnas y los grupos de filas que necesita cada consulta, y a
+Python solo vuelven tablas de resultados pequeñas (una fila por grupo) o, si se
+piden, las filas filtradas.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from backends import QueryBackend
+
+
+def _identifier(name: str) -> str:
+    """Nombre de columna entre comillas dobles."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _value(value):
+    """Convierte escalares de NumPy en tipos de Python para los parámetros."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class DuckDBBackend(QueryBackend):
+    """
+    Consultas SQL sobre la instantánea Parquet de una versión del dataset.
+    Las columnas se validan contra el esquema del dataset y los valores de los
+    filtros se pasan como parámetros.
+    """
+    
+    def __init__(self, snapshot: Path, version: str, dtypes: pd.Series):
+        """
+        Abre una conexión en memoria con la vista 'ess' sobre la instantánea.
+        
+        Args:
+            snapshot: Ruta del archivo Parquet (ver ArtifactStore.snapshot_path)
+            version: Versión del dataset de la instantánea
+            dtypes: Tipos de las columnas del DataFrame limpio (para devolver
+                los resultados con los mismos tipos que pandas)
+        """
+        super().__init__(version, dtypes)
+        self.snapshot = Path(snapshot)
+        self._con = duckdb.connect(database=':memory:')
+        path = str(self.snapshot).replace("'", "''")
+        self._con.execute(f"CREATE VIEW ess AS SELECT * FROM read_parquet('{path}')")
+    
+    def _column(self, name: str) -> str:
+        """Identificador SQL de una columna del dataset."""
+        if name not in self.dtypes.index:
+            raise ValueError(f"Columna desconocida: {name}")
+        return _identifier(name)
+    
+    def _where(self, filters: dict, spain: bool = False, not_null: list = ()) -> tuple:
+        """
+        Cláusula WHERE de los filtros, con el mismo criterio que get_filtered_data
+        (sin valores no se filtra; columnas desconocidas se ignoran).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            spain: Si True, solo filas de España
+            not_null: Columnas que no pueden ser nulas (claves de agrupación)
+            
+        Returns:
+            Tupla (cláusula SQL, parámetros)
+        """
+        clauses, params = [], []
+        
+        for column, values in filters.items():
+            if column not in self.dtypes.index or not values:
+                continue
+            values = values if isinstance(values, list) else [values]
+            clauses.append(f"{self._column(column)} IN ({', '.join('?' * len(values))})")
+            params.extend(_value(v) for v in values)
+        
+        if spain:
+            clauses.append("cntry = 'ES'")
+        clauses.extend(f"{self._column(column)} IS NOT NULL" for column in not_null)
+        
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def _query(self, sql: str, params: list) -> pd.DataFrame:
+        """Ejecuta una consulta en un cursor propio (uno por hilo) y devuelve un DataFrame."""
+        return self._con.cursor().execute(sql, params).df()
+    
+    def filtered_data(self, filters: dict, columns: list = None) -> pd.DataFrame:
+        """
+        Filtra el dataset en SQL y devuelve las filas con el orden y el índice
+        del DataFrame limpio.
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            columns: Columnas a devolver (por defecto todas)
+            
+        Returns:
+            DataFrame filtrado
+        """
+        select = ", ".join(self._column(c) for c in (columns or self.dtypes.index))
+        where, params = self._where(filters)
+        df = self._query(f"SELECT row_id, {select} FROM ess{where} ORDER BY row_id", params)
+        return self._restore_dtypes(df.set_index('row_id').rename_axis(None))
+    
+    def group_means(self, filters: dict, variable: str, by, spain: bool = False) -> pd.DataFrame:
+        """
+        Media y observaciones válidas de una variable por grupo (equivale a
+        df.groupby(by)[variable].agg(['mean', 'count']).reset_index()).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            variable: Variable dependiente
+            by: Columna o lista de columnas de agrupación
+            spain: Si True, solo filas de España
+            
+        Returns:
+            DataFrame con las columnas de agrupación, mean y count, ordenado por grupo
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        group = ", ".join(self._column(k) for k in keys)
+        value = self._column(variable)
+        where, params = self._where(filters, spain, keys)
+        df = self._query(
+            f"SELECT {group}, avg({value}) AS mean, count({value}) AS count "
+            f"FROM ess{where} GROUP BY {group}",
+            params
+        )
+        return self._restore_dtypes(df).sort_values(keys, ignore_index=True)
+    
+    def group_statistics(self, filters: dict, variable: str, group_by: str,
+                         spain: bool = False) -> pd.DataFrame:
+        """
+        Estadísticas por grupo (mismas columnas que calculate_group_statistics).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            variable: Variable dependiente
+            group_by: Variable de agrupación
+            spain: Si True, solo filas de España
+            
+        Returns:
+            DataFrame con count, mean, median, std, min y max por grupo
+        """
+        group = self._column(group_by)
+        value = self._column(variable)
+        where, params = self._where(filters, spain, [group_by])
+        df = self._query(
+            f"SELECT {group}, count({value}) AS count, avg({value}) AS mean, "
+            f"median({value}) AS median, stddev_samp({value}) AS std, "
+            f"min({value}) AS min, max({value}) AS max "
+            f"FROM ess{where} GROUP BY {group}",
+            params
+        )
+        return self._restore_dtypes(df).sort_values(group_by, ignore_index=True)
@@ -0,0 +1,190 @@
+"""
+Generación de descargas del panel.
+Serializa el DataFrame filtrado por bloques en el formato elegido (CSV, CSV
+comprimido o Parquet) y guarda el resultado en una caché por firma de filtros.
+"""
+
+import gzip
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+from config import EXPORT_CHUNK_ROWS, EXPORT_CACHE_ENTRIES
+from memory import MEMORY_BUDGET
+
+
+# ============================================================================
+# FORMATOS DE EXPORTACIÓN
+# ============================================================================
+
+# {formato: (etiqueta, extensión, tipo MIME)}
+EXPORT_FORMATS = {
+    'csv': ('CSV', '.csv', 'text/csv'),
+    'csv.gz': ('CSV (gzip)', '.csv.gz', 'application/gzip'),
+    'csv.zst': ('CSV (zstd)', '.csv.zst', 'application/zstd'),
+    'parquet': ('Parquet', '.parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def get_available_formats() -> list:
+    """
+    Devuelve los formatos de exportación disponibles en el entorno.
+    
+    Returns:
+        Lista de claves de EXPORT_FORMATS cuyas dependencias están instaladas
+    """
+    formats = ['csv', 'csv.gz']
+    
+    if zstandard is not None:
+        formats.append('csv.zst')
+    if pyarrow is not None:
+        formats.append('parquet')
+    
+    return formats
+
+
+def _iter_chunks(df: pd.DataFrame, chunk_rows: int):
+    """Recorre el DataFrame en bloques de chunk_rows filas."""
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def _write_csv(df: pd.DataFrame, stream, chunk_rows: int):
+    """Escribe el DataFrame como CSV UTF-8 en un flujo binario, bloque a bloque."""
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='', write_through=True)
+    
+    for start, chunk in _iter_chunks(df, chunk_rows):
+        chunk.to_csv(text, index=False, header=start == 0)
+    
+    text.detach()
+
+
+def _write_parquet(df: pd.DataFrame, stream, chunk_rows: int):
+    """Escribe el DataFrame como Parquet en un flujo binario, un row group por bloque."""
+    schema = pyarrow.Schema.from_pandas(df, preserve_index=False)
+    
+    with pq.ParquetWriter(stream, schema, compression='snappy') as writer:
+        for _, chunk in _iter_chunks(df, chunk_rows):
+            writer.write_table(
+                pyarrow.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            )
+
+
+def serialize_dataframe(df: pd.DataFrame, fmt: str = 'csv',
+                        chunk_rows: int = EXPORT_CHUNK_ROWS) -> bytes:
+    """
+    Serializa un DataFrame en el formato indicado procesándolo por bloques,
+    sin materializar el CSV completo como cadena intermedia.
+    
+    Args:
+        df: DataFrame a exportar
+        fmt: Formato de EXPORT_FORMATS ('csv', 'csv.gz', 'csv.zst', 'parquet')
+        chunk_rows: Filas por bloque
+        
+    Returns:
+        Contenido del archivo en bytes
+    """
+    if fmt not in get_available_formats():
+        raise ValueError(f"Formato de exportación no disponible: {fmt}")
+    
+    buffer = io.BytesIO()
+    
+    if fmt == 'csv':
+        _write_csv(df, buffer, chunk_rows)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6, mtime=0) as stream:
+            _write_csv(df, stream, chunk_rows)
+    elif fmt == 'csv.zst':
+        with zstandard.ZstdCompressor(level=3).stream_writer(buffer, closefd=False) as stream:
+            _write_csv(df, stream, chunk_rows)
+    elif fmt == 'parquet':
+        _write_parquet(df, buffer, chunk_rows)
+    
+    return buffer.getvalue()
+
+
+# ============================================================================
+# CACHÉ DE DESCARGAS
+# ============================================================================
+
+class DownloadCache:
+    """
+    Caché LRU de archivos de descarga indexada por (firma de filtros, formato).
+    Cada archivo se genera una sola vez aunque varias sesiones lo pidan a la vez.
+    """
+    
+    def __init__(self, max_entries: int = EXPORT_CACHE_ENTRIES):
+        """
+        Inicializa la caché.
+        
+        Args:
+            max_entries: Número máximo de archivos en memoria
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.ledger = MEMORY_BUDGET.register('download_cache', self.evict)
+    
+    def get(self, signature: str, fmt: str, df: pd.DataFrame) -> bytes:
+        """
+        Devuelve el archivo de descarga, generándolo si no está en caché.
+        
+        Args:
+            signature: Firma de los filtros aplicados a df
+            fmt: Formato de exportación
+            df: DataFrame filtrado
+            
+        Returns:
+            Contenido del archivo en bytes
+        """
+        key = (signature, fmt)
+        
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.ledger.touch(key)
+                return self._entries[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    return self._entries[key]
+            
+            start = time.perf_counter()
+            data = serialize_dataframe(df, fmt)
+            cost = time.perf_counter() - start
+            
+            with self._lock:
+                self._entries[key] = data
+                self._key_locks.pop(key, None)
+                self.ledger.add(key, len(data), cost)
+                while len(self._entries) > self.max_entries:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self.ledger.discard(evicted)
+        
+        MEMORY_BUDGET.enforce()
+        return data
+    
+    def evict(self, key: tuple):
+        """Retira un archivo de la caché."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+DOWNLOAD_CACHE = DownloadCache()
@@ -0,0 +1,358 @@
+"""
+Contabilidad de memoria del proceso y presupuesto global.
+Cada caché derivada (pestañas, DataFrames filtrados, descargas, motor de
+análisis) lleva un registro (CacheLedger) con el tamaño estimado y el coste de
+cálculo de cada entrada; el dataset cargado y el estado de cada sesión se
+contabilizan aparte y no se descartan.
+
+Cuando el total supera MEMORY_BUDGET_MB se descartan entradas de las cachés
+derivadas con la política GreedyDual-Size: la prioridad de una entrada es el
+reloj de la caché más su coste de cálculo por MB, y el reloj avanza hasta la
+prioridad de cada entrada descartada. Salen antes las entradas grandes y
+baratas de recalcular, y las que llevan tiempo sin usarse.
+"""
+
+import inspect
+import sys
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from config import MEMORY_BUDGET_MB
+
+
+# Filas de la muestra con la que se estima el tamaño de las columnas de texto
+SIZE_SAMPLE_ROWS = 10000
+
+
+# ============================================================================
+# ESTIMACIÓN DE TAMAÑOS
+# ============================================================================
+
+def _frame_size(df) -> int:
+    """
+    Tamaño de un DataFrame o Serie. Las columnas de objetos de frames grandes
+    se estiman con una muestra de filas (memory_usage(deep=True) las recorre).
+    """
+    frame = df.to_frame() if isinstance(df, pd.Series) else df
+    size = int(frame.memory_usage(index=True, deep=False).sum())
+
+    text_columns = [
+        column for column, dtype in frame.dtypes.items()
+        if dtype.kind == 'O' and not isinstance(dtype, pd.CategoricalDtype)
+    ]
+    if not text_columns:
+        return size
+
+    sample = frame[text_columns]
+    if len(sample) > SIZE_SAMPLE_ROWS:
+        sample = sample.iloc[::len(sample) // SIZE_SAMPLE_ROWS]
+    extra = (sample.memory_usage(index=False, deep=True).sum()
+             - sample.memory_usage(index=False, deep=False).sum())
+    return size + int(extra * len(frame) / max(len(sample), 1))
+
+
+def estimate_size(obj, _seen: set = None) -> int:
+    """
+    Estima los bytes que ocupa un objeto y lo que cuelga de él.
+
+    Cubre DataFrames, Series, arrays de NumPy, figuras de Plotly y
+    contenedores estándar; el resto de objetos cuenta sys.getsizeof. Cada
+    objeto se cuenta una sola vez aunque aparezca varias veces.
+
+    Args:
+        obj: Objeto a medir
+
+    Returns:
+        Tamaño estimado en bytes
+    """
+    seen = set() if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return _frame_size(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key, seen) + estimate_size(value, seen) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_size(item, seen) for item in obj)
+    if hasattr(obj, '_data') and hasattr(obj, '_layout'):
+        # Figura de Plotly: trazas y layout
+        return estimate_size([obj._data, obj._layout], seen)
+    return sys.getsizeof(obj)
+
+
+def shares_memory(df: pd.DataFrame, base: pd.DataFrame) -> bool:
+    """
+    Indica si df es una vista de base (sin copia de los datos), comprobando la
+    primera columna numérica común.
+
+    Args:
+        df: DataFrame a comprobar (p. ej. los datos filtrados sin filtros)
+        base: DataFrame original
+
+    Returns:
+        True si comparten los datos
+    """
+    if df is base:
+        return True
+    for column, dtype in df.dtypes.items():
+        if dtype.kind in 'iufb' and column in base.columns:
+            return np.shares_memory(df[column].to_numpy(), base[column].to_numpy())
+    return False
+
+
+# ============================================================================
+# PRESUPUESTO DE MEMORIA
+# ============================================================================
+
+class CacheLedger:
+    """
+    Registro de memoria de una caché: tamaño, coste y prioridad de cada entrada.
+    Lo crea MemoryBudget.register; la caché informa de las entradas que añade
+    (add), usa (touch) y retira (discard).
+    """
+
+    def __init__(self, budget: 'MemoryBudget', name: str, evict):
+        """
+        Inicializa el registro.
+
+        Args:
+            budget: Presupuesto al que pertenece
+            name: Nombre de la caché (p. ej. 'tab_cache')
+            evict: Función que retira una clave de la caché; si es un método,
+                se guarda una referencia débil para no mantener viva la caché
+        """
+        self.budget = budget
+        self.name = name
+        self.evictions = 0
+        self._entries = {}
+        self._evict = weakref.WeakMethod(evict) if inspect.ismethod(evict) else (lambda: evict)
+
+    @property
+    def alive(self) -> bool:
+        """False si la caché a la que pertenece ya no existe."""
+        return self._evict() is not None
+
+    def add(self, key, nbytes: int, cost: float):
+        """
+        Registra una entrada nueva (o sustituye la anterior de la misma clave).
+
+        Args:
+            key: Clave de la entrada en la caché
+            nbytes: Tamaño estimado (ver estimate_size)
+            cost: Segundos que costó calcularla
+        """
+        with self.budget._lock:
+            self._entries[key] = [nbytes, cost, self.budget._priority(nbytes, cost)]
+
+    def touch(self, key):
+        """Renueva la prioridad de una entrada tras un acierto."""
+        with self.budget._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = self.budget._priority(entry[0], entry[1])
+
+    def discard(self, key):
+        """Retira una entrada (descartada por la propia caché)."""
+        with self.budget._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Retira todas las entradas."""
+        with self.budget._lock:
+            self._entries.clear()
+
+    def nbytes(self) -> int:
+        """Bytes contabilizados en la caché."""
+        with self.budget._lock:
+            return sum(entry[0] for entry in self._entries.values())
+
+
+class MemoryBudget:
+    """
+    Memoria contabilizada del proceso (dataset, cachés derivadas y sesiones) y
+    presupuesto global con descarte por coste de las cachés derivadas.
+    """
+
+    def __init__(self, limit_bytes: int):
+        """
+        Inicializa el presupuesto.
+
+        Args:
+            limit_bytes: Presupuesto en bytes (0 sin límite)
+        """
+        self.limit_bytes = limit_bytes
+        self.over_budget = False
+        self._ledgers = []
+        self._base = {}
+        self._sessions = {}
+        self._clock = 0.0
+        self._lock = threading.Lock()
+        self._enforce_lock = threading.Lock()
+
+    def _priority(self, nbytes: int, cost: float) -> float:
+        """Prioridad GreedyDual-Size de una entrada (llamar con _lock)."""
+        return self._clock + cost / max(nbytes / 2**20, 1e-3)
+
+    def register(self, name: str, evict) -> CacheLedger:
+        """
+        Registra una caché derivada.
+
+        Args:
+            name: Nombre de la caché en el panel y en las métricas
+            evict: Función (clave) que retira una entrada de la caché
+
+        Returns:
+            Registro de la caché
+        """
+        ledger = CacheLedger(self, name, evict)
+        with self._lock:
+            self._ledgers = [l for l in self._ledgers if l.alive] + [ledger]
+        return ledger
+
+    def set_base(self, key, nbytes: int):
+        """
+        Contabiliza memoria que no se puede descartar (p. ej. el dataset).
+
+        Args:
+            key: Tupla (nombre, identificador) de la memoria
+            nbytes: Bytes (0 para retirarla)
+        """
+        with self._lock:
+            if nbytes:
+                self._base[key] = nbytes
+            else:
+                self._base.pop(key, None)
+
+    def set_session(self, session_id: str, nbytes: int, frame_key: str = None):
+        """
+        Contabiliza el estado de una sesión.
+
+        Args:
+            session_id: Identificador de la sesión
+            nbytes: Bytes del estado propio de la sesión
+            frame_key: Firma de los datos filtrados compartidos que usa
+        """
+        with self._lock:
+            self._sessions[session_id] = (nbytes, frame_key)
+
+    def session_ids(self) -> list:
+        """Identificadores de las sesiones contabilizadas."""
+        with self._lock:
+            return list(self._sessions)
+
+    def prune_sessions(self, active: set):
+        """Olvida las sesiones que ya no están activas."""
+        with self._lock:
+            for session_id in set(self._sessions) - set(active):
+                del self._sessions[session_id]
+
+    def session_usage(self, session_id: str) -> dict:
+        """
+        Memoria atribuida a una sesión.
+
+        Args:
+            session_id: Identificador de la sesión
+
+        Returns:
+            Diccionario {'state_bytes', 'frame_key', 'frame_sharers'} o None
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                return None
+            nbytes, frame_key = self._sessions[session_id]
+            sharers = sum(1 for _, key in self._sessions.values() if key == frame_key)
+        return {'state_bytes': nbytes, 'frame_key': frame_key, 'frame_sharers': sharers}
+
+    def _total_locked(self) -> int:
+        """Bytes contabilizados en todo el proceso (llamar con _lock)."""
+        return (sum(self._base.values())
+                + sum(nbytes for nbytes, _ in self._sessions.values())
+                + sum(entry[0] for l in self._ledgers for entry in l._entries.values()))
+
+    def total_bytes(self) -> int:
+        """Bytes contabilizados en todo el proceso."""
+        with self._lock:
+            return self._total_locked()
+
+    def enforce(self) -> int:
+        """
+        Descarta entradas de las cachés derivadas, de menor a mayor prioridad,
+        hasta volver al presupuesto. Si otro hilo ya lo está haciendo, no hace nada.
+
+        Returns:
+            Número de entradas descartadas
+        """
+        if not self.limit_bytes or not self._enforce_lock.acquire(blocking=False):
+            return 0
+
+        evicted = 0
+        try:
+            while True:
+                with self._lock:
+                    excess = self._total_locked() - self.limit_bytes
+                    candidates = [
+                        (entry[2], ledger, key, entry)
+                        for ledger in self._ledgers if ledger.alive
+                        for key, entry in ledger._entries.items() if entry[0] > 0
+                    ] if excess > 0 else []
+                    self.over_budget = excess > 0
+                    if not candidates:
+                        return evicted
+                    priority, ledger, key, entry = min(candidates, key=lambda c: c[0])
+                    self._clock = max(self._clock, priority)
+
+                evict = ledger._evict()
+                if evict is not None:
+                    evict(key)
+                with self._lock:
+                    # La caché pudo no tener ya la clave: la entrada sale igualmente
+                    if ledger._entries.get(key) is entry:
+                        del ledger._entries[key]
+                ledger.evictions += 1
+                evicted += 1
+        finally:
+            self._enforce_lock.release()
+
+    def stats(self) -> dict:
+        """
+        Resumen de la memoria contabilizada.
+
+        Returns:
+            Diccionario con el presupuesto, el total, la memoria fija por nombre,
+            las sesiones y, por caché, entradas, bytes y descartes
+        """
+        with self._lock:
+            base = {}
+            for (name, _), nbytes in self._base.items():
+                base[name] = base.get(name, 0) + nbytes
+            caches = {}
+            for ledger in self._ledgers:
+                if not ledger.alive:
+                    continue
+                cache = caches.setdefault(ledger.name, {'entries': 0, 'bytes': 0, 'evictions': 0})
+                cache['entries'] += len(ledger._entries)
+                cache['bytes'] += sum(entry[0] for entry in ledger._entries.values())
+                cache['evictions'] += ledger.evictions
+            return {
+                'budget_bytes': self.limit_bytes,
+                'total_bytes': self._total_locked(),
+                'over_budget': self.over_budget,
+                'base': base,
+                'sessions': {
+                    'count': len(self._sessions),
+                    'bytes': sum(nbytes for nbytes, _ in self._sessions.values())
+                },
+                'caches': caches
+            }
+
+
+MEMORY_BUDGET = MemoryBudget(MEMORY_BUDGET_MB * 2**20)
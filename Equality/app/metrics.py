@@ -0,0 +1,500 @@
+"""
+Métricas del proceso en formato de texto de Prometheus.
+Un registro mínimo de contadores, gauges e histogramas (sin dependencias) que
+se alimenta de los mismos puntos de instrumentación que el panel de
+rendimiento (profiling.py): carga de datos, filtrado, funciones de análisis y
+de figuras, secciones del script y capas de caché. Al exportar se añaden las
+métricas del proceso (RSS y CPU), las sesiones activas y los contadores de
+single-flight y cancelación.
+
+Las métricas se exponen en un endpoint HTTP local (/metrics) y/o se escriben
+periódicamente en un archivo .prom para el textfile collector de node_exporter.
+Se activan con ESS11_METRICS=1 (ver config.py); sin activarlas no hay coste.
+"""
+
+import math
+import os
+import resource
+import threading
+import time
+import warnings
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from cancellation import get_cancellation_stats
+from config import METRICS_HOST, METRICS_PORT, METRICS_FILE, METRICS_FILE_INTERVAL
+from memory import MEMORY_BUDGET
+from profiling import add_observer
+from singleflight import get_flight_stats
+
+
+# Límites (s) de los histogramas de tiempo, como los de los clientes de Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value: str) -> str:
+    """Escapa el valor de una etiqueta."""
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value: float) -> str:
+    """Formatea un valor numérico (incluidos +Inf y NaN)."""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = '') -> str:
+    """Formatea el bloque {etiqueta="valor",...} de una serie."""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """
+    Métrica con nombre, ayuda, tipo y series indexadas por valores de etiquetas.
+    """
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labels: tuple = ()):
+        """
+        Inicializa la métrica.
+        
+        Args:
+            name: Nombre de la métrica (p. ej. 'ess11_cache_requests_total')
+            documentation: Texto de ayuda (# HELP)
+            labels: Nombres de las etiquetas
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._series = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: dict) -> tuple:
+        """Valores de las etiquetas en el orden de self.labels."""
+        return tuple(str(labels[name]) for name in self.labels)
+    
+    def samples(self) -> list:
+        """
+        Devuelve las líneas de muestra de la métrica.
+        
+        Returns:
+            Lista de líneas 'nombre{etiquetas} valor'
+        """
+        with self._lock:
+            series = dict(self._series)
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+                for key, value in sorted(series.items())]
+    
+    def render(self) -> str:
+        """Devuelve la métrica en formato de texto de Prometheus."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    """Contador monótono."""
+    
+    kind = 'counter'
+    
+    def inc(self, amount: float = 1.0, **labels):
+        """Incrementa la serie de las etiquetas indicadas."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Valor que sube y baja."""
+    
+    kind = 'gauge'
+    
+    def set(self, value: float, **labels):
+        """Fija el valor de la serie de las etiquetas indicadas."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = float(value)
+
+
+class Histogram(Metric):
+    """Histograma acumulado con límites fijos, suma y número de observaciones."""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labels: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        """
+        Inicializa el histograma.
+        
+        Args:
+            name: Nombre de la métrica (p. ej. 'ess11_compute_seconds')
+            documentation: Texto de ayuda (# HELP)
+            labels: Nombres de las etiquetas
+            buckets: Límites superiores de los intervalos (sin +Inf)
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+    
+    def observe(self, value: float, **labels):
+        """Añade una observación a la serie de las etiquetas indicadas."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['buckets'][i] += 1
+                    break
+            series['sum'] += value
+            series['count'] += 1
+    
+    def samples(self) -> list:
+        """Líneas _bucket (acumuladas), _sum y _count de cada serie."""
+        with self._lock:
+            series = {key: {'buckets': list(s['buckets']), 'sum': s['sum'], 'count': s['count']}
+                      for key, s in self._series.items()}
+        
+        lines = []
+        for key, s in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, s['buckets']):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(s['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {s['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Conjunto de métricas del proceso y funciones que actualizan gauges justo
+    antes de exportar (collectors).
+    """
+    
+    def __init__(self):
+        """Inicializa un registro vacío."""
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+    
+    def _register(self, metric: Metric) -> Metric:
+        """Registra una métrica (o devuelve la ya registrada con ese nombre)."""
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labels: tuple = ()) -> Counter:
+        """Crea (o devuelve) un contador."""
+        return self._register(Counter(name, documentation, labels))
+    
+    def gauge(self, name: str, documentation: str, labels: tuple = ()) -> Gauge:
+        """Crea (o devuelve) un gauge."""
+        return self._register(Gauge(name, documentation, labels))
+    
+    def histogram(self, name: str, documentation: str, labels: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """Crea (o devuelve) un histograma."""
+        return self._register(Histogram(name, documentation, labels, buckets))
+    
+    def add_collector(self, collector):
+        """
+        Añade una función sin argumentos que se ejecuta antes de cada exportación.
+        
+        Args:
+            collector: Función que actualiza gauges o contadores del registro
+        """
+        with self._lock:
+            self._collectors.append(collector)
+    
+    def render(self) -> str:
+        """
+        Ejecuta los collectors y devuelve todas las métricas en formato de texto.
+        
+        Returns:
+            Texto de exposición de Prometheus (versión 0.0.4)
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = list(self._metrics.values())
+        
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                # Un collector que falla no debe impedir exportar el resto
+                pass
+        
+        return '\n'.join(metric.render() for metric in metrics) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ============================================================================
+# MÉTRICAS DE LA APLICACIÓN
+# ============================================================================
+
+class AppMetrics:
+    """
+    Observador de profiling.py que traduce sus eventos a métricas del registro.
+    
+    Las funciones se etiquetan con layer (módulo: data_loader, analytics,
+    visualizations) y function; la carga de datos es data_loader/load y el
+    filtrado data_loader/DataLoader.get_filtered_data.
+    """
+    
+    def __init__(self, registry: MetricsRegistry = REGISTRY):
+        """
+        Crea las métricas en el registro.
+        
+        Args:
+            registry: Registro donde crear las métricas
+        """
+        self.compute_seconds = registry.histogram(
+            'ess11_compute_seconds', 'Tiempo de cada llamada por capa y función', ('layer', 'function')
+        )
+        self.rows = registry.counter(
+            'ess11_rows_processed_total', 'Filas de entrada procesadas por capa y función', ('layer', 'function')
+        )
+        self.section_seconds = registry.histogram(
+            'ess11_section_seconds', 'Tiempo de cada sección del script', ('section',)
+        )
+        self.cache_requests = registry.counter(
+            'ess11_cache_requests_total', 'Consultas a cada capa de caché por resultado', ('layer', 'result')
+        )
+        self.cache_hit_ratio = registry.gauge(
+            'ess11_cache_hit_ratio', 'Proporción de aciertos acumulada de cada capa de caché', ('layer',)
+        )
+        self.dataset_rows = registry.gauge('ess11_dataset_rows', 'Filas del dataset cargado')
+        self.dataset_bytes = registry.gauge('ess11_dataset_bytes', 'Bytes en memoria del dataset cargado')
+        self.data_loads = registry.counter('ess11_data_loads_total', 'Cargas del dataset')
+        self._cache_counts = {}
+        self._lock = threading.Lock()
+    
+    def add_call(self, name: str, seconds: float, rows: int):
+        """Registra una llamada instrumentada."""
+        layer, _, function = name.partition('.')
+        self.compute_seconds.observe(seconds, layer=layer, function=function)
+        if rows:
+            self.rows.inc(rows, layer=layer, function=function)
+    
+    def add_section(self, name: str, seconds: float):
+        """Registra el tiempo de una sección del script."""
+        self.section_seconds.observe(seconds, section=name)
+    
+    def add_cache(self, layer: str, hit: bool):
+        """Registra un acierto o fallo de caché y actualiza la proporción de aciertos."""
+        self.cache_requests.inc(layer=layer, result='hit' if hit else 'miss')
+        with self._lock:
+            hits, total = self._cache_counts.get(layer, (0, 0))
+            hits, total = hits + hit, total + 1
+            self._cache_counts[layer] = (hits, total)
+        self.cache_hit_ratio.set(hits / total, layer=layer)
+    
+    def set_dataset(self, rows: int, nbytes: int):
+        """Registra el tamaño del dataset recién cargado."""
+        self.data_loads.inc()
+        self.dataset_rows.set(rows)
+        self.dataset_bytes.set(nbytes)
+
+
+def _current_rss_bytes() -> int:
+    """RSS actual del proceso (Linux; pico de RSS en otros sistemas)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _register_process_collectors(registry: MetricsRegistry, active_sessions=None):
+    """Métricas del proceso, sesiones activas, single-flight y cancelación."""
+    rss = registry.gauge('process_resident_memory_bytes', 'Memoria residente del proceso')
+    cpu = registry.gauge('process_cpu_seconds_total', 'CPU de usuario y sistema del proceso')
+    sessions = registry.gauge('ess11_active_sessions', 'Sesiones de Streamlit activas')
+    flights = registry.gauge(
+        'ess11_singleflight_total', 'Contadores de los grupos single-flight', ('group', 'counter')
+    )
+    cancelled = registry.gauge('ess11_cancelled_computations_total', 'Cálculos cancelados')
+    
+    def collect():
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        rss.set(_current_rss_bytes())
+        cpu.set(usage.ru_utime + usage.ru_stime)
+        if active_sessions is not None:
+            count = active_sessions()
+            if count is not None:
+                sessions.set(count)
+        for group, stats in get_flight_stats().items():
+            for counter in ('calls', 'executions', 'coalesced', 'errors'):
+                flights.set(stats[counter], group=group, counter=counter)
+        cancelled.set(get_cancellation_stats()['cancelled'])
+    
+    registry.add_collector(collect)
+
+
+def _register_memory_collectors(registry: MetricsRegistry):
+    """Memoria contabilizada por componente, presupuesto y descartes (memory.py)."""
+    budget = registry.gauge('ess11_memory_budget_bytes', 'Presupuesto de memoria (0: sin límite)')
+    accounted = registry.gauge(
+        'ess11_memory_accounted_bytes', 'Memoria contabilizada por componente', ('component',)
+    )
+    entries = registry.gauge('ess11_cache_entries', 'Entradas de cada caché derivada', ('cache',))
+    evictions = registry.gauge(
+        'ess11_cache_evictions_total', 'Entradas descartadas por el presupuesto de memoria', ('cache',)
+    )
+    sessions_bytes = registry.gauge('ess11_session_state_bytes', 'Estado propio de las sesiones contabilizadas')
+    
+    def collect():
+        stats = MEMORY_BUDGET.stats()
+        budget.set(stats['budget_bytes'])
+        for name, nbytes in stats['base'].items():
+            accounted.set(nbytes, component=name)
+        accounted.set(stats['sessions']['bytes'], component='sessions')
+        sessions_bytes.set(stats['sessions']['bytes'])
+        for name, cache in stats['caches'].items():
+            accounted.set(cache['bytes'], component=name)
+            entries.set(cache['entries'], cache=name)
+            evictions.set(cache['evictions'], cache=name)
+    
+    registry.add_collector(collect)
+
+
+# ============================================================================
+# EXPORTACIÓN
+# ============================================================================
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Manejador HTTP del endpoint /metrics."""
+    
+    registry = REGISTRY
+    
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_exporter(host: str, port: int, registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Sirve las métricas en http://host:port/metrics desde un hilo en segundo plano.
+    
+    Args:
+        host: Dirección de escucha
+        port: Puerto de escucha (0 para uno libre)
+        registry: Registro a exportar
+        
+    Returns:
+        Servidor en marcha
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    return server
+
+
+def write_metrics_file(path: Path, registry: MetricsRegistry = REGISTRY):
+    """
+    Escribe las métricas en un archivo de forma atómica (textfile collector).
+    
+    Args:
+        path: Ruta del archivo (.prom)
+        registry: Registro a exportar
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(registry.render(), encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def start_file_exporter(path: Path, interval: float, registry: MetricsRegistry = REGISTRY) -> threading.Thread:
+    """
+    Reescribe el archivo de métricas cada interval segundos desde un hilo en segundo plano.
+    
+    Args:
+        path: Ruta del archivo (.prom)
+        interval: Segundos entre escrituras
+        registry: Registro a exportar
+        
+    Returns:
+        Hilo del exportador
+    """
+    def loop():
+        while True:
+            try:
+                write_metrics_file(path, registry)
+            except OSError:
+                pass
+            time.sleep(interval)
+    
+    thread = threading.Thread(target=loop, name='metrics-file', daemon=True)
+    thread.start()
+    return thread
+
+
+_enabled_lock = threading.Lock()
+_enabled = False
+
+
+def enable_metrics(host: str = None, port: int = None, file_path: Path = None,
+                   interval: float = None, active_sessions=None) -> bool:
+    """
+    Activa las métricas del proceso (una sola vez): conecta el observador a
+    profiling.py y arranca los exportadores configurados.
+    
+    Args:
+        host: Dirección del endpoint (por defecto METRICS_HOST)
+        port: Puerto del endpoint (por defecto METRICS_PORT; 0 o None sin endpoint)
+        file_path: Archivo .prom (por defecto METRICS_FILE; None sin archivo)
+        interval: Segundos entre escrituras del archivo (por defecto METRICS_FILE_INTERVAL)
+        active_sessions: Función sin argumentos que devuelve las sesiones activas
+        
+    Returns:
+        True si se han activado en esta llamada, False si ya lo estaban
+    """
+    global _enabled
+    
+    with _enabled_lock:
+        if _enabled:
+            return False
+        _enabled = True
+    
+    add_observer(AppMetrics(REGISTRY))
+    _register_process_collectors(REGISTRY, active_sessions)
+    _register_memory_collectors(REGISTRY)
+    
+    port = METRICS_PORT if port is None else port
+    if port:
+        try:
+            start_http_exporter(host or METRICS_HOST, port)
+        except OSError as e:
+            # Con varios procesos en la misma máquina el puerto puede estar ocupado
+            warnings.warn(f"No se pudo abrir el endpoint de métricas en el puerto {port}: {e}", RuntimeWarning)
+    
+    file_path = file_path or METRICS_FILE
+    if file_path:
+        start_file_exporter(file_path, interval or METRICS_FILE_INTERVAL)
+    
+    return True
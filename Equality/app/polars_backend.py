@@ -0,0 +1,282 @@
+"""
+Backend de consultas con Polars (ver backends.py).
+Sin artefactos, la lectura del CSV y los pasos 1-8 de DataLoader.clean_data
+son un único plan lazy (clean_plan). Polars lo optimiza y lo ejecuta en
+paralelo. Con artefactos, el plan lee la instantánea Parquet ya limpia.
+
+El dataset limpio se materializa una vez en memoria. Los filtros y las
+agregaciones por grupo son planes lazy sobre él: Polars solo lee las columnas
+que usa cada consulta y la ejecuta con todos los hilos (POLARS_MAX_THREADS).
+A pandas solo vuelven los resultados y, una vez, el dataset limpio que usan
+los análisis por fila.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+from backends import QueryBackend
+from config import (
+    INVALID_VALUES, EDUCATION_SCALE, IDEOLOGY_SCALE, NATIONALISM_SCALE, PARTY_NAMES,
+    ISO2_TO_ISO3, ISO2_TO_NAME, AGE_BINS, AGE_LABELS,
+    EDUCATION_QUARTILE_LABELS, EDUCATION_QUARTILE_REFERENCE
+)
+
+
+# Filas del CSV con las que Polars deduce los tipos de las columnas
+CSV_SCHEMA_ROWS = 10000
+
+# Tipos de pandas de las columnas categóricas que crea clean_data
+CATEGORICAL_DTYPES = {
+    'age_group': pd.CategoricalDtype(AGE_LABELS, ordered=True),
+    'education_quartile': pd.CategoricalDtype(EDUCATION_QUARTILE_LABELS, ordered=True),
+}
+
+
+def _is_in(column: str, values: list, dtype) -> 'pl.Expr':
+    """Pertenencia a una lista de valores convertidos al tipo de la columna."""
+    return pl.col(column).is_in(pl.Series(values).cast(dtype, strict=False).implode())
+
+
+def _map(column: str, mapping: dict) -> 'pl.Expr':
+    """Equivale a Series.map(mapping): los valores sin correspondencia quedan nulos."""
+    return pl.col(column).replace_strict(mapping, default=None)
+
+
+def clean_plan(source: 'pl.LazyFrame', reference: str = EDUCATION_QUARTILE_REFERENCE) -> 'pl.LazyFrame':
+    """
+    Pasos 1-8 de DataLoader.clean_data como plan lazy, con los mismos
+    resultados. La columna row_id guarda la posición de cada fila en el CSV
+    (el índice del DataFrame limpio de pandas).
+    
+    Args:
+        source: Plan de lectura de los datos crudos (p. ej. pl.scan_csv)
+        reference: Población de referencia de los cuartiles educativos
+        
+    Returns:
+        Plan lazy del dataset limpio
+    """
+    schema = source.collect_schema()
+    plan = source.with_row_index('row_id').with_columns(pl.col('row_id').cast(pl.Int64))
+    
+    # 1. Eliminar valores inválidos de variables explicativas (los nulos se conservan)
+    for var, invalid_vals in INVALID_VALUES.items():
+        if var in schema:
+            plan = plan.filter(~_is_in(var, invalid_vals, schema[var]).fill_null(False))
+    
+    # 2-3. Invertir escalas de ipeqopta y polintr (más alto = más apoyo / interés)
+    inverted = []
+    if 'ipeqopta' in schema:
+        inverted.append((7 - pl.col('ipeqopta')).alias('ipeqopta'))
+    if 'polintr' in schema:
+        inverted.append((pl.col('polintr').max() + 1 - pl.col('polintr')).alias('polintr'))
+    if inverted:
+        plan = plan.with_columns(inverted)
+    
+    # 4. education_level (escala ordinal 0-26 desde ISCED; no mapeados: mediana)
+    if 'edulvlb' in schema:
+        plan = plan.with_columns(_map('edulvlb', EDUCATION_SCALE).alias('education_level'))
+        plan = plan.with_columns(pl.col('education_level').fill_null(pl.col('education_level').median()))
+        
+        # 4b. Cuartiles educativos (mismos umbrales que assign_education_quartiles)
+        education = pl.col('education_level')
+        q1, q2, q3 = (education.quantile(q, interpolation='linear') for q in (0.25, 0.50, 0.75))
+        if reference == 'country':
+            q1, q2, q3 = (q.over('cntry') for q in (q1, q2, q3))
+        plan = plan.with_columns(
+            pl.when(education <= q1).then(pl.lit(EDUCATION_QUARTILE_LABELS[0]))
+            .when(education <= q2).then(pl.lit(EDUCATION_QUARTILE_LABELS[1]))
+            .when(education <= q3).then(pl.lit(EDUCATION_QUARTILE_LABELS[2]))
+            .when(education > q3).then(pl.lit(EDUCATION_QUARTILE_LABELS[3]))
+            .cast(pl.Enum(EDUCATION_QUARTILE_LABELS))
+            .alias('education_quartile'),
+            (education >= q3).alias('education_upper')
+        )
+    
+    derived = []
+    
+    # 5. Tramos de edad (intervalos [inicio, fin) como pd.cut con right=False)
+    if 'agea' in schema:
+        age = pl.col('agea')
+        bins = list(zip(AGE_BINS, AGE_BINS[1:], AGE_LABELS))
+        start, end, label = bins[0]
+        age_group = pl.when((age >= start) & (age < end)).then(pl.lit(label))
+        for start, end, label in bins[1:]:
+            age_group = age_group.when((age >= start) & (age < end)).then(pl.lit(label))
+        derived.append(age_group.cast(pl.Enum(AGE_LABELS)).alias('age_group'))
+    
+    # 6. Variables derivadas de partido político (solo para España)
+    if 'prtvtges' in schema:
+        derived.append(_map('prtvtges', IDEOLOGY_SCALE).alias('ideology'))
+        derived.append(_map('prtvtges', NATIONALISM_SCALE).alias('nationalism'))
+        derived.append(_map('prtvtges', PARTY_NAMES).alias('party_name'))
+    
+    # 7. Nombres de países en español
+    if 'cntry' in schema:
+        derived.append(_map('cntry', ISO2_TO_NAME).alias('country_name'))
+        derived.append(_map('cntry', ISO2_TO_ISO3).alias('country_iso3'))
+    
+    # 8. Etiquetas de género
+    if 'gndr' in schema:
+        derived.append(_map('gndr', {1: 'Hombre', 2: 'Mujer'}).alias('gender_label'))
+    
+    return plan.with_columns(derived) if derived else plan
+
+
+class PolarsBackend(QueryBackend):
+    """
+    Consultas lazy de Polars sobre el dataset limpio de una versión del dataset.
+    """
+    
+    def __init__(self, plan: 'pl.LazyFrame', version: str, dtypes: pd.Series = None):
+        """
+        Ejecuta el plan del dataset limpio y lo guarda en memoria.
+        
+        Args:
+            plan: Plan lazy del dataset limpio, con la columna row_id
+            version: Versión del dataset
+            dtypes: Tipos de las columnas del DataFrame limpio de pandas; si no
+                se indican, se deducen del esquema de Polars
+        """
+        self.frame = plan.collect()
+        if dtypes is None:
+            # Enteros con nulos: float64 en pandas, como los de Series.map
+            nullable = [c for c, dtype in self.frame.schema.items()
+                        if dtype.is_integer() and self.frame[c].null_count()]
+            empty = self.frame.head(0).with_columns(pl.col(nullable).cast(pl.Float64))
+            dtypes = empty.to_pandas().drop(columns='row_id').dtypes
+            for column, dtype in CATEGORICAL_DTYPES.items():
+                if column in dtypes.index:
+                    dtypes[column] = dtype
+        super().__init__(version, dtypes)
+    
+    @classmethod
+    def from_csv(cls, file_path: Path, version: str) -> 'PolarsBackend':
+        """
+        Carga y limpia el CSV con un único plan lazy.
+        
+        Args:
+            file_path: Ruta al archivo CSV de datos
+            version: Versión del dataset
+            
+        Returns:
+            PolarsBackend
+        """
+        # Tipos deducidos de las primeras filas; si alguna fila posterior no
+        # encaja, del archivo completo, como pd.read_csv(low_memory=False)
+        try:
+            return cls(clean_plan(pl.scan_csv(file_path, infer_schema_length=CSV_SCHEMA_ROWS)), version)
+        except pl.exceptions.ComputeError:
+            return cls(clean_plan(pl.scan_csv(file_path, infer_schema_length=None)), version)
+    
+    @classmethod
+    def from_parquet(cls, snapshot: Path, version: str, dtypes: pd.Series) -> 'PolarsBackend':
+        """
+        Lee la instantánea Parquet de los artefactos (ya limpia).
+        
+        Args:
+            snapshot: Ruta del archivo Parquet (ver ArtifactStore.snapshot_path)
+            version: Versión del dataset de la instantánea
+            dtypes: Tipos de las columnas del DataFrame limpio
+            
+        Returns:
+            PolarsBackend
+        """
+        return cls(pl.scan_parquet(snapshot), version, dtypes)
+    
+    def nbytes(self) -> int:
+        """Memoria del dataset en Polars (aparte del DataFrame de pandas)."""
+        return int(self.frame.estimated_size())
+    
+    def _column(self, name: str) -> str:
+        """Nombre de una columna del dataset."""
+        if name not in self.dtypes.index:
+            raise ValueError(f"Columna desconocida: {name}")
+        return name
+    
+    def _predicate(self, filters: dict, spain: bool = False, not_null: list = ()) -> 'pl.Expr':
+        """
+        Condición de los filtros (mismo criterio que get_filtered_data).
+        
+        Args:
+            filters: Diccionario con filtros {columna: valores}
+            spain: Si True, solo filas de España
+            not_null: Columnas que no pueden ser nulas (claves de agrupación)
+            
+        Returns:
+            Expresión booleana de Polars
+        """
+        schema = self.frame.schema
+        conditions = [pl.lit(True)]
+        
+        for column, values in filters.items():
+            if column not in self.dtypes.index or not values:
+                continue
+            values = values if isinstance(values, list) else [values]
+            conditions.append(_is_in(column, values, schema[column]).fill_null(False))
+        
+        if spain:
+            conditions.append(pl.col('cntry') == 'ES')
+        conditions.extend(pl.col(self._column(column)).is_not_null() for column in not_null)
+        
+        return pl.all_horizontal(conditions)
+    
+    def to_pandas(self, frame: 'pl.DataFrame' = None) -> pd.DataFrame:
+        """
+        Convierte un resultado (por defecto el dataset completo) a pandas, con
+        el índice y los tipos del DataFrame limpio.
+        
+        Args:
+            frame: DataFrame de Polars
+            
+        Returns:
+            DataFrame de pandas
+        """
+        df = (self.frame if frame is None else frame).to_pandas()
+        if 'row_id' in df.columns:
+            df = df.set_index('row_id').rename_axis(None)
+        return self._restore_dtypes(df)
+    
+    def filtered_data(self, filters: dict, columns: list = None) -> pd.DataFrame:
+        """Ver QueryBackend.filtered_data."""
+        select = ['row_id'] + [self._column(c) for c in (columns or self.dtypes.index)]
+        frame = self.frame.lazy().filter(self._predicate(filters)).select(select).collect()
+        return self.to_pandas(frame)
+    
+    def group_means(self, filters: dict, variable: str, by, spain: bool = False) -> pd.DataFrame:
+        """Ver QueryBackend.group_means."""
+        keys = [by] if isinstance(by, str) else list(by)
+        value = pl.col(self._column(variable))
+        frame = (
+            self.frame.lazy()
+            .filter(self._predicate(filters, spain, keys))
+            .group_by(keys)
+            .agg(value.mean().alias('mean'), value.count().cast(pl.Int64).alias('count'))
+            .collect()
+        )
+        return self.to_pandas(frame).sort_values(keys, ignore_index=True)
+    
+    def group_statistics(self, filters: dict, variable: str, group_by: str,
+                         spain: bool = False) -> pd.DataFrame:
+        """Ver QueryBackend.group_statistics."""
+        value = pl.col(self._column(variable))
+        frame = (
+            self.frame.lazy()
+            .filter(self._predicate(filters, spain, [group_by]))
+            .group_by(group_by)
+            .agg(
+                value.count().cast(pl.Int64).alias('count'),
+                value.mean().alias('mean'),
+                value.median().alias('median'),
+                value.std().alias('std'),
+                value.min().alias('min'),
+                value.max().alias('max')
+            )
+            .collect()
+        )
+        return self.to_pandas(frame).sort_values(group_by, ignore_index=True)
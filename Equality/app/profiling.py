@@ -0,0 +1,315 @@
+"""
+Instrumentación del panel de rendimiento (opcional).
+Cada ejecución del script con el panel activo tiene un registro (PerfRecorder)
+con el tiempo de cada sección, el tiempo, las llamadas y las filas de cada
+función pública de data_loader, analytics, visualizations y los backends de
+consultas, los aciertos y fallos de cada capa de caché y el tamaño de las
+figuras enviadas al navegador.
+
+Además de los registros por ejecución, puede haber observadores de todo el
+proceso (add_observer), como las métricas Prometheus de metrics.py, que
+reciben los mismos eventos de todas las sesiones.
+
+Sin panel ni observadores no hay coste: las funciones solo se envuelven si el
+proceso arranca con el panel (ESS11_PERF_OVERLAY) o con un observador
+(ESS11_METRICS), y a partir de ahí los envoltorios y los puntos de registro solo
+consultan una variable de contexto si la ejecución no tiene registro. Streamlit
+no se modifica: la app llama a record_figure antes de cada st.plotly_chart.
+El registro se guarda en una variable de contexto, como el token de
+cancelación: lo heredan las precargas lanzadas durante la ejecución.
+"""
+
+import contextvars
+import functools
+import importlib
+import inspect
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+
+# Módulos cuyas funciones públicas se cronometran
+INSTRUMENTED_MODULES = ('data_loader', 'analytics', 'visualizations', 'duckdb_backend', 'polars_backend')
+
+
+class PerfRecorder:
+    """
+    Registro de rendimiento de una ejecución del script.
+    """
+    
+    def __init__(self):
+        """Inicializa un registro vacío."""
+        self.started = time.perf_counter()
+        self.sections = []
+        self.calls = {}
+        self.caches = {}
+        self.figures = []
+        self._lock = threading.Lock()
+    
+    def add_section(self, name: str, seconds: float):
+        """Registra el tiempo de una sección."""
+        with self._lock:
+            self.sections.append((name, seconds))
+    
+    def add_call(self, name: str, seconds: float, rows: int):
+        """Registra una llamada a una función instrumentada."""
+        with self._lock:
+            call = self.calls.setdefault(name, {'calls': 0, 'seconds': 0.0, 'rows': 0})
+            call['calls'] += 1
+            call['seconds'] += seconds
+            call['rows'] += rows
+    
+    def add_cache(self, layer: str, hit: bool):
+        """Registra un acierto o fallo de una capa de caché."""
+        with self._lock:
+            cache = self.caches.setdefault(layer, {'hits': 0, 'misses': 0})
+            cache['hits' if hit else 'misses'] += 1
+    
+    def add_figure(self, section: str, title: str, size: int):
+        """Registra una figura enviada al navegador y su tamaño en bytes."""
+        with self._lock:
+            self.figures.append((section, title, size))
+    
+    def elapsed(self) -> float:
+        """Segundos desde el inicio de la ejecución."""
+        return time.perf_counter() - self.started
+    
+    def tables(self) -> dict:
+        """
+        Devuelve el registro como tablas.
+        
+        Returns:
+            Diccionario {'sections', 'calls', 'caches', 'figures'} de DataFrames
+        """
+        with self._lock:
+            sections = list(self.sections)
+            calls = {name: dict(call) for name, call in self.calls.items()}
+            caches = {layer: dict(cache) for layer, cache in self.caches.items()}
+            figures = list(self.figures)
+        
+        df_calls = pd.DataFrame(
+            [(name, c['calls'], c['seconds'] * 1000, c['rows']) for name, c in calls.items()],
+            columns=['Función', 'Llamadas', 'ms', 'Filas']
+        ).sort_values('ms', ascending=False, ignore_index=True)
+        
+        return {
+            'sections': pd.DataFrame(
+                [(name, seconds * 1000) for name, seconds in sections], columns=['Sección', 'ms']
+            ),
+            'calls': df_calls,
+            'caches': pd.DataFrame(
+                [(layer, c['hits'], c['misses']) for layer, c in sorted(caches.items())],
+                columns=['Capa', 'Aciertos', 'Fallos']
+            ),
+            'figures': pd.DataFrame(
+                [(section, title, size / 1024) for section, title, size in figures],
+                columns=['Sección', 'Figura', 'KB']
+            )
+        }
+
+
+_current_recorder = contextvars.ContextVar('perf_recorder', default=None)
+_current_section = contextvars.ContextVar('perf_section', default=None)
+
+_observers = []
+
+_install_lock = threading.Lock()
+_installed = False
+
+
+def add_observer(observer):
+    """
+    Añade un observador de todo el proceso. Recibe, como PerfRecorder, las
+    llamadas add_section, add_call y add_cache de todas las ejecuciones, y
+    set_dataset al cargar los datos.
+    
+    Args:
+        observer: Objeto con los métodos add_section, add_call, add_cache y set_dataset
+    """
+    install_instrumentation()
+    _observers.append(observer)
+
+
+def _report(event: str, *args):
+    """Envía un evento al registro de la ejecución y a los observadores."""
+    recorder = _current_recorder.get()
+    if recorder is not None:
+        getattr(recorder, event)(*args)
+    for observer in _observers:
+        getattr(observer, event)(*args)
+
+
+def start_run(enabled: bool) -> PerfRecorder:
+    """
+    Inicia el registro de la ejecución actual.
+    
+    Args:
+        enabled: Si False, la ejecución no se registra
+        
+    Returns:
+        Registro de la ejecución o None si no está activo
+    """
+    recorder = PerfRecorder() if enabled else None
+    _current_recorder.set(recorder)
+    return recorder
+
+
+def current_recorder() -> PerfRecorder:
+    """Devuelve el registro de la ejecución actual (o None)."""
+    return _current_recorder.get()
+
+
+@contextmanager
+def perf_section(name: str):
+    """
+    Cronometra una sección del script (como bloque with o como decorador).
+    
+    Args:
+        name: Nombre de la sección en el panel
+    """
+    if _current_recorder.get() is None and not _observers:
+        yield
+        return
+    
+    token = _current_section.set(name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report('add_section', name, time.perf_counter() - start)
+        _current_section.reset(token)
+
+
+@contextmanager
+def timed(name: str):
+    """
+    Cronometra un bloque como si fuera una llamada a una función instrumentada
+    (p. ej. la carga de datos, que pasa por las cachés de Streamlit).
+    
+    Args:
+        name: Nombre con el formato 'módulo.operación'
+    """
+    if _current_recorder.get() is None and not _observers:
+        yield
+        return
+    
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _report('add_call', name, time.perf_counter() - start, 0)
+
+
+def record_cache(layer: str, hit: bool):
+    """
+    Registra un acierto o fallo de una capa de caché en la ejecución actual.
+    
+    Args:
+        layer: Nombre de la capa (p. ej. 'tab_cache')
+        hit: True si el resultado ya estaba disponible
+    """
+    if _current_recorder.get() is not None or _observers:
+        _report('add_cache', layer, hit)
+
+
+def record_dataset(df: pd.DataFrame):
+    """
+    Informa a los observadores del dataset cargado (filas y bytes en memoria).
+    
+    Args:
+        df: Dataset limpio
+    """
+    if _observers:
+        nbytes = int(df.memory_usage(deep=True).sum())
+        for observer in _observers:
+            observer.set_dataset(len(df), nbytes)
+
+
+def record_figure(figure):
+    """
+    Registra el tamaño serializado de una figura de Plotly enviada al navegador.
+    
+    Args:
+        figure: Figura de Plotly (go.Figure o diccionario)
+    """
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return
+    
+    import plotly.io as pio
+    
+    # Misma serialización que usa st.plotly_chart
+    size = len(pio.to_json(figure, validate=False).encode('utf-8'))
+    layout = getattr(figure, 'layout', None)
+    title = (layout.title.text if layout is not None else None) or ''
+    recorder.add_figure(_current_section.get() or '', title, size)
+
+
+def _rows(args: tuple, kwargs: dict) -> int:
+    """Filas del primer DataFrame o Serie de los argumentos (0 si no hay)."""
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, (pd.DataFrame, pd.Series)):
+            return len(value)
+    return 0
+
+
+def _timed(name: str, fn):
+    """Envuelve fn para registrar su tiempo y filas en la ejecución actual."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if _current_recorder.get() is None and not _observers:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _report('add_call', name, time.perf_counter() - start, _rows(args, kwargs))
+    return wrapper
+
+
+def is_instrumented() -> bool:
+    """Indica si las funciones de INSTRUMENTED_MODULES ya están envueltas."""
+    return _installed
+
+
+def install_instrumentation():
+    """
+    Envuelve (una sola vez por proceso) las funciones y métodos públicos de
+    INSTRUMENTED_MODULES y actualiza las referencias importadas con
+    'from módulo import función' en los módulos de la app.
+    """
+    global _installed
+    
+    with _install_lock:
+        if _installed:
+            return
+        
+        replacements = {}
+        for module_name in INSTRUMENTED_MODULES:
+            module = importlib.import_module(module_name)
+            for name, obj in list(vars(module).items()):
+                if name.startswith('_') or getattr(obj, '__module__', None) != module_name:
+                    continue
+                if inspect.isfunction(obj):
+                    replacements[id(obj)] = (obj, _timed(f"{module_name}.{name}", obj))
+                elif inspect.isclass(obj):
+                    # Los métodos con st.cache_data no son funciones y se dejan como están
+                    for attr, member in list(vars(obj).items()):
+                        if not attr.startswith('_') and inspect.isfunction(member):
+                            setattr(obj, attr, _timed(f"{module_name}.{name}.{attr}", member))
+        
+        app_dir = Path(__file__).parent
+        for module in list(sys.modules.values()):
+            module_file = getattr(module, '__file__', None)
+            if not module_file or Path(module_file).parent != app_dir:
+                continue
+            for name, value in list(vars(module).items()):
+                original, wrapper = replacements.get(id(value), (None, None))
+                if original is value:
+                    setattr(module, name, wrapper)
+        
+        _installed = True
@@ -0,0 +1,374 @@
+"""
+Generación de informes precalculados sin interfaz.
+Calcula las estadísticas del panel para cada ámbito (Europa y cada país),
+variable y segmento demográfico en un pool de procesos y las guarda en Parquet
+o JSON. Tablas:
+- kpis: una fila por ámbito, segmento y variable (KPIs, pruebas y correlaciones)
+- parties: estadísticas por partido en España (pestaña de partidos)
+- correlations: matriz de correlaciones de Spearman entre variables
+- country_ranking: países con media más alta y más baja (solo ámbito Europa)
+"""
+
+import json
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ConstantInputWarning
+
+from config import DEPENDENT_VARS, REPORTS_DIR, MIN_OBSERVATIONS
+from data_loader import DataLoader
+from analytics import (
+    calculate_spearman_correlation, calculate_confidence_interval,
+    test_normality, calculate_ideology_gradient, calculate_nationalism_gradient,
+    calculate_group_statistics, perform_gender_comparison
+)
+
+
+# Ámbito que agrupa a todos los países
+ALL_COUNTRIES = 'Europa'
+
+# Columnas del dataset limpio que necesitan los informes (además de las variables)
+REPORT_COLUMNS = [
+    'cntry', 'gndr', 'agea', 'education_level', 'ideology', 'nationalism', 'party_name',
+    'country_name', 'country_iso3', 'gender_label', 'age_group', 'education_quartile',
+    'education_upper'
+]
+
+# Tablas del informe (un archivo por tabla)
+REPORT_TABLES = ('kpis', 'parties', 'correlations', 'country_ranking')
+
+# Observaciones mínimas de España para las correlaciones con ideología y
+# nacionalismo (como en las pestañas del panel)
+MIN_SPAIN_OBSERVATIONS = 10
+
+# DataFrame limpio compartido por los procesos del pool (ver _init_worker)
+_worker_df = None
+
+
+# ============================================================================
+# DEFINICIÓN DE TAREAS
+# ============================================================================
+
+def get_report_slices(catalog: dict) -> list:
+    """
+    Define los segmentos demográficos de los informes.
+    
+    Args:
+        catalog: Catálogo de filtros (ver DataLoader.build_filter_catalog)
+        
+    Returns:
+        Lista de tuplas (columna, valor); ('Todos', None) es la muestra completa
+    """
+    slices = [('Todos', None)]
+    slices += [('gender_label', value) for value in ['Hombre', 'Mujer']]
+    slices += [('age_group', value) for value in catalog['age_groups']]
+    slices += [('education_quartile', value) for value in catalog['education_quartile_labels']]
+    
+    return slices
+
+
+def build_report_tasks(catalog: dict, countries: list = None, variables: list = None) -> list:
+    """
+    Genera una tarea por ámbito (Europa y cada país).
+    
+    Args:
+        catalog: Catálogo de filtros
+        countries: Países a incluir (por defecto todos los del catálogo)
+        variables: Variables dependientes (por defecto todas)
+        
+    Returns:
+        Lista de tuplas (ámbito, variables, segmentos)
+    """
+    countries = countries or catalog['countries']
+    variables = variables or list(DEPENDENT_VARS)
+    slices = get_report_slices(catalog)
+    
+    scopes = [ALL_COUNTRIES] + [c for c in countries if c in catalog['countries']]
+    
+    return [(scope, variables, slices) for scope in scopes]
+
+
+# ============================================================================
+# CÁLCULO EN LOS PROCESOS DEL POOL
+# ============================================================================
+
+def _init_worker(df: pd.DataFrame):
+    """Inicializa un proceso del pool con el DataFrame limpio."""
+    global _worker_df
+    _worker_df = df
+    
+    # Los segmentos pequeños pueden tener variables constantes (correlación NaN)
+    warnings.simplefilter('ignore', ConstantInputWarning)
+
+
+def compute_slice_kpis(df: pd.DataFrame, variable: str, loader: DataLoader) -> dict:
+    """
+    Calcula todos los KPIs de una variable sobre un segmento.
+    
+    Args:
+        df: DataFrame del segmento
+        variable: Variable dependiente
+        loader: DataLoader con los métodos estadísticos
+        
+    Returns:
+        Diccionario con estadísticas, brechas, gradientes, pruebas y correlaciones
+    """
+    kpis = loader.get_variable_stats(df, variable)
+    kpis['sufficient'] = kpis['count'] >= MIN_OBSERVATIONS
+    
+    ci_low, ci_high = calculate_confidence_interval(df[variable])
+    kpis['ci_low'], kpis['ci_high'] = ci_low, ci_high
+    kpis['normality_pvalue'] = test_normality(df, variable)['pvalue']
+    
+    kpis['gender_gap'] = loader.calculate_gender_gap(df, variable)
+    kpis['age_gradient'] = loader.calculate_age_gradient(df, variable)
+    kpis['education_gradient'] = loader.calculate_education_gradient(df, variable)
+    kpis['ideology_gradient'] = calculate_ideology_gradient(df, variable)
+    
+    # Prueba de Mann-Whitney de la pestaña de género
+    gender = perform_gender_comparison(df, variable)
+    for key in ('male_mean', 'female_mean', 'male_median', 'female_median', 'u_statistic', 'p_value'):
+        kpis[f'gender_{key}'] = gender.get(key, np.nan)
+    
+    for name, column in [('age', 'agea'), ('education', 'education_level'), ('gender', 'gndr')]:
+        corr, pval = calculate_spearman_correlation(df, column, variable)
+        kpis[f'{name}_correlation'] = corr
+        kpis[f'{name}_pvalue'] = pval
+    
+    # Pestañas de ideología y nacionalismo (solo España)
+    df_spain = df[df['cntry'] == 'ES']
+    for name in ('ideology', 'nationalism'):
+        corr, pval = np.nan, np.nan
+        if df_spain[name].notna().sum() >= MIN_SPAIN_OBSERVATIONS:
+            corr, pval = calculate_spearman_correlation(df_spain, name, variable)
+        kpis[f'{name}_correlation'] = corr
+        kpis[f'{name}_pvalue'] = pval
+    kpis['nationalism_gradient'] = calculate_nationalism_gradient(df_spain, variable)
+    
+    return kpis
+
+
+def compute_slice_tables(df: pd.DataFrame, variables: list, loader: DataLoader,
+                         scope: str) -> dict:
+    """
+    Calcula las tablas por grupo de un segmento: partidos de España, matriz de
+    correlaciones y ranking de países.
+    
+    Args:
+        df: DataFrame del segmento
+        variables: Variables dependientes
+        loader: DataLoader con los métodos estadísticos
+        scope: Ámbito del segmento (el ranking de países solo se calcula para Europa)
+        
+    Returns:
+        Diccionario {tabla: lista de filas} sin la tabla kpis
+    """
+    tables = {'parties': [], 'correlations': [], 'country_ranking': []}
+    
+    df_spain = df[(df['cntry'] == 'ES') & df['party_name'].notna()]
+    for variable in variables:
+        if len(df_spain):
+            stats = calculate_group_statistics(df_spain, variable, 'party_name')
+            tables['parties'] += [{'variable': variable, **row} for row in stats.to_dict('records')]
+        
+        if scope == ALL_COUNTRIES:
+            top, bottom = loader.get_country_ranking(df, variable)
+            for position, ranking in (('top', top), ('bottom', bottom)):
+                tables['country_ranking'] += [
+                    {'variable': variable, 'position': position, 'rank': rank, **row}
+                    for rank, row in enumerate(ranking.to_dict('records'), start=1)
+                ]
+    
+    # Matriz de correlaciones (mismas observaciones completas que el panel)
+    df_multivar = df[variables].dropna()
+    if len(df_multivar) >= 10:
+        for i, var1 in enumerate(variables):
+            for var2 in variables[i + 1:]:
+                corr, pval = calculate_spearman_correlation(df_multivar, var1, var2)
+                tables['correlations'].append({'var1': var1, 'var2': var2, 'correlation': corr,
+                                               'pvalue': pval, 'n': len(df_multivar)})
+    
+    return tables
+
+
+def compute_scope_report(task: tuple, figures_dir: str = None,
+                         figure_format: str = 'html') -> list:
+    """
+    Calcula los KPIs de un ámbito para todas sus variables y segmentos.
+    
+    Args:
+        task: Tupla (ámbito, variables, segmentos) de build_report_tasks
+        figures_dir: Carpeta donde guardar las figuras (None para no generarlas)
+        figure_format: 'html' o un formato de imagen estática ('png', 'svg')
+        
+    Returns:
+        Diccionario {tabla: lista de filas (diccionarios)} con las tablas de REPORT_TABLES
+    """
+    scope, variables, slices = task
+    loader = DataLoader()
+    
+    df_scope = _worker_df
+    if scope != ALL_COUNTRIES:
+        df_scope = df_scope[df_scope['country_name'] == scope]
+    
+    tables = {name: [] for name in REPORT_TABLES}
+    for column, value in slices:
+        df_slice = df_scope if value is None else df_scope[df_scope[column] == value]
+        key = {'scope': scope, 'slice': column, 'slice_value': value}
+        for variable in variables:
+            row = {**key, 'variable': variable}
+            row.update(compute_slice_kpis(df_slice, variable, loader))
+            tables['kpis'].append(row)
+        for name, rows in compute_slice_tables(df_slice, variables, loader, scope).items():
+            tables[name] += [{**key, **row} for row in rows]
+    
+    if figures_dir is not None:
+        write_scope_figures(df_scope, scope, variables, Path(figures_dir), figure_format)
+    
+    return tables
+
+
+def write_scope_figures(df: pd.DataFrame, scope: str, variables: list,
+                        figures_dir: Path, figure_format: str = 'html'):
+    """
+    Guarda las figuras del panel de un ámbito.
+    
+    Args:
+        df: DataFrame del ámbito
+        scope: Nombre del ámbito
+        variables: Variables dependientes
+        figures_dir: Carpeta raíz de las figuras
+        figure_format: 'html' o un formato de imagen estática ('png', 'svg')
+    """
+    from visualizations import (
+        create_distribution_histogram, create_gender_frequency_histogram,
+        create_age_trend, create_education_trend, create_country_map
+    )
+    
+    scope_dir = figures_dir / scope
+    scope_dir.mkdir(parents=True, exist_ok=True)
+    
+    for variable in variables:
+        title = DEPENDENT_VARS[variable]
+        figures = {
+            'distribution': create_distribution_histogram(df, variable, f"Distribución de {title}"),
+            'gender': create_gender_frequency_histogram(df, variable, f"Distribución por Género - {title}"),
+            'age': create_age_trend(df, variable, f"{title} por Tramo de Edad"),
+            'education': create_education_trend(df, variable, f"{title} por Nivel Educativo"),
+        }
+        if scope == ALL_COUNTRIES:
+            figures['map'] = create_country_map(df, variable, f"{title} por País")
+        
+        for name, fig in figures.items():
+            path = scope_dir / f"{variable}_{name}.{figure_format}"
+            if figure_format == 'html':
+                fig.write_html(path, include_plotlyjs='cdn')
+            else:
+                fig.write_image(path)
+
+
+# ============================================================================
+# EJECUCIÓN DEL INFORME
+# ============================================================================
+
+def write_report(rows: list, output_dir: Path, fmt: str = 'parquet', name: str = 'kpis') -> Path:
+    """
+    Guarda las filas de una tabla del informe.
+    
+    Args:
+        rows: Filas calculadas por compute_scope_report
+        output_dir: Carpeta de salida
+        fmt: 'parquet' o 'json'
+        name: Nombre de la tabla (ver REPORT_TABLES)
+        
+    Returns:
+        Ruta del archivo escrito
+    """
+    df_report = pd.DataFrame(rows)
+    
+    if fmt == 'parquet':
+        path = output_dir / f"{name}.parquet"
+        df_report.to_parquet(path, index=False)
+    else:
+        path = output_dir / f"{name}.json"
+        df_report.replace({np.nan: None}).to_json(path, orient='records', indent=1, force_ascii=False)
+    
+    return path
+
+
+def run_report(output_dir: Path = REPORTS_DIR, fmt: str = 'parquet', workers: int = None,
+               countries: list = None, variables: list = None, figures: bool = False,
+               figure_format: str = 'html', loader: DataLoader = None) -> dict:
+    """
+    Calcula el informe completo en un pool de procesos y lo guarda en disco.
+    
+    Args:
+        output_dir: Carpeta raíz de los informes (se crea una subcarpeta por versión del dataset)
+        fmt: Formato de las tablas ('parquet' o 'json')
+        workers: Número de procesos (por defecto, número de CPUs)
+        countries: Países a incluir (por defecto todos)
+        variables: Variables dependientes (por defecto todas)
+        figures: Si True, guarda también las figuras de cada ámbito
+        figure_format: 'html' o un formato de imagen estática ('png', 'svg')
+        loader: DataLoader a utilizar (por defecto el del archivo de datos de config)
+        
+    Returns:
+        Resumen de la ejecución (también guardado en summary.json)
+    """
+    loader = loader or DataLoader()
+    start = time.perf_counter()
+    
+    df = loader.get_data()
+    catalog = loader.get_filter_catalog()
+    tasks = build_report_tasks(catalog, countries, variables)
+    load_seconds = time.perf_counter() - start
+    
+    report_dir = Path(output_dir) / catalog['version']
+    report_dir.mkdir(parents=True, exist_ok=True)
+    figures_dir = str(report_dir / "figures") if figures else None
+    
+    # Solo las columnas necesarias: cada segmento copia menos datos al filtrarse
+    df_report = df[REPORT_COLUMNS + list(DEPENDENT_VARS)]
+    
+    tables = {name: [] for name in REPORT_TABLES}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(df_report,)) as executor:
+        futures = {
+            executor.submit(compute_scope_report, task, figures_dir, figure_format): task[0]
+            for task in tasks
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            for name, table_rows in future.result().items():
+                tables[name].extend(table_rows)
+            elapsed = time.perf_counter() - start
+            n_slices = len(tables['kpis'])
+            print(f"   [{done:>3}/{len(tasks)}] {futures[future]:<20} "
+                  f"{n_slices:>6} segmentos  ({n_slices / elapsed:,.0f}/s)", file=sys.stderr)
+    
+    paths = {name: write_report(table_rows, report_dir, fmt, name) for name, table_rows in tables.items()}
+    rows = tables['kpis']
+    elapsed = time.perf_counter() - start
+    
+    summary = {
+        'version': catalog['version'],
+        'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'n_rows': catalog['n_rows'],
+        'scopes': len(tasks),
+        'slices': len(rows),
+        'load_seconds': round(load_seconds, 3),
+        'total_seconds': round(elapsed, 3),
+        'slices_per_second': round(len(rows) / (elapsed - load_seconds), 1),
+        'output': str(paths['kpis']),
+        'tables': {name: str(path) for name, path in paths.items()},
+    }
+    with open(report_dir / "summary.json", 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+    
+    return summary
@@ -1,10 +1,21 @@
 """
 Script de inicio rápido para el Panel BI.
 Verifica dependencias y lanza la aplicación Streamlit.
+
+Uso:
+    python run.py            # Verifica el sistema y lanza la aplicación
+    python run.py report     # Genera los informes precalculados (ver reports.py)
+    python run.py build      # Construye los artefactos de servicio (ver artifacts.py)
+    python run.py publish    # Publica los artefactos para los workers (SHARED_DATASET)
+    python run.py serve      # Lanza el servicio de análisis (ANALYTICS_SERVICE)
+    python run.py api [--host HOST] [--port PUERTO]
+                             # Lanza la API HTTP de agregados en JSON (ver api.py)
 """
 
+import argparse
 import sys
 import subprocess
+from importlib import metadata
 from pathlib import Path
 
 
@@ -19,7 +30,11 @@ def check_python_version():
 
 
 def check_dependencies():
-    """Verifica que las dependencias estén instaladas."""
+    """
+    Verifica que las dependencias estén instaladas.
+    Consulta los metadatos de los paquetes sin importarlos, para no pagar su
+    tiempo de importación antes de lanzar Streamlit.
+    """
     required_packages = [
         'streamlit',
         'pandas',
@@ -32,9 +47,9 @@ def check_dependencies():
     
     for package in required_packages:
         try:
-            __import__(package)
-            print(f"✅ {package}")
-        except ImportError:
+            version = metadata.version(package)
+            print(f"✅ {package} {version}")
+        except metadata.PackageNotFoundError:
             print(f"❌ {package} - NO INSTALADO")
             missing_packages.append(package)
     
@@ -61,7 +76,8 @@ def check_dependencies():
 
 def check_data_file():
     """Verifica que el archivo de datos exista."""
-    data_file = Path(__file__).parent.parent / "data" / "ESS11.csv"
+    from config import DATA_FILE
+    data_file = DATA_FILE
     
     if data_file.exists():
         print(f"✅ Archivo de datos encontrado: {data_file}")
@@ -95,8 +111,226 @@ def launch_app():
         print(f"\n❌ Error al iniciar la aplicación: {e}")
 
 
+def run_report(args):
+    """Genera los informes precalculados de KPIs sin abrir la aplicación."""
+    from reports import run_report as build_reports
+    
+    print("=" * 60)
+    print("Panel BI - Igualdad en Europa (ESS11)")
+    print("Generación de informes")
+    print("=" * 60)
+    print()
+    
+    if not check_data_file():
+        return
+    
+    summary = build_reports(
+        output_dir=args.output,
+        fmt=args.format,
+        workers=args.workers,
+        countries=args.countries,
+        variables=args.variables,
+        figures=args.figures,
+        figure_format=args.figure_format
+    )
+    
+    print()
+    print(f"✅ Informe guardado en: {Path(summary['output']).parent}")
+    print(f"   Tablas: {', '.join(Path(path).name for path in summary['tables'].values())}")
+    print(f"   {summary['slices']:,} segmentos de {summary['scopes']} ámbitos "
+          f"en {summary['total_seconds']:.1f} s "
+          f"(carga {summary['load_seconds']:.1f} s, {summary['slices_per_second']:,.0f} segmentos/s)")
+
+
+def run_build(args):
+    """Construye los artefactos de servicio que abre la aplicación al iniciar."""
+    import time
+    from artifacts import build_artifacts
+    from data_loader import DataLoader
+    
+    print("=" * 60)
+    print("Panel BI - Igualdad en Europa (ESS11)")
+    print("Construcción de artefactos")
+    print("=" * 60)
+    print()
+    
+    if not check_data_file():
+        return
+    
+    start = time.perf_counter()
+    version_dir = build_artifacts(DataLoader(), args.output)
+    elapsed = time.perf_counter() - start
+    
+    size = sum(f.stat().st_size for f in version_dir.rglob('*') if f.is_file())
+    print()
+    print(f"✅ Artefactos guardados en: {version_dir}")
+    print(f"   {size / 1024 ** 2:.1f} MB en {elapsed:.1f} s (versión activa: {version_dir.name})")
+
+
+def run_publish(args):
+    """
+    Publica los artefactos para los procesos de Streamlit en modo SHARED_DATASET
+    y, con --watch, vuelve a publicarlos cada vez que cambia el CSV.
+    """
+    import time
+    from artifacts import build_artifacts, collect_garbage, get_current_version
+    from data_loader import DataLoader
+    
+    print("=" * 60)
+    print("Panel BI - Igualdad en Europa (ESS11)")
+    print("Publicación del dataset compartido")
+    print("=" * 60)
+    print()
+    
+    if not check_data_file():
+        return
+    
+    loader = DataLoader()
+    try:
+        while True:
+            version = loader.get_dataset_version()
+            if version != get_current_version(args.output):
+                version_dir = build_artifacts(loader, args.output)
+                print(f"✅ Versión publicada: {version_dir.name}")
+            
+            removed = collect_garbage(args.output)
+            if removed:
+                print(f"🧹 Versiones sin lectores eliminadas: {', '.join(removed)}")
+            
+            if not args.watch:
+                break
+            time.sleep(args.watch)
+    except KeyboardInterrupt:
+        print("\n✅ Publicación detenida")
+
+
+def run_serve(args):
+    """Lanza el servicio de análisis compartido por los procesos de Streamlit."""
+    import asyncio
+    from analytics_service import AnalyticsEngine, serve
+    
+    print("=" * 60)
+    print("Panel BI - Igualdad en Europa (ESS11)")
+    print("Servicio de análisis")
+    print("=" * 60)
+    print()
+    
+    if not check_data_file():
+        return
+    
+    engine = AnalyticsEngine()
+    print(f"✅ Dataset cargado: {engine.loader.get_filter_catalog()['n_rows']:,} observaciones")
+    print(f"   Escuchando en: {args.socket}")
+    print("\n   Presiona Ctrl+C para detener el servicio\n")
+    
+    try:
+        asyncio.run(serve(args.socket, engine, workers=args.workers))
+    except KeyboardInterrupt:
+        print("\n✅ Servicio detenido")
+
+
+def run_api(args):
+    """Lanza la API HTTP de solo lectura con los agregados en JSON."""
+    from api import create_server
+    
+    print("=" * 60)
+    print("Panel BI - Igualdad en Europa (ESS11)")
+    print("API de agregados")
+    print("=" * 60)
+    print()
+    
+    if not check_data_file():
+        return
+    
+    server = create_server(args.host, args.port, verbose=args.verbose)
+    host, port = server.server_address[:2]
+    print(f"✅ Escuchando en: http://{host}:{port}/api/")
+    print("\n   Presiona Ctrl+C para detener la API\n")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✅ API detenida")
+    finally:
+        server.server_close()
+
+
+def parse_args(argv=None):
+    """Analiza los argumentos de línea de comandos."""
+    from config import DEPENDENT_VARS, REPORTS_DIR, ARTIFACTS_DIR, ANALYTICS_SOCKET
+    
+    parser = argparse.ArgumentParser(description="Panel BI - Igualdad en Europa (ESS11)")
+    subparsers = parser.add_subparsers(dest='command')
+    
+    subparsers.add_parser('run', help="Verifica el sistema y lanza la aplicación (por defecto)")
+    
+    report = subparsers.add_parser('report', help="Genera los informes precalculados de KPIs")
+    report.add_argument('--output', type=Path, default=REPORTS_DIR,
+                        help="Carpeta de salida (se crea una subcarpeta por versión del dataset)")
+    report.add_argument('--format', choices=['parquet', 'json'], default='parquet',
+                        help="Formato de la tabla de KPIs")
+    report.add_argument('--workers', type=int, default=None,
+                        help="Número de procesos (por defecto, número de CPUs)")
+    report.add_argument('--countries', nargs='+', default=None,
+                        help="Países a incluir (por defecto todos)")
+    report.add_argument('--variables', nargs='+', choices=list(DEPENDENT_VARS), default=None,
+                        help="Variables dependientes (por defecto todas)")
+    report.add_argument('--figures', action='store_true',
+                        help="Guarda también las figuras de cada ámbito")
+    report.add_argument('--figure-format', choices=['html', 'png', 'svg'], default='html',
+                        help="Formato de las figuras (png/svg requieren kaleido)")
+    
+    build = subparsers.add_parser('build', help="Construye los artefactos de servicio de la aplicación")
+    build.add_argument('--output', type=Path, default=ARTIFACTS_DIR,
+                       help="Carpeta raíz de los artefactos (se crea una subcarpeta por versión del dataset)")
+    
+    publish = subparsers.add_parser('publish', help="Publica los artefactos del dataset compartido")
+    publish.add_argument('--output', type=Path, default=ARTIFACTS_DIR,
+                         help="Carpeta raíz de los artefactos")
+    publish.add_argument('--watch', type=float, default=None, metavar='SEGUNDOS',
+                         help="Comprueba periódicamente el CSV y publica las nuevas versiones")
+    
+    serve = subparsers.add_parser('serve', help="Lanza el servicio de análisis por socket Unix")
+    serve.add_argument('--socket', type=Path, default=ANALYTICS_SOCKET,
+                       help="Ruta del socket Unix")
+    serve.add_argument('--workers', type=int, default=4,
+                       help="Hilos que ejecutan las peticiones")
+    
+    api = subparsers.add_parser('api', help="Lanza la API HTTP de agregados en JSON")
+    api.add_argument('--host', default='127.0.0.1',
+                     help="Dirección de escucha (por defecto solo local)")
+    api.add_argument('--port', type=int, default=8600,
+                     help="Puerto de escucha")
+    api.add_argument('--verbose', action='store_true',
+                     help="Registra cada petición en la consola")
+    
+    return parser.parse_args(argv)
+
+
 def main():
     """Función principal."""
+    args = parse_args()
+    
+    if args.command == 'report':
+        run_report(args)
+        return
+    
+    if args.command == 'build':
+        run_build(args)
+        return
+    
+    if args.command == 'publish':
+        run_publish(args)
+        return
+    
+    if args.command == 'serve':
+        run_serve(args)
+        return
+    
+    if args.command == 'api':
+        run_api(args)
+        return
+    
     print("=" * 60)
     print("Panel BI - Igualdad en Europa (ESS11)")
     print("Verificación de sistema")
@@ -0,0 +1,682 @@
+"""
+Cálculo de los datos de las pestañas del panel.
+Funciones sin dependencias de la interfaz que devuelven las estadísticas y
+figuras de cada pestaña, junto con una caché perezosa por firma de filtros.
+"""
+
+import contextvars
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from cache import ResultCache, result_cache
+from cancellation import OperationCancelled, checkpoint, is_cancelled
+from config import DEPENDENT_VARS, SECTION_WORKERS, SECTION_PROCESS_WORKERS
+from data_loader import DataLoader
+from memory import MEMORY_BUDGET, estimate_size
+from visualizations import (
+    create_distribution_histogram, create_gender_frequency_histogram,
+    create_age_trend, create_education_trend, create_country_map,
+    create_top_bottom_chart, create_party_bar_chart, create_ideology_scatter,
+    create_correlation_heatmap
+)
+from analytics import (
+    calculate_spearman_correlation, test_normality,
+    calculate_group_statistics, perform_gender_comparison,
+    perform_age_correlation, perform_education_correlation,
+    calculate_ideology_gradient, calculate_nationalism_gradient, generate_summary_statistics,
+    interpret_correlation_strength
+)
+from profiling import record_cache
+
+
+# Los métodos estadísticos de DataLoader no dependen del estado de la instancia
+_stats_loader = DataLoader()
+
+
+# ============================================================================
+# PESTAÑAS DEL ANÁLISIS EXPLORATORIO (EDA)
+# ============================================================================
+
+def compute_distribution_tab(df: pd.DataFrame, variable: str) -> dict:
+    """
+    Calcula los datos de la pestaña de distribución general.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+
+    Returns:
+        Diccionario con histograma, resumen estadístico y test de normalidad
+    """
+    return {
+        'figure': create_distribution_histogram(
+            df, variable, f"Distribución de {DEPENDENT_VARS[variable]}"
+        ),
+        'summary': generate_summary_statistics(df, variable),
+        'normality': test_normality(df, variable)
+    }
+
+
+def compute_gender_tab(df: pd.DataFrame, variable: str) -> dict:
+    """
+    Calcula los datos de la pestaña de análisis por género.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+
+    Returns:
+        Diccionario con la comparación por género, la correlación y la figura
+    """
+    analysis = perform_gender_comparison(df, variable)
+
+    if 'error' in analysis:
+        return {'analysis': analysis}
+
+    # Calcular correlación de Spearman para género
+    gender_corr = None
+    if len(df[['gndr', variable]].dropna()) >= 10:
+        corr, pval = calculate_spearman_correlation(df, 'gndr', variable)
+        gender_corr = {
+            'correlation': corr,
+            'p_value': pval,
+            'strength': interpret_correlation_strength(corr),
+            'significant': pval < 0.05,
+            'direction': 'positiva' if corr > 0 else 'negativa'
+        }
+
+    return {
+        'analysis': analysis,
+        'correlation': gender_corr,
+        'figure': create_gender_frequency_histogram(
+            df, variable, f"Distribución por Género - {DEPENDENT_VARS[variable]}"
+        )
+    }
+
+
+def compute_age_tab(df: pd.DataFrame, variable: str, query=None) -> dict:
+    """
+    Calcula los datos de la pestaña de análisis por edad.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+        query: Consultas del backend activo con los filtros de df (FilteredQuery);
+            si se indica, las medias de la figura se agregan en el backend
+
+    Returns:
+        Diccionario con la correlación, el gradiente por edad y la figura
+    """
+    analysis = perform_age_correlation(df, variable)
+
+    if 'error' in analysis:
+        return {'analysis': analysis}
+
+    return {
+        'analysis': analysis,
+        'gradient': _stats_loader.calculate_age_gradient(df, variable),
+        'figure': create_age_trend(
+            df, variable, f"{DEPENDENT_VARS[variable]} por Tramo de Edad",
+            means=query.group_means(variable, 'age_group') if query else None
+        )
+    }
+
+
+def compute_education_tab(df: pd.DataFrame, variable: str, query=None) -> dict:
+    """
+    Calcula los datos de la pestaña de análisis por educación.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+        query: Consultas del backend activo con los filtros de df (FilteredQuery);
+            si se indica, las medias de la figura se agregan en el backend
+
+    Returns:
+        Diccionario con la correlación, el gradiente educativo y la figura
+    """
+    analysis = perform_education_correlation(df, variable)
+
+    if 'error' in analysis:
+        return {'analysis': analysis}
+
+    return {
+        'analysis': analysis,
+        'gradient': _stats_loader.calculate_education_gradient(df, variable),
+        'figure': create_education_trend(
+            df, variable, f"{DEPENDENT_VARS[variable]} por Nivel Educativo",
+            means=query.group_means(variable, 'education_level') if query else None
+        )
+    }
+
+
+def compute_country_tab(df: pd.DataFrame, variable: str, query=None) -> dict:
+    """
+    Calcula los datos de la pestaña de análisis por país.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+        query: Consultas del backend activo con los filtros de df (FilteredQuery);
+            si se indica, las medias del mapa y del ranking se agregan en el backend
+
+    Returns:
+        Diccionario con el mapa, el ranking de países y su gráfico comparativo
+    """
+    top_countries, bottom_countries = _stats_loader.get_country_ranking(
+        df, variable, top_n=5,
+        means=query.group_means(variable, 'country_name') if query else None
+    )
+
+    top_bottom_figure = None
+    if not top_countries.empty and not bottom_countries.empty:
+        top_bottom_figure = create_top_bottom_chart(
+            top_countries,
+            bottom_countries,
+            variable,
+            f"Top 5 y Bottom 5 Países - {DEPENDENT_VARS[variable]}"
+        )
+
+    return {
+        'map': create_country_map(
+            df, variable, f"{DEPENDENT_VARS[variable]} por País",
+            means=query.group_means(variable, ['country_iso3', 'country_name']) if query else None
+        ),
+        'top': top_countries,
+        'bottom': bottom_countries,
+        'top_bottom_figure': top_bottom_figure
+    }
+
+
+EDA_TABS = {
+    'distribution': compute_distribution_tab,
+    'gender': compute_gender_tab,
+    'age': compute_age_tab,
+    'education': compute_education_tab,
+    'country': compute_country_tab
+}
+
+
+# ============================================================================
+# PESTAÑAS DEL ANÁLISIS DE ESPAÑA
+# ============================================================================
+
+def compute_party_tab(df_spain: pd.DataFrame, variable: str, query=None) -> dict:
+    """
+    Calcula los datos de la pestaña por partido político.
+
+    Args:
+        df_spain: DataFrame filtrado solo con España
+        variable: Variable dependiente seleccionada
+        query: Consultas del backend activo con los filtros de df_spain
+            (FilteredQuery); si se indica, los agregados por partido se hacen
+            en el backend
+
+    Returns:
+        Diccionario con el gráfico de barras y las estadísticas por partido
+    """
+    if query is not None:
+        return {
+            'figure': create_party_bar_chart(
+                df_spain, variable, f"{DEPENDENT_VARS[variable]} por Partido",
+                means=query.group_means(variable, 'party_name', spain=True)
+            ),
+            'stats': query.group_statistics(variable, 'party_name', spain=True)
+        }
+
+    return {
+        'figure': create_party_bar_chart(
+            df_spain, variable, f"{DEPENDENT_VARS[variable]} por Partido"
+        ),
+        'stats': calculate_group_statistics(
+            df_spain[df_spain['party_name'].notna()],
+            variable,
+            'party_name'
+        )
+    }
+
+
+def compute_ideology_tab(df_spain: pd.DataFrame, variable: str) -> dict:
+    """
+    Calcula los datos de la pestaña por ideología.
+
+    Args:
+        df_spain: DataFrame filtrado solo con España
+        variable: Variable dependiente seleccionada
+
+    Returns:
+        Diccionario con correlación, gradiente ideológico y dispersograma
+    """
+    # Verificar datos suficientes
+    if df_spain['ideology'].notna().sum() < 10:
+        return {'sufficient': False}
+
+    corr, pval = calculate_spearman_correlation(df_spain, 'ideology', variable)
+
+    return {
+        'sufficient': True,
+        'correlation': corr,
+        'p_value': pval,
+        'gradient': calculate_ideology_gradient(df_spain, variable),
+        'figure': create_ideology_scatter(
+            df_spain, variable, f"{DEPENDENT_VARS[variable]} vs Ideología"
+        )
+    }
+
+
+def compute_nationalism_tab(df_spain: pd.DataFrame, variable: str) -> dict:
+    """
+    Calcula los datos de la pestaña por nacionalismo.
+
+    Args:
+        df_spain: DataFrame filtrado solo con España
+        variable: Variable dependiente seleccionada
+
+    Returns:
+        Diccionario con correlación, gradiente nacionalista y dispersograma
+    """
+    # Verificar datos suficientes
+    if df_spain['nationalism'].notna().sum() < 10:
+        return {'sufficient': False}
+
+    corr, pval = calculate_spearman_correlation(df_spain, 'nationalism', variable)
+
+    return {
+        'sufficient': True,
+        'correlation': corr,
+        'p_value': pval,
+        # Diferencia entre Q4 (alto nacionalismo) y Q1 (bajo nacionalismo)
+        'gradient': calculate_nationalism_gradient(df_spain, variable),
+        'figure': create_ideology_scatter(
+            df_spain,
+            variable,
+            f"{DEPENDENT_VARS[variable]} vs Nacionalismo",
+            x_var='nationalism'
+        )
+    }
+
+
+SPAIN_TABS = {
+    'party': compute_party_tab,
+    'ideology': compute_ideology_tab,
+    'nationalism': compute_nationalism_tab
+}
+
+# Pestañas que aceptan el parámetro query del backend de consultas (ver backends.py)
+QUERY_TABS = {'age', 'education', 'country', 'party'}
+
+# Pestañas cuyas medias por grupo caben en el cubo de agregados (backends.CubeQuery)
+CUBE_TABS = {'age', 'country'}
+
+
+# ============================================================================
+# SECCIONES DE VARIABLES Y CORRELACIONES
+# ============================================================================
+
+def compute_variable_summary(df: pd.DataFrame, variable: str) -> dict:
+    """
+    Calcula las estadísticas descriptivas y el test de normalidad de una variable.
+
+    Args:
+        df: DataFrame filtrado
+        variable: Variable dependiente seleccionada
+
+    Returns:
+        Diccionario con las estadísticas y el resultado de Shapiro-Wilk
+    """
+    return {
+        'stats': _stats_loader.get_variable_stats(df, variable),
+        'normality': test_normality(df, variable)
+    }
+
+
+def _correlation_strength(abs_corr: float) -> str:
+    """Etiqueta de fuerza de una correlación (valor absoluto)."""
+    if abs_corr < 0.20:
+        return "MUY DÉBIL"
+    elif abs_corr < 0.40:
+        return "DÉBIL"
+    elif abs_corr < 0.60:
+        return "MODERADA"
+    elif abs_corr < 0.80:
+        return "FUERTE"
+    return "MUY FUERTE"
+
+
+def compute_correlation_section(df: pd.DataFrame, variables: list) -> dict:
+    """
+    Calcula la matriz de correlaciones y las correlaciones destacadas.
+
+    Args:
+        df: DataFrame filtrado
+        variables: Variables dependientes disponibles (al menos 2)
+
+    Returns:
+        Diccionario con la figura y la lista de interpretaciones (None si hay
+        menos de 10 observaciones completas)
+    """
+    checkpoint()
+    figure = create_correlation_heatmap(df, variables, "Matriz de Correlación (Spearman)")
+
+    # Calcular todas las correlaciones con p-values
+    df_multivar = df[variables].dropna()
+    if len(df_multivar) < 10:
+        return {'figure': figure, 'interpretations': None}
+
+    interpretations = []
+    for i, var1 in enumerate(variables):
+        for var2 in variables[i + 1:]:
+            corr, pval = calculate_spearman_correlation(df_multivar, var1, var2)
+
+            # Solo correlaciones significativas Y con valor absoluto > 0.2
+            if pval < 0.05 and abs(corr) > 0.2:
+                if pval < 0.001:
+                    sig = "***"
+                elif pval < 0.01:
+                    sig = "**"
+                else:
+                    sig = "*"
+
+                interpretations.append({
+                    'var1': var1,
+                    'var2': var2,
+                    'corr': corr,
+                    'pval': pval,
+                    'fuerza': _correlation_strength(abs(corr)),
+                    'sig': sig,
+                    'abs_corr': abs(corr)
+                })
+
+    # Ordenar por valor absoluto de correlación (de mayor a menor)
+    interpretations.sort(key=lambda x: x['abs_corr'], reverse=True)
+
+    return {'figure': figure, 'interpretations': interpretations}
+
+
+def compute_correlation_tab(df: pd.DataFrame, variable: str = None) -> dict:
+    """
+    Calcula la sección de correlaciones con las variables dependientes
+    disponibles (misma firma que las pestañas; la variable no se usa).
+
+    Args:
+        df: DataFrame filtrado
+        variable: Sin uso
+
+    Returns:
+        Diccionario con la figura y las interpretaciones (ver compute_correlation_section)
+    """
+    return compute_correlation_section(df, [v for v in DEPENDENT_VARS if v in df.columns])
+
+
+# Secciones que no son pestañas, con la misma interfaz que EDA_TABS/SPAIN_TABS
+VARIABLE_SECTIONS = {'summary': compute_variable_summary}
+CORRELATION_SECTIONS = {'matrix': compute_correlation_tab}
+
+
+# ============================================================================
+# CACHÉ PEREZOSA DE PESTAÑAS
+# ============================================================================
+
+class _TabFuture(Future):
+    """Future de una pestaña con la marca de quién se ha encargado de calcularla."""
+
+    claimed = False
+
+
+class LazyTabCache:
+    """
+    Caché de datos de pestañas indexada por (grupo, pestaña, firma de filtros,
+    variable). Una pestaña solo se calcula al abrirse por primera vez; las demás
+    se pueden precargar en segundo plano una vez renderizada la visible; la
+    abierta se puede programar al inicio de la ejecución (ver schedule_sections).
+
+    Una pestaña programada que aún no ha empezado la calcula quien la pide
+    primero (el script o un hilo del pool), de modo que esperar a la cola nunca
+    es más lento que calcularla directamente.
+
+    Con una caché persistente, las pestañas que no están en memoria se buscan
+    antes en disco con la misma clave (la firma incluye la versión del dataset).
+    """
+
+    def __init__(self, max_entries: int = 128, max_workers: int = 2,
+                 process_workers: int = 0, persistent: ResultCache = None):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries: Número máximo de pestañas calculadas en memoria (LRU)
+            max_workers: Hilos dedicados a la precarga en segundo plano
+            process_workers: Procesos para los cálculos estadísticos pesados
+                (0 para calcularlos en los hilos)
+            persistent: Caché en disco que sobrevive a reinicios (ver
+                cache.result_cache); None para no usarla
+        """
+        self.max_entries = max_entries
+        self.process_workers = process_workers
+        self.persistent = persistent
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.ledger = MEMORY_BUDGET.register('tab_cache', self.evict)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tab-prefetch"
+        )
+        self._process_pool = None
+
+    def _get_process_pool(self):
+        """Devuelve el pool de procesos, creándolo la primera vez (None si no hay)."""
+        if self.process_workers <= 0:
+            return None
+
+        with self._lock:
+            if self._process_pool is None:
+                # 'spawn': el proceso de Streamlit tiene hilos y fork no es seguro
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._process_pool
+
+    def _reserve(self, key: tuple) -> tuple:
+        """Obtiene el Future de una clave, creándolo si no existe."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None:
+                self._entries.move_to_end(key)
+                self.ledger.touch(key)
+                return future, False
+
+            future = _TabFuture()
+            self._entries[key] = future
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self.ledger.discard(evicted)
+            return future, True
+
+    def evict(self, key: tuple):
+        """Retira de la caché una pestaña ya calculada (las pendientes se mantienen)."""
+        with self._lock:
+            future = self._entries.get(key)
+            if future is not None and future.done():
+                del self._entries[key]
+
+    def _claim(self, future: _TabFuture) -> bool:
+        """Reserva el cálculo de un Future; False si otro ya se encarga de él."""
+        with self._lock:
+            if future.claimed:
+                return False
+            future.claimed = True
+            return True
+
+    def _compute(self, key: tuple, future: _TabFuture, builder, df: pd.DataFrame,
+                 variable: str, columns: list = None) -> bool:
+        """
+        Ejecuta el cálculo de una pestaña y publica su resultado.
+
+        Args:
+            key: Clave de la pestaña
+            future: Future donde publicar el resultado
+            builder: Función de cálculo (df, variable)
+            df: DataFrame sobre el que calcular
+            variable: Variable dependiente seleccionada
+            columns: Columnas que necesita el cálculo; si se indican y hay pool
+                de procesos, se calcula en un proceso con solo esas columnas
+
+        Returns:
+            True si esta llamada ha hecho el cálculo, False si ya se encargaba otra
+        """
+        if not self._claim(future):
+            return False
+
+        try:
+            # Las precargas de una generación de filtros superada no llegan a empezar
+            checkpoint()
+            start = time.perf_counter()
+            if self.persistent is not None:
+                result = self.persistent.get_or_compute(
+                    ('tab',) + key, self._build, builder, df, variable, columns
+                )
+            else:
+                result = self._build(builder, df, variable, columns)
+            cost = time.perf_counter() - start
+            future.set_result(result)
+        except Exception as e:
+            with self._lock:
+                if self._entries.get(key) is future:
+                    del self._entries[key]
+            future.set_exception(e)
+            return True
+
+        # El resultado cuenta en el presupuesto de memoria si sigue en la caché
+        nbytes = estimate_size(result)
+        with self._lock:
+            if self._entries.get(key) is future:
+                self.ledger.add(key, nbytes, cost)
+        MEMORY_BUDGET.enforce()
+        return True
+
+    def _build(self, builder, df: pd.DataFrame, variable: str, columns: list = None) -> dict:
+        """Calcula una pestaña en el pool de procesos (si hay y se indican columnas) o en el hilo."""
+        pool = self._get_process_pool() if columns is not None else None
+        if pool is not None:
+            try:
+                return pool.submit(builder, df[columns], variable).result()
+            except BrokenProcessPool:
+                # Un proceso del pool murió (p. ej. por memoria): se calcula en el hilo
+                pass
+        return builder(df, variable)
+
+    def get(self, group: str, tab: str, builders: dict, signature: str,
+            variable: str, df: pd.DataFrame) -> dict:
+        """
+        Devuelve los datos de una pestaña, calculándolos si es necesario.
+
+        Args:
+            group: Grupo de pestañas ('eda' o 'spain')
+            tab: Nombre de la pestaña dentro del grupo
+            builders: Diccionario {pestaña: función de cálculo}
+            signature: Firma de los filtros aplicados a df
+            variable: Variable dependiente seleccionada
+            df: DataFrame sobre el que calcular
+
+        Returns:
+            Diccionario con los datos de la pestaña
+        """
+        key = (group, tab, signature, variable)
+        first = True
+        while True:
+            future, _ = self._reserve(key)
+            computed = self._compute(key, future, builders[tab], df, variable)
+            if first:
+                # Acierto: calculada antes o por otro hilo (precarga o pool de secciones)
+                record_cache('tab_cache', not computed)
+                first = False
+            try:
+                return future.result()
+            except OperationCancelled:
+                # Cancelada con la generación de otra sesión: se recalcula si la
+                # generación de esta llamada sigue vigente
+                if computed or is_cancelled():
+                    raise
+
+    def prefetch(self, group: str, builders: dict, signature: str,
+                 variable: str, df: pd.DataFrame, columns: dict = None):
+        """
+        Programa en segundo plano el cálculo de las pestañas aún no calculadas.
+
+        Args:
+            group: Grupo de pestañas ('eda' o 'spain')
+            builders: Diccionario {pestaña: función de cálculo}
+            signature: Firma de los filtros aplicados a df
+            variable: Variable dependiente seleccionada
+            df: DataFrame sobre el que calcular
+            columns: Diccionario {pestaña: columnas} de las pestañas que se
+                calculan en el pool de procesos
+        """
+        columns = columns or {}
+        for tab, builder in builders.items():
+            key = (group, tab, signature, variable)
+            future, owner = self._reserve(key)
+            if owner:
+                # La precarga hereda el token de cancelación de la ejecución actual
+                context = contextvars.copy_context()
+                self._executor.submit(
+                    context.run, self._compute, key, future, builder, df, variable,
+                    columns.get(tab)
+                )
+
+
+TAB_CACHE = LazyTabCache(max_workers=SECTION_WORKERS, process_workers=SECTION_PROCESS_WORKERS,
+                         persistent=result_cache())
+
+
+# ============================================================================
+# PROGRAMACIÓN DE SECCIONES
+# ============================================================================
+
+def schedule_sections(df_filtered: pd.DataFrame, signature: str, spain_signature: str,
+                      selections: dict, eda_builders: dict = None,
+                      spain_builders: dict = None, cache: LazyTabCache = None):
+    """
+    Programa al inicio de una ejecución completa, en orden de renderizado, el
+    cálculo de las secciones y de la pestaña abierta de cada grupo. Las demás
+    pestañas no se programan: las precarga cada sección detrás de la abierta
+    una vez renderizada (LazyTabCache.prefetch). Las secciones se recogen
+    después en orden con cache.get; las estadísticas pesadas (resumen con
+    Shapiro-Wilk y correlaciones) usan el pool de procesos si está configurado.
+
+    Args:
+        df_filtered: DataFrame filtrado
+        signature: Firma de los filtros
+        spain_signature: Firma de los filtros para España (spain_filter_signature)
+        selections: Variable elegida por sección {'variables', 'eda', 'spain'} y
+            pestaña abierta {'eda_tab', 'spain_tab'} (por defecto la primera)
+        eda_builders: Funciones de las pestañas EDA (por defecto EDA_TABS)
+        spain_builders: Funciones de las pestañas de España (por defecto SPAIN_TABS)
+        cache: Caché de pestañas (por defecto TAB_CACHE)
+    """
+    cache = cache or TAB_CACHE
+    eda_builders = eda_builders or EDA_TABS
+    spain_builders = spain_builders or SPAIN_TABS
+    summary_variable = selections['variables']
+
+    cache.prefetch('variables', VARIABLE_SECTIONS, signature, summary_variable, df_filtered,
+                   columns={'summary': [summary_variable]})
+    eda_tab = selections.get('eda_tab') or next(iter(eda_builders))
+    cache.prefetch('eda', {eda_tab: eda_builders[eda_tab]}, signature, selections['eda'], df_filtered)
+
+    df_spain = df_filtered[df_filtered['cntry'] == 'ES']
+    if len(df_spain) >= 30:
+        spain_tab = selections.get('spain_tab') or next(iter(spain_builders))
+        cache.prefetch('spain', {spain_tab: spain_builders[spain_tab]}, spain_signature,
+                       selections['spain'], df_spain)
+
+    available = [v for v in DEPENDENT_VARS if v in df_filtered.columns]
+    if len(available) >= 2:
+        cache.prefetch('correlation', CORRELATION_SECTIONS, signature, None, df_filtered,
+                       columns={'matrix': available})
@@ -0,0 +1,131 @@
+"""
+Deduplicación de cálculos concurrentes idénticos (single-flight).
+Streamlit atiende cada sesión en un hilo distinto y sus cachés no agrupan los
+cálculos en curso: si varias sesiones piden a la vez los mismos datos, cada una
+los calcula. Un grupo single-flight ejecuta una sola vez cada clave en curso y
+el resto de llamadas con esa clave esperan y comparten el resultado.
+
+No es una caché: al terminar el cálculo la clave se libera y la siguiente
+llamada vuelve a ejecutarlo (la persistencia corresponde a las cachés de cada capa).
+"""
+
+import threading
+from concurrent.futures import Future
+
+from cancellation import OperationCancelled, is_cancelled
+
+
+class SingleFlight:
+    """
+    Grupo de cálculos en curso indexados por clave, con contadores de
+    llamadas, ejecuciones reales y llamadas agrupadas.
+    """
+    
+    def __init__(self, name: str):
+        """
+        Inicializa el grupo.
+        
+        Args:
+            name: Nombre del grupo (aparece en las estadísticas)
+        """
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+    
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Ejecuta fn(*args, **kwargs) o espera a la ejecución en curso con la misma clave.
+        
+        Args:
+            key: Clave hashable que identifica el cálculo
+            fn: Función a ejecutar
+            *args: Argumentos posicionales de fn
+            **kwargs: Argumentos con nombre de fn
+            
+        Returns:
+            Resultado de fn (compartido entre las llamadas agrupadas)
+        """
+        with self._lock:
+            self.calls += 1
+        
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self._in_flight[key] = future
+                    self.executions += 1
+                else:
+                    self.coalesced += 1
+            
+            if owner:
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    with self._lock:
+                        self.errors += 1
+                    future.set_exception(e)
+                finally:
+                    with self._lock:
+                        del self._in_flight[key]
+            
+            try:
+                return future.result()
+            except OperationCancelled:
+                # Se canceló la generación de la sesión que ejecutaba el cálculo:
+                # si la de esta llamada sigue vigente, se vuelve a intentar
+                if owner or is_cancelled():
+                    raise
+    
+    def stats(self) -> dict:
+        """
+        Devuelve los contadores del grupo.
+        
+        Returns:
+            Diccionario con llamadas, ejecuciones, agrupadas, errores y en curso
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'errors': self.errors,
+                'in_flight': len(self._in_flight)
+            }
+
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def get_flight(name: str) -> SingleFlight:
+    """
+    Devuelve el grupo single-flight de una capa, creándolo si no existe.
+    
+    Args:
+        name: Nombre del grupo (p. ej. 'data_loader', 'filters')
+        
+    Returns:
+        Grupo SingleFlight compartido por todo el proceso
+    """
+    with _groups_lock:
+        if name not in _groups:
+            _groups[name] = SingleFlight(name)
+        return _groups[name]
+
+
+def get_flight_stats() -> dict:
+    """
+    Devuelve los contadores de todos los grupos del proceso.
+    
+    Returns:
+        Diccionario {grupo: contadores}
+    """
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.stats() for group in groups}
@@ -1,21 +1,102 @@
 """
-Componentes de visualización con Plotly Express.
+Componentes de visualización con Plotly.
 Contiene funciones para crear gráficos interactivos reutilizables.
+
+Cada función admite dos motores de construcción (ver FIGURE_ENGINE en config):
+- 'graph_objects': construye la figura directamente desde arrays agregados
+  reutilizando una plantilla de layout ya validada (ruta rápida).
+- 'express': usa Plotly Express (implementación original).
+
+Plotly Express y la plantilla de layout se cargan en el primer uso para no
+penalizar el arranque de la aplicación.
 """
 
-import plotly.express as px
+from functools import lru_cache
+
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
-from scipy import stats
 from config import (
     COLOR_PALETTE, PLOTLY_CONFIG, PLOTLY_TEMPLATE,
-    ISO2_TO_ISO3
+    ISO2_TO_ISO3, FIGURE_ENGINE
 )
 
 
-def create_distribution_histogram(df: pd.DataFrame, variable: str, 
-                                  title: str = None) -> go.Figure:
+# ============================================================================
+# PLANTILLA DE LAYOUT PRE-VALIDADA
+# ============================================================================
+
+@lru_cache(maxsize=None)
+def _layout_template() -> go.layout.Template:
+    """
+    Construye una única vez (en el primer uso) la plantilla de layout derivada
+    de PLOTLY_TEMPLATE y COLOR_PALETTE, para no repetir la validación en cada figura.
+    
+    Returns:
+        Plantilla de Plotly validada
+    """
+    import plotly.io as pio
+    
+    template = go.layout.Template(pio.templates[PLOTLY_TEMPLATE])
+    template.layout.colorway = [
+        COLOR_PALETTE['primary'], COLOR_PALETTE['secondary'],
+        COLOR_PALETTE['success'], COLOR_PALETTE['warning'],
+        COLOR_PALETTE['info']
+    ]
+    return template
+
+
+def _group_order(values: pd.Series) -> list:
+    """
+    Orden de los grupos de una variable categórica: el de sus categorías si es
+    de tipo category (solo las presentes) y, si no, el orden de los valores.
+    Los dos motores lo usan para que los grupos y sus colores coincidan.
+    
+    Args:
+        values: Serie con la variable de agrupación (sin nulos)
+        
+    Returns:
+        Lista de grupos
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        present = set(values.unique())
+        return [group for group in values.cat.categories if group in present]
+    return sorted(pd.unique(values))
+
+
+@lru_cache(maxsize=None)
+def _discrete_colors() -> tuple:
+    """Secuencia de colores discretos de PLOTLY_TEMPLATE (la que usa Plotly Express)."""
+    import plotly.io as pio
+    
+    return tuple(pio.templates[PLOTLY_TEMPLATE].layout.colorway)
+
+
+def _use_express(engine: str = None) -> bool:
+    """Indica si se debe usar Plotly Express en lugar de graph_objects."""
+    return (engine or FIGURE_ENGINE) == 'express'
+
+
+def _new_figure(traces: list, title: str, **layout) -> go.Figure:
+    """
+    Crea una figura de graph_objects con la plantilla pre-validada.
+    
+    Args:
+        traces: Lista de trazas de Plotly
+        title: Título del gráfico
+        **layout: Propiedades adicionales del layout
+        
+    Returns:
+        Figura de Plotly
+    """
+    return go.Figure(
+        data=traces,
+        layout=dict(template=_layout_template(), title=dict(text=title), **layout)
+    )
+
+
+def create_distribution_histogram(df: pd.DataFrame, variable: str,
+                                  title: str = None, engine: str = None) -> go.Figure:
     """
     Crea un histograma de distribución de una variable.
     
@@ -23,6 +104,7 @@ def create_distribution_histogram(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable a visualizar
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -30,8 +112,23 @@ def create_distribution_histogram(df: pd.DataFrame, variable: str,
     if title is None:
         title = f"Distribución de {variable}"
     
+    if not _use_express(engine):
+        return _new_figure(
+            [go.Histogram(
+                x=df[variable].dropna().to_numpy(),
+                nbinsx=30,
+                marker_color=COLOR_PALETTE['primary']
+            )],
+            title,
+            showlegend=False,
+            xaxis_title=variable,
+            yaxis_title="Frecuencia"
+        )
+    
+    import plotly.express as px
+    
     fig = px.histogram(
-        df, 
+        df,
         x=variable,
         nbins=30,
         title=title,
@@ -49,8 +146,8 @@ def create_distribution_histogram(df: pd.DataFrame, variable: str,
     return fig
 
 
-def create_gender_frequency_histogram(df: pd.DataFrame, variable: str, 
-                                       title: str = None) -> go.Figure:
+def create_gender_frequency_histogram(df: pd.DataFrame, variable: str,
+                                       title: str = None, engine: str = None) -> go.Figure:
     """
     Crea un histograma de frecuencias por género (hombres vs mujeres) en porcentaje.
     
@@ -58,6 +155,7 @@ def create_gender_frequency_histogram(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable a visualizar
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -67,6 +165,31 @@ def create_gender_frequency_histogram(df: pd.DataFrame, variable: str,
     
     df_plot = df[['gender_label', variable]].dropna()
     
+    if not _use_express(engine):
+        traces = [
+            go.Histogram(
+                x=df_plot.loc[df_plot['gender_label'] == label, variable].to_numpy(),
+                name=label,
+                nbinsx=20,
+                # Mismos intervalos para hombres y mujeres, como en px.histogram
+                bingroup='x',
+                histnorm='percent',
+                opacity=0.7,
+                marker_color=COLOR_PALETTE[color_key]
+            )
+            for label, color_key in (('Hombre', 'gender_male'), ('Mujer', 'gender_female'))
+        ]
+        return _new_figure(
+            traces,
+            title,
+            barmode='overlay',
+            xaxis_title=variable,
+            yaxis_title="Porcentaje de Respuestas (%)",
+            legend_title="Género"
+        )
+    
+    import plotly.express as px
+    
     fig = px.histogram(
         df_plot,
         x=variable,
@@ -93,8 +216,8 @@ def create_gender_frequency_histogram(df: pd.DataFrame, variable: str,
     return fig
 
 
-def create_gender_comparison(df: pd.DataFrame, variable: str, 
-                             title: str = None) -> go.Figure:
+def create_gender_comparison(df: pd.DataFrame, variable: str,
+                             title: str = None, engine: str = None) -> go.Figure:
     """
     Crea un gráfico de comparación por género (boxplot).
     
@@ -102,6 +225,7 @@ def create_gender_comparison(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable dependiente a comparar
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -111,6 +235,25 @@ def create_gender_comparison(df: pd.DataFrame, variable: str,
     
     df_plot = df[['gender_label', variable]].dropna()
     
+    if not _use_express(engine):
+        traces = [
+            go.Box(
+                y=df_plot.loc[df_plot['gender_label'] == label, variable].to_numpy(),
+                name=label,
+                marker_color=COLOR_PALETTE[color_key]
+            )
+            for label, color_key in (('Hombre', 'gender_male'), ('Mujer', 'gender_female'))
+        ]
+        return _new_figure(
+            traces,
+            title,
+            showlegend=False,
+            xaxis_title='Género',
+            yaxis_title=variable
+        )
+    
+    import plotly.express as px
+    
     fig = px.box(
         df_plot,
         x='gender_label',
@@ -130,8 +273,9 @@ def create_gender_comparison(df: pd.DataFrame, variable: str,
     return fig
 
 
-def create_age_trend(df: pd.DataFrame, variable: str, 
-                    title: str = None) -> go.Figure:
+def create_age_trend(df: pd.DataFrame, variable: str,
+                    title: str = None, engine: str = None,
+                    means: pd.DataFrame = None) -> go.Figure:
     """
     Crea un gráfico de tendencia por tramos de edad.
     
@@ -139,7 +283,10 @@ def create_age_trend(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable dependiente a analizar
         title: Título del gráfico
-        
+        engine: Motor de construcción ('graph_objects' o 'express')
+        means: Medias ya agregadas (age_group, mean y count), p. ej. por el
+            backend de consultas; si se indican, df no se agrega
+            
     Returns:
         Figura de Plotly
     """
@@ -147,9 +294,27 @@ def create_age_trend(df: pd.DataFrame, variable: str,
         title = f"{variable} por Tramo de Edad"
     
     # Calcular medias por tramo de edad
-    age_means = df.groupby('age_group', observed=True)[variable].agg(['mean', 'count']).reset_index()
+    age_means = means if means is not None else (
+        df.groupby('age_group', observed=True)[variable].agg(['mean', 'count']).reset_index()
+    )
     age_means = age_means[age_means['count'] >= 10]  # Filtro de muestra mínima
     
+    if not _use_express(engine):
+        return _new_figure(
+            [go.Scatter(
+                x=age_means['age_group'].astype(str).to_numpy(),
+                y=age_means['mean'].to_numpy(),
+                mode='lines+markers',
+                line=dict(color=COLOR_PALETTE['primary'], width=3),
+                marker=dict(size=10)
+            )],
+            title,
+            xaxis_title='Tramo de Edad',
+            yaxis_title=f'Media de {variable}'
+        )
+    
+    import plotly.express as px
+    
     fig = px.line(
         age_means,
         x='age_group',
@@ -170,7 +335,8 @@ def create_age_trend(df: pd.DataFrame, variable: str,
 
 
 def create_education_trend(df: pd.DataFrame, variable: str,
-                          title: str = None) -> go.Figure:
+                          title: str = None, engine: str = None,
+                          means: pd.DataFrame = None) -> go.Figure:
     """
     Crea un gráfico de tendencia por nivel educativo.
     
@@ -178,7 +344,10 @@ def create_education_trend(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable dependiente a analizar
         title: Título del gráfico
-        
+        engine: Motor de construcción ('graph_objects' o 'express')
+        means: Medias ya agregadas (education_level, mean y count), p. ej. por el
+            backend de consultas; si se indican, df no se agrega
+            
     Returns:
         Figura de Plotly
     """
@@ -186,10 +355,28 @@ def create_education_trend(df: pd.DataFrame, variable: str,
         title = f"{variable} por Nivel Educativo"
     
     # Calcular medias por nivel educativo
-    edu_means = df.groupby('education_level')[variable].agg(['mean', 'count']).reset_index()
+    edu_means = means if means is not None else (
+        df.groupby('education_level')[variable].agg(['mean', 'count']).reset_index()
+    )
     edu_means = edu_means[edu_means['count'] >= 10]
     edu_means = edu_means.sort_values('education_level')
     
+    if not _use_express(engine):
+        return _new_figure(
+            [go.Scatter(
+                x=edu_means['education_level'].to_numpy(),
+                y=edu_means['mean'].to_numpy(),
+                mode='lines+markers',
+                line=dict(color=COLOR_PALETTE['success'], width=3),
+                marker=dict(size=8)
+            )],
+            title,
+            xaxis_title='Nivel Educativo (0-26)',
+            yaxis_title=f'Media de {variable}'
+        )
+    
+    import plotly.express as px
+    
     fig = px.line(
         edu_means,
         x='education_level',
@@ -210,7 +397,8 @@ def create_education_trend(df: pd.DataFrame, variable: str,
 
 
 def create_country_map(df: pd.DataFrame, variable: str,
-                      title: str = None) -> go.Figure:
+                      title: str = None, engine: str = None,
+                      means: pd.DataFrame = None) -> go.Figure:
     """
     Crea un mapa coroplético europeo por país.
     
@@ -218,7 +406,10 @@ def create_country_map(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable dependiente a visualizar
         title: Título del gráfico
-        
+        engine: Motor de construcción ('graph_objects' o 'express')
+        means: Medias ya agregadas (country_iso3, country_name, mean y count), p. ej. por el
+            backend de consultas; si se indican, df no se agrega
+            
     Returns:
         Figura de Plotly
     """
@@ -226,21 +417,40 @@ def create_country_map(df: pd.DataFrame, variable: str,
         title = f"{variable} por País"
     
     # Calcular medias por país
-    country_data = df.groupby(['country_iso3', 'country_name'])[variable].mean().reset_index()
-    
-    fig = px.choropleth(
-        country_data,
-        locations='country_iso3',
-        color=variable,
-        hover_name='country_name',
-        title=title,
-        scope='europe',
-        color_continuous_scale='RdYlGn',
-        labels={variable: f'Media {variable}'},
-        template=PLOTLY_TEMPLATE
-    )
+    if means is not None:
+        country_data = means.rename(columns={'mean': variable}).drop(columns='count')
+    else:
+        country_data = df.groupby(['country_iso3', 'country_name'])[variable].mean().reset_index()
+    
+    if not _use_express(engine):
+        fig = _new_figure(
+            [go.Choropleth(
+                locations=country_data['country_iso3'].to_numpy(),
+                z=country_data[variable].to_numpy(),
+                hovertext=country_data['country_name'].to_numpy(),
+                hovertemplate='<b>%{hovertext}</b><br>Media: %{z:.3f}<extra></extra>',
+                colorscale='RdYlGn',
+                colorbar=dict(title=dict(text=f'Media {variable}'))
+            )],
+            title
+        )
+    else:
+        import plotly.express as px
+        
+        fig = px.choropleth(
+            country_data,
+            locations='country_iso3',
+            color=variable,
+            hover_name='country_name',
+            title=title,
+            scope='europe',
+            color_continuous_scale='RdYlGn',
+            labels={variable: f'Media {variable}'},
+            template=PLOTLY_TEMPLATE
+        )
     
     fig.update_geos(
+        scope='europe',
         showcountries=True,
         countrycolor="lightgray",
         showcoastlines=True,
@@ -264,7 +474,8 @@ def create_country_map(df: pd.DataFrame, variable: str,
 
 
 def create_party_bar_chart(df: pd.DataFrame, variable: str,
-                           title: str = None) -> go.Figure:
+                           title: str = None, engine: str = None,
+                           means: pd.DataFrame = None) -> go.Figure:
     """
     Crea un gráfico de barras por partido político (solo España).
     
@@ -272,7 +483,10 @@ def create_party_bar_chart(df: pd.DataFrame, variable: str,
         df: DataFrame con los datos
         variable: Variable dependiente a visualizar
         title: Título del gráfico
-        
+        engine: Motor de construcción ('graph_objects' o 'express')
+        means: Medias ya agregadas (party_name, mean y count), p. ej. por el
+            backend de consultas; si se indican, df no se agrega
+            
     Returns:
         Figura de Plotly
     """
@@ -280,11 +494,37 @@ def create_party_bar_chart(df: pd.DataFrame, variable: str,
         title = f"{variable} por Partido Político (España)"
     
     # Filtrar solo España y calcular medias por partido
-    df_spain = df[df['cntry'] == 'ES'].copy()
-    party_means = df_spain.groupby('party_name')[variable].agg(['mean', 'count']).reset_index()
+    if means is not None:
+        party_means = means
+    else:
+        df_spain = df[df['cntry'] == 'ES']
+        party_means = df_spain.groupby('party_name')[variable].agg(['mean', 'count']).reset_index()
     party_means = party_means[party_means['count'] >= 10]
     party_means = party_means.sort_values('mean', ascending=True)
     
+    if not _use_express(engine):
+        means = party_means['mean'].to_numpy()
+        return _new_figure(
+            [go.Bar(
+                y=party_means['party_name'].to_numpy(),
+                x=means,
+                orientation='h',
+                marker=dict(
+                    color=means,
+                    colorscale='RdYlGn',
+                    showscale=True,
+                    colorbar=dict(title=dict(text=f'Media de {variable}'))
+                )
+            )],
+            title,
+            showlegend=False,
+            height=500,
+            xaxis_title=f'Media de {variable}',
+            yaxis_title='Partido'
+        )
+    
+    import plotly.express as px
+    
     fig = px.bar(
         party_means,
         y='party_name',
@@ -306,7 +546,8 @@ def create_party_bar_chart(df: pd.DataFrame, variable: str,
 
 
 def create_ideology_scatter(df: pd.DataFrame, variable: str,
-                            title: str = None, x_var: str = 'ideology') -> go.Figure:
+                            title: str = None, x_var: str = 'ideology',
+                            engine: str = None) -> go.Figure:
     """
     Crea un dispersograma de variable vs ideología/nacionalismo con línea de tendencia.
     
@@ -315,6 +556,7 @@ def create_ideology_scatter(df: pd.DataFrame, variable: str,
         variable: Variable dependiente a analizar
         title: Título del gráfico
         x_var: Variable a usar en el eje X (por defecto 'ideology', también puede ser 'nationalism')
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -342,6 +584,35 @@ def create_ideology_scatter(df: pd.DataFrame, variable: str,
     # Etiquetas dinámicas según la variable
     x_label = 'Ideología (1=Izq, 5=Der)' if x_var == 'ideology' else 'Nacionalismo (1=Bajo, 5=Alto)'
     
+    x_trend = np.linspace(df_spain[x_var].min(), df_spain[x_var].max(), 100)
+    trend_trace = go.Scatter(
+        x=x_trend,
+        y=p(x_trend),
+        mode='lines',
+        name='Tendencia',
+        line=dict(color=COLOR_PALETTE['warning'], width=3)
+    )
+    
+    if not _use_express(engine):
+        return _new_figure(
+            [
+                go.Scatter(
+                    x=df_spain[x_var].to_numpy(),
+                    y=df_spain[variable].to_numpy(),
+                    mode='markers',
+                    opacity=0.5,
+                    marker_color=COLOR_PALETTE['primary'],
+                    showlegend=False
+                ),
+                trend_trace
+            ],
+            title,
+            xaxis_title=x_label,
+            yaxis_title=variable
+        )
+    
+    import plotly.express as px
+    
     fig = px.scatter(
         df_spain,
         x=x_var,
@@ -354,22 +625,14 @@ def create_ideology_scatter(df: pd.DataFrame, variable: str,
     )
     
     # Añadir línea de tendencia
-    x_trend = np.linspace(df_spain[x_var].min(), df_spain[x_var].max(), 100)
-    fig.add_trace(
-        go.Scatter(
-            x=x_trend,
-            y=p(x_trend),
-            mode='lines',
-            name='Tendencia',
-            line=dict(color=COLOR_PALETTE['warning'], width=3)
-        )
-    )
+    fig.add_trace(trend_trace)
     
     return fig
 
 
 def create_correlation_heatmap(df: pd.DataFrame, variables: list,
-                               title: str = "Matriz de Correlación") -> go.Figure:
+                               title: str = "Matriz de Correlación",
+                               engine: str = None) -> go.Figure:
     """
     Crea un mapa de calor de correlaciones entre variables.
     
@@ -377,6 +640,7 @@ def create_correlation_heatmap(df: pd.DataFrame, variables: list,
         df: DataFrame con los datos
         variables: Lista de variables a correlacionar
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -384,6 +648,26 @@ def create_correlation_heatmap(df: pd.DataFrame, variables: list,
     # Calcular matriz de correlación de Spearman
     corr_matrix = df[variables].corr(method='spearman')
     
+    if not _use_express(engine):
+        return _new_figure(
+            [go.Heatmap(
+                z=corr_matrix.to_numpy(),
+                x=list(corr_matrix.columns),
+                y=list(corr_matrix.index),
+                colorscale='RdBu',  # Rojo=positivo, Blanco=0, Azul=negativo
+                zmin=-1,  # Forzar rango de -1 a 1
+                zmax=1,
+                texttemplate='%{z:.2f}',
+                colorbar=dict(title=dict(text="Correlación"))
+            )],
+            title,
+            height=600,
+            width=800,
+            yaxis=dict(autorange='reversed')
+        )
+    
+    import plotly.express as px
+    
     fig = px.imshow(
         corr_matrix,
         text_auto='.2f',
@@ -405,7 +689,8 @@ def create_correlation_heatmap(df: pd.DataFrame, variables: list,
 
 
 def create_top_bottom_chart(top_df: pd.DataFrame, bottom_df: pd.DataFrame,
-                            variable: str, title: str = None) -> go.Figure:
+                            variable: str, title: str = None,
+                            engine: str = None) -> go.Figure:
     """
     Crea un gráfico de barras combinado para Top y Bottom países.
     
@@ -414,6 +699,7 @@ def create_top_bottom_chart(top_df: pd.DataFrame, bottom_df: pd.DataFrame,
         bottom_df: DataFrame con los países bottom
         variable: Variable visualizada
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -421,6 +707,28 @@ def create_top_bottom_chart(top_df: pd.DataFrame, bottom_df: pd.DataFrame,
     if title is None:
         title = f"Top 5 y Bottom 5 Países - {variable}"
     
+    if not _use_express(engine):
+        traces = [
+            go.Bar(
+                y=group_df['country_name'].to_numpy(),
+                x=group_df['mean'].to_numpy(),
+                orientation='h',
+                name=label,
+                marker_color=COLOR_PALETTE[color_key]
+            )
+            for group_df, label, color_key in (
+                (top_df, 'Top 5', 'success'),
+                (bottom_df, 'Bottom 5', 'warning')
+            )
+        ]
+        return _new_figure(
+            traces,
+            title,
+            height=500,
+            xaxis_title=f'Media {variable}',
+            yaxis_title='País'
+        )
+    
     # Combinar datos
     top_df = top_df.copy()
     bottom_df = bottom_df.copy()
@@ -430,6 +738,8 @@ def create_top_bottom_chart(top_df: pd.DataFrame, bottom_df: pd.DataFrame,
     combined = pd.concat([top_df, bottom_df])
     combined = combined.rename(columns={'mean': variable})
     
+    import plotly.express as px
+    
     fig = px.bar(
         combined,
         y='country_name',
@@ -451,7 +761,7 @@ def create_top_bottom_chart(top_df: pd.DataFrame, bottom_df: pd.DataFrame,
 
 
 def create_violin_plot(df: pd.DataFrame, variable: str, group_by: str,
-                       title: str = None) -> go.Figure:
+                       title: str = None, engine: str = None) -> go.Figure:
     """
     Crea un gráfico de violín para comparar distribuciones.
     
@@ -460,6 +770,7 @@ def create_violin_plot(df: pd.DataFrame, variable: str, group_by: str,
         variable: Variable dependiente a visualizar
         group_by: Variable de agrupación
         title: Título del gráfico
+        engine: Motor de construcción ('graph_objects' o 'express')
         
     Returns:
         Figura de Plotly
@@ -467,14 +778,41 @@ def create_violin_plot(df: pd.DataFrame, variable: str, group_by: str,
     if title is None:
         title = f"Distribución de {variable} por {group_by}"
     
+    df_plot = df[[group_by, variable]].dropna()
+    groups = _group_order(df_plot[group_by])
+    colors = _discrete_colors()
+    
+    if not _use_express(engine):
+        traces = [
+            go.Violin(
+                y=df_plot.loc[df_plot[group_by] == group, variable].to_numpy(),
+                name=str(group),
+                marker_color=colors[i % len(colors)],
+                box_visible=True,
+                points='outliers'
+            )
+            for i, group in enumerate(groups)
+        ]
+        return _new_figure(
+            traces,
+            title,
+            showlegend=False,
+            xaxis_title=group_by,
+            yaxis_title=variable
+        )
+    
+    import plotly.express as px
+    
     fig = px.violin(
-        df,
+        df_plot,
         y=variable,
         x=group_by,
         title=title,
         labels={group_by: group_by, variable: variable},
         template=PLOTLY_TEMPLATE,
         color=group_by,
+        category_orders={group_by: groups},
+        color_discrete_sequence=colors,
         box=True,
         points='outliers'
     )